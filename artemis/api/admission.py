@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Deque, Dict
+
+from artemis.config import settings
+from artemis.metrics import Counter, Gauge, Histogram
+
+logger = logging.getLogger(__name__)
+
+# Queue waits are short by design, so the buckets stop at a few seconds
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+
+WAIT_SECONDS = Histogram(
+    "artemis_admission_wait_seconds",
+    "Time admitted chat requests spent queued for a slot",
+    buckets=WAIT_BUCKETS,
+)
+REJECTED = Counter(
+    "artemis_admission_rejected_total",
+    "Chat requests shed with 503, by reason (queue_full, timeout)",
+    ["reason"],
+)
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted; carries a Retry-After hint."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"Server overloaded ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Slot:
+    """One admitted request. Releasing is idempotent."""
+
+    def __init__(self, gate: "AdmissionGate"):
+        self._gate = gate
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._gate._release()
+
+    async def __aenter__(self) -> "Slot":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.release()
+
+
+class AdmissionGate:
+    """Bounded concurrency with a short FIFO wait queue in front of the agent.
+
+    Up to ``max_concurrency`` requests run at once and up to ``max_queue``
+    more wait for a slot, each for at most ``queue_timeout`` seconds. Anything
+    beyond that is rejected straight away, so an overloaded worker sheds load
+    quickly instead of piling up requests that will time out anyway.
+
+    A released slot is handed directly to the oldest waiter, so a newcomer can
+    never overtake the queue.
+
+    Every worker process has its own gate; see ``split``.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int,
+        queue_timeout: float,
+        retry_after: int,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self._limits = (max_concurrency, max_queue)  # for the whole server
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.admitted = 0
+
+    def split(self, workers: int):
+        """Take one worker's share of the limits, before forking ``workers``.
+
+        The configured limits are for the whole server; without this each
+        worker would apply all of them. Shares are rounded up, so every worker
+        can run at least one request.
+        """
+        max_concurrency, max_queue = self._limits
+        self.max_concurrency = max(1, math.ceil(max_concurrency / workers))
+        self.max_queue = math.ceil(max_queue / workers)
+
+    async def acquire(self) -> Slot:
+        """Wait for a slot.
+
+        Raises:
+            Overloaded: If the queue is full or the wait timed out
+        """
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            self.admitted += 1
+            WAIT_SECONDS.observe(0.0)
+            return Slot(self)
+
+        if len(self._waiters) >= self.max_queue:
+            REJECTED.inc(reason="queue_full")
+            raise Overloaded("queue_full", self.retry_after)
+
+        start = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait({waiter}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+
+        if not waiter.done():
+            self._abandon(waiter)
+            REJECTED.inc(reason="timeout")
+            logger.warning(
+                f"Admission wait timed out after {self.queue_timeout}s "
+                f"({self._active} active, {len(self._waiters)} queued)"
+            )
+            raise Overloaded("timeout", self.retry_after)
+
+        self.admitted += 1
+        WAIT_SECONDS.observe(time.perf_counter() - start)
+        return Slot(self)
+
+    def _abandon(self, waiter: asyncio.Future):
+        """Leave the queue, passing on a slot that was handed over meanwhile."""
+        if waiter.done() and not waiter.cancelled():
+            self._release()
+            return
+        waiter.cancel()
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _release(self):
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                # Hand the slot over; the active count stays the same
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "active": self._active,
+            "queued": len(self._waiters),
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+        }
+
+
+# Global instance
+admission_gate = AdmissionGate(
+    max_concurrency=settings.admission_max_concurrency,
+    max_queue=settings.admission_max_queue,
+    queue_timeout=settings.admission_queue_timeout,
+    retry_after=settings.admission_retry_after,
+)
+
+Gauge(
+    "artemis_admission_active",
+    "Chat requests currently holding an admission slot",
+    function=lambda: admission_gate.stats()["active"],
+)
+Gauge(
+    "artemis_admission_queue_depth",
+    "Chat requests waiting for an admission slot",
+    function=lambda: admission_gate.stats()["queued"],
+)
@@ -1,9 +1,12 @@
 """API authentication utilities."""
 
+import hmac
 import os
 from fastapi import Header, HTTPException, status
 from typing import Optional
 
+from artemis.config import settings
+
 
 async def verify_api_key(x_api_key: Optional[str] = Header(None)) -> None:
     """
@@ -26,3 +29,21 @@ async def verify_api_key(x_api_key: Optional[str] = Header(None)) -> None:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Invalid API key"
         )
+
+
+async def verify_metrics_access(
+    authorization: Optional[str] = Header(None), x_api_key: Optional[str] = Header(None)
+) -> None:
+    """
+    Verify access to /metrics.
+
+    Scrapers may send ``Authorization: Bearer <METRICS_TOKEN>`` when a metrics
+    token is configured, so they need not hold the API key; otherwise the
+    X-API-Key check applies.
+    """
+    token = settings.metrics_token
+    if token and authorization and hmac.compare_digest(
+        authorization, f"Bearer {token}"
+    ):
+        return
+    await verify_api_key(x_api_key)
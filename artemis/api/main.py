@@ -1,10 +1,9 @@
+import asyncio
 import logging
 
-from fastapi import FastAPI, Request
+from fastapi import Depends, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
 
 # Set up logging early
 logging.basicConfig(
@@ -13,13 +12,55 @@ logging.basicConfig(
     datefmt="%Y-%m-%d %H:%M:%S",
 )
 
+from artemis.api.admission import admission_gate
+from artemis.api.auth import verify_metrics_access
+from artemis.api.ratelimit import health_rate_limit, metrics_rate_limit
 from artemis.api.routes import chat
+from artemis.chatbot.cache import response_cache
+from artemis.chatbot.semantic_cache import semantic_cache
+from artemis.chatbot.tools import tool_registry
 from artemis.config import settings
+from artemis.logging_config import conversation_logger
+from artemis.metrics import Counter, Gauge, default_registry
 
 logger = logging.getLogger(__name__)
 
-# Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
+
+def _cache_counts(key: str):
+    """Read one counter from each cache's stats for the /metrics endpoint."""
+    counts = {
+        ("response",): response_cache.stats()[key],
+        ("semantic",): semantic_cache.stats()[key],
+    }
+    for name, memo in tool_registry.memo.stats().items():
+        counts[(f"tool_memo:{name}",)] = (
+            memo["hits"] if key == "hits" else memo["calls"] - memo["hits"]
+        )
+    return counts
+
+
+Counter(
+    "artemis_cache_hits_total",
+    "Cache hits by cache",
+    ["cache"],
+    function=lambda: _cache_counts("hits"),
+)
+Counter(
+    "artemis_cache_misses_total",
+    "Cache misses by cache",
+    ["cache"],
+    function=lambda: _cache_counts("misses"),
+)
+Gauge(
+    "artemis_conversation_log_queued",
+    "Conversation log records waiting for the writer thread",
+    function=lambda: conversation_logger.stats()["queued"],
+)
+Counter(
+    "artemis_conversation_log_dropped_total",
+    "Conversation log records dropped because the queue was full",
+    function=lambda: conversation_logger.stats()["dropped"],
+)
 
 app = FastAPI(
     title="Artemis Personal Chatbot",
@@ -27,12 +68,6 @@ app = FastAPI(
     version="0.1.0",
 )
 
-# Attach limiter to app state (required by slowapi)
-app.state.limiter = limiter
-
-# Add rate limit error handler
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
-
 app.add_middleware(
     CORSMiddleware,
     allow_origins=[
@@ -47,24 +82,64 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["*"],
-    expose_headers=["X-API-Key"],
+    expose_headers=["X-API-Key", "X-Conversation-Id"],
 )
 
-# Decorate the chat endpoint with rate limiting
-chat.chat = limiter.limit("25/minute")(chat.chat)
-
 app.include_router(chat.router, prefix="/api")
 
 
+@app.on_event("startup")
+async def warm_up_tools():
+    """Build tool backends in the background so /health answers immediately."""
+    if settings.tool_warmup:
+        app.state.tool_warmup = asyncio.create_task(tool_registry.warm_up())
+
+
+@app.on_event("startup")
+async def start_log_shipping():
+    """Resume shipping log segments left over from earlier runs."""
+    conversation_logger.start_shipping()
+
+
+@app.on_event("shutdown")
+async def save_caches():
+    """Persist the semantic cache so paraphrase hits survive restarts."""
+    await asyncio.to_thread(semantic_cache.save)
+
+
+@app.on_event("shutdown")
+async def flush_logs():
+    """Drain queued conversation log records before the process exits."""
+    await asyncio.to_thread(conversation_logger.close)
+
+
 @app.get("/")
 async def root():
     return {"message": "Welcome to Artemis Personal Chatbot"}
 
 
-@app.get("/health")
-@limiter.limit("60/minute")
-async def health(request: Request):
-    return {"status": "healthy"}
+@app.get("/health", dependencies=[Depends(health_rate_limit)])
+async def health():
+    return {
+        "status": "healthy",
+        "admission": admission_gate.stats(),
+        "tools": tool_registry.stats(),
+        "response_cache": response_cache.stats(),
+        "semantic_cache": semantic_cache.stats(),
+        "conversation_log": conversation_logger.stats(),
+    }
+
+
+@app.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(verify_metrics_access), Depends(metrics_rate_limit)],
+)
+async def metrics():
+    """Prometheus text-format metrics for this worker process."""
+    return PlainTextResponse(
+        default_registry.render(), media_type="text/plain; version=0.0.4"
+    )
 
 
 @app.get("/debug/env")
@@ -1,5 +1,5 @@
 from typing import List, Optional, Dict, Any
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 
 
 class ChatMessage(BaseModel):
@@ -8,12 +8,33 @@ class ChatMessage(BaseModel):
 
 
 class ChatRequest(BaseModel):
-    messages: List[ChatMessage]
+    # Full transcript (stateless clients) or the new messages of a session
+    messages: List[ChatMessage] = []
+    # Continue a server-side session
+    conversation_id: Optional[str] = None
+    # Start a server-side session; its id is returned as conversation_id
+    session: bool = False
+    # Shorthand for a single new user message
+    message: Optional[str] = None
     stream: bool = True
+    # Streaming options: one merged token frame per flush, and per-frame timestamps
+    sse_batch: bool = False
+    sse_timestamps: bool = True
+
+    @model_validator(mode="after")
+    def check_messages(self):
+        if self.message is not None:
+            self.messages = self.messages + [
+                ChatMessage(role="user", content=self.message)
+            ]
+        if not self.messages:
+            raise ValueError("Either 'messages' or 'message' is required")
+        return self
 
 
 class ChatResponse(BaseModel):
     response: str
+    conversation_id: Optional[str] = None
 
 
 class StreamChunk(BaseModel):
@@ -0,0 +1,295 @@
+import asyncio
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Optional, Set, Tuple
+
+from fastapi import HTTPException, Request
+
+from artemis.config import settings
+from artemis.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+# Minimum level for a charge: usage is always recorded, even into debt
+ALWAYS = -1e18
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    key TEXT PRIMARY KEY,
+    level REAL NOT NULL,
+    updated REAL NOT NULL,
+    full_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS buckets_full_at ON buckets (full_at);
+"""
+
+# Atomic refill-and-take in Redis; the server clock keeps workers consistent
+REDIS_TAKE = """
+local now_parts = redis.call('TIME')
+local now = tonumber(now_parts[1]) + tonumber(now_parts[2]) / 1000000
+local cost = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local rate = tonumber(ARGV[3])
+local require_level = tonumber(ARGV[4])
+local level = tonumber(redis.call('HGET', KEYS[1], 'level'))
+local updated = tonumber(redis.call('HGET', KEYS[1], 'updated'))
+if level == nil or updated == nil then
+    level = capacity
+    updated = now
+end
+level = math.min(capacity, level + math.max(0, now - updated) * rate)
+local allowed = 0
+if level >= require_level then
+    level = level - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'level', tostring(level), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - level) / rate * 1000) + 1000)
+return {allowed, tostring(level)}
+"""
+
+LIMITED = Counter(
+    "artemis_rate_limited_total",
+    "Requests rejected with 429, by rule and budget (requests, tokens)",
+    ["rule", "budget"],
+)
+
+
+class BucketStore(ABC):
+    """Token buckets shared by every worker process.
+
+    ``take`` refills a bucket for the time since it was last touched, then
+    subtracts ``cost`` if the level is at least ``require``, atomically.
+    """
+
+    @abstractmethod
+    def take(
+        self, key: str, cost: float, capacity: float, rate: float, require: float
+    ) -> Tuple[bool, float]:
+        """Return (allowed, level after the operation)."""
+
+
+class SQLiteBucketStore(BucketStore):
+    """Buckets in a local SQLite file, shared by workers on the same host.
+
+    Each take is one ``BEGIN IMMEDIATE`` transaction, which serializes
+    concurrent takes across processes. Buckets that have refilled completely
+    are pruned now and then, since a missing bucket reads as full.
+    """
+
+    PRUNE_EVERY = 1000
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(settings.data_dir, "ratelimit.db")
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._takes = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, check_same_thread=False, timeout=5, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def take(
+        self, key: str, cost: float, capacity: float, rate: float, require: float
+    ) -> Tuple[bool, float]:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT level, updated FROM buckets WHERE key = ?", (key,)
+                ).fetchone()
+                level = capacity
+                if row is not None:
+                    level = min(capacity, row[0] + max(0.0, now - row[1]) * rate)
+                allowed = level >= require
+                if allowed:
+                    level -= cost
+                conn.execute(
+                    "INSERT OR REPLACE INTO buckets (key, level, updated, full_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (key, level, now, now + (capacity - level) / rate),
+                )
+                self._takes += 1
+                if self._takes % self.PRUNE_EVERY == 0:
+                    conn.execute("DELETE FROM buckets WHERE full_at < ?", (now,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return allowed, level
+
+
+class RedisBucketStore(BucketStore):
+    """Buckets in Redis (or a compatible server), shared across hosts."""
+
+    def __init__(self, url: str, prefix: str = "artemis:ratelimit:"):
+        try:
+            import redis
+        except ImportError as e:
+            raise ImportError(
+                "rate_limit_backend='redis' requires redis; "
+                "install with `poetry install -E redis`"
+            ) from e
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=1.0)
+        self._script = self._client.register_script(REDIS_TAKE)
+
+    def take(
+        self, key: str, cost: float, capacity: float, rate: float, require: float
+    ) -> Tuple[bool, float]:
+        allowed, level = self._script(
+            keys=[self.prefix + key], args=[cost, capacity, rate, require]
+        )
+        return bool(allowed), float(level)
+
+
+def create_bucket_store() -> BucketStore:
+    if settings.rate_limit_backend == "redis":
+        return RedisBucketStore(settings.rate_limit_redis_url)
+    return SQLiteBucketStore()
+
+
+def client_key(request: Request) -> str:
+    """Identify the client: by API key if configured, else by client IP.
+
+    Behind a proxy every connection comes from the proxy, so the client IP is
+    read from ``X-Forwarded-For``: each of the ``rate_limit_trusted_proxies``
+    proxies appends the address it saw, so the entry that many places from
+    the end is the one no client can forge.
+    """
+    if settings.rate_limit_key == "api_key":
+        api_key = request.headers.get("x-api-key")
+        if api_key:
+            return "key:" + hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+    hops = settings.rate_limit_trusted_proxies
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded and hops > 0:
+        addresses = [part.strip() for part in forwarded.split(",") if part.strip()]
+        if addresses:
+            return "ip:" + addresses[-min(hops, len(addresses))]
+    return "ip:" + (request.client.host if request.client else "unknown")
+
+
+@dataclass
+class RateLimitRule:
+    name: str
+    requests: int  # requests per window; 0 = unlimited
+    window: float  # seconds
+    tokens: int = 0  # LLM tokens per token_window; 0 = unlimited
+    token_window: float = 3600.0
+
+
+class RateLimiter:
+    """Request and token-weighted rate limits backed by a shared BucketStore.
+
+    A rule's request budget is charged one unit as each request is admitted.
+    Its token budget cannot be known up front, so admission only requires the
+    budget to be positive and ``charge`` subtracts the tokens actually used
+    once the response is done; a client that overspends waits until the
+    bucket refills past zero. If the store fails, requests are let through.
+    """
+
+    def __init__(self, store: BucketStore):
+        self.store = store
+        # Charges running detached from their request; referenced until done
+        self._charges: Set[asyncio.Task] = set()
+
+    async def _take(
+        self, key: str, cost: float, capacity: float, rate: float, require: float
+    ) -> Tuple[bool, float]:
+        try:
+            return await asyncio.to_thread(
+                self.store.take, key, cost, capacity, rate, require
+            )
+        except Exception as e:
+            logger.error(f"Rate limit store failed, allowing request: {str(e)}")
+            return True, capacity
+
+    def _reject(self, rule: RateLimitRule, budget: str, wait: float):
+        LIMITED.inc(rule=rule.name, budget=budget)
+        raise HTTPException(
+            status_code=429,
+            detail=f"Rate limit exceeded ({budget})",
+            headers={"Retry-After": str(max(1, round(wait + 0.5)))},
+        )
+
+    def limit(self, rule: RateLimitRule):
+        """Build a FastAPI dependency that enforces ``rule``."""
+
+        async def dependency(request: Request):
+            key = client_key(request)
+            request.state.rate_limit = (rule, key)
+            if rule.tokens:
+                rate = rule.tokens / rule.token_window
+                allowed, level = await self._take(
+                    f"{rule.name}:tokens:{key}", 0, rule.tokens, rate, 1e-9
+                )
+                if not allowed:
+                    self._reject(rule, "tokens", -level / rate)
+            if rule.requests:
+                rate = rule.requests / rule.window
+                allowed, level = await self._take(
+                    f"{rule.name}:requests:{key}", 1, rule.requests, rate, 1
+                )
+                if not allowed:
+                    self._reject(rule, "requests", (1 - level) / rate)
+
+        return dependency
+
+    async def charge(self, request: Request, tokens: int):
+        """Charge LLM tokens used by a request to its rule's token budget."""
+        rule, key = getattr(request.state, "rate_limit", (None, None))
+        if rule is None or not rule.tokens or tokens <= 0:
+            return
+        rate = rule.tokens / rule.token_window
+        await self._take(f"{rule.name}:tokens:{key}", tokens, rule.tokens, rate, ALWAYS)
+
+    def charge_later(self, request: Request, tokens: int):
+        """Charge tokens from a task of its own.
+
+        For cleanup code that may run in a cancelled task (a stream whose
+        client disconnected), where an awaited charge would be cancelled too.
+        """
+        task = asyncio.get_running_loop().create_task(self.charge(request, tokens))
+        self._charges.add(task)
+        task.add_done_callback(self._charges.discard)
+
+
+# Global instance
+rate_limiter = RateLimiter(create_bucket_store())
+
+chat_rate_limit = rate_limiter.limit(
+    RateLimitRule(
+        "chat",
+        requests=settings.rate_limit_chat_requests,
+        window=60.0,
+        tokens=settings.rate_limit_chat_tokens,
+        token_window=settings.rate_limit_token_window,
+    )
+)
+health_rate_limit = rate_limiter.limit(
+    RateLimitRule("health", requests=settings.rate_limit_health_requests, window=60.0)
+)
+metrics_rate_limit = rate_limiter.limit(
+    RateLimitRule(
+        "metrics", requests=settings.rate_limit_metrics_requests, window=60.0
+    )
+)
@@ -1,78 +1,187 @@
+import asyncio
 import json
 import logging
-from typing import AsyncGenerator
-from datetime import datetime, timezone
+import threading
+import time
+from contextlib import aclosing
+from typing import AsyncGenerator, AsyncIterator, List, Optional, Tuple
 from fastapi import APIRouter, HTTPException, Request, Depends
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 
+from artemis.api.admission import Overloaded, Slot, admission_gate
 from artemis.api.models import ChatRequest, ChatResponse
+from artemis.api.ratelimit import chat_rate_limit, rate_limiter
 from artemis.api.auth import verify_api_key
-from artemis.chatbot.agent import ArtemisAgent
+from artemis.api.sse import (
+    SSEEncoder,
+    coalesce,
+    get_timestamp,
+    starlette_watches_disconnect,
+    wait_for_disconnect,
+)
+from artemis.chatbot.agent import ArtemisAgent, ToolIndicator
+from artemis.chatbot.cache import replay_chunks, response_cache
+from artemis.chatbot.resilience import UpstreamUnavailable
+from artemis.chatbot.semantic_cache import semantic_cache
+from artemis.chatbot.stats import TurnStats
+from artemis.config import settings
 from artemis.logging_config import conversation_logger
+from artemis.storage.sessions import Session, session_store
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Lazy initialization of chatbot
 _chatbot = None
-
-# Rate limiter will be injected from main.py
-limiter = None
+_chatbot_lock = threading.Lock()
 
 
 def get_chatbot():
     global _chatbot
     if _chatbot is None:
-        _chatbot = ArtemisAgent()
+        # Concurrent first requests must not each build an agent
+        with _chatbot_lock:
+            if _chatbot is None:
+                _chatbot = ArtemisAgent()
     return _chatbot
 
 
-def get_timestamp() -> str:
-    """Get current ISO timestamp."""
-    return datetime.now(timezone.utc).isoformat()
+def lookup_cached_response(
+    messages: List[Tuple[str, str]], version: str
+) -> Tuple[str, Optional[str], Optional[str]]:
+    """Return (cache key, cached answer, cache layer that answered)."""
+    cache_key = response_cache.make_key(messages, version)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return cache_key, cached, "exact"
 
+    # Paraphrase matching only makes sense without earlier turns for context
+    if len(messages) == 1 and messages[0][0] == "user":
+        cached = semantic_cache.lookup(messages[0][1], version)
+        if cached is not None:
+            return cache_key, cached, "semantic"
+    return cache_key, None, None
 
-async def stream_response(request: ChatRequest) -> AsyncGenerator[str, None]:
-    """Stream chat response as Server-Sent Events."""
-    try:
-        # Convert messages to format expected by chatbot
-        messages = [(msg.role, msg.content) for msg in request.messages]
-
-        # Log user message and get conversation ID for streaming
-        conversation_id = None
-        if messages:
-            last_user_msg = messages[-1][1] if messages[-1][0] == "user" else ""
-            if last_user_msg:
-                conversation_id = conversation_logger.log_user_message(
-                    last_user_msg, {"stream": True, "endpoint": "stream"}
-                )
 
-        # Get chatbot and stream the response
-        chatbot = get_chatbot()
-        response_parts = []
-        async for chunk in chatbot.astream(messages):
-            response_parts.append(chunk)
-            # Format as SSE
-            data = json.dumps(
-                {"type": "token", "content": chunk, "timestamp": get_timestamp()}
-            )
-            yield f"data: {data}\n\n"
-
-        # Log complete response with same conversation ID
-        full_response = "".join(response_parts)
-        if full_response and conversation_id:
-            conversation_logger.log_assistant_response(
-                full_response,
-                conversation_id,
-                {
-                    "stream": True,
-                    "endpoint": "stream",
-                    "chunks_count": len(response_parts),
-                },
-            )
+def store_response(
+    messages: List[Tuple[str, str]],
+    cache_key: str,
+    response: str,
+    version: str,
+    stats: TurnStats,
+):
+    """Store a fresh answer in the exact and (for first turns) semantic caches.
+
+    Answers written around a failed or timed-out tool call are not stored, so
+    a transient failure is not replayed to every later asker.
+    """
+    if any(call["status"] != "ok" for call in stats.tool_calls):
+        return
+    response_cache.set(cache_key, response)
+    if len(messages) == 1 and messages[0][0] == "user":
+        semantic_cache.add(messages[0][1], response, version)
+
+
+async def replay_response(text: str) -> AsyncIterator[str]:
+    """Replay a cached answer as a paced token stream."""
+    for chunk in replay_chunks(text):
+        yield chunk
+        await asyncio.sleep(settings.response_cache_replay_delay)
+
+
+def log_tool_calls(stats: TurnStats, conversation_id: str):
+    """Log each tool call made during the turn with its timing."""
+    for call in stats.tool_calls:
+        conversation_logger.log_tool_usage(
+            call["name"],
+            call["args"],
+            call["output"],
+            conversation_id,
+            {"status": call["status"], "seconds": round(call["seconds"], 4)},
+        )
+
 
-        # Send completion signal
-        yield f"data: {json.dumps({'type': 'done', 'timestamp': get_timestamp()})}\n\n"
+def record_cancelled_turn(
+    stats: TurnStats,
+    conversation_id: str,
+    response_parts: List[str],
+    cache_layer: Optional[str],
+):
+    """Log and count a turn whose client left mid-answer.
+
+    The partial answer is neither cached nor added to the session, since the
+    turn never completed. Synchronous, so it also runs inside a cancelled task.
+    """
+    partial_response = "".join(response_parts)
+    tokens_saved = stats.record_cancelled(partial_response)
+    log_tool_calls(stats, conversation_id)
+    conversation_logger.log_assistant_response(
+        partial_response,
+        conversation_id,
+        {
+            "stream": True,
+            "endpoint": "stream",
+            "status": "cancelled",
+            "chunks_count": len(response_parts),
+            "cached": cache_layer,
+            "usage": stats.to_dict(),
+            "timings": stats.timings(),
+            "route": stats.route,
+            "tokens_saved_estimate": tokens_saved,
+        },
+    )
+    logger.info(
+        f"Client disconnected from {conversation_id}; cancelled the turn "
+        f"(~{tokens_saved} tokens saved)"
+    )
+
+
+async def resolve_session(chat_request: ChatRequest) -> Session:
+    """Load the request's session, or start a new one.
+
+    A stored session is only created when the client asks for one. Clients
+    that resend the transcript every turn never send its id back, so storing
+    their turns would only leave an orphaned session behind on each request.
+    """
+    if chat_request.conversation_id:
+        session = await session_store.get(chat_request.conversation_id)
+        if session is None:
+            raise HTTPException(status_code=404, detail="Unknown conversation_id")
+        return session
+    if chat_request.session:
+        return await session_store.create()
+    return session_store.ephemeral()
+
+
+async def stream_response(
+    request: ChatRequest,
+    session: Session,
+    http_request: Optional[Request] = None,
+    slot: Optional[Slot] = None,
+) -> AsyncGenerator[str, None]:
+    """Stream chat response as Server-Sent Events.
+
+    If ``http_request`` is given, a client disconnect cancels the upstream
+    model stream and any running tool calls instead of generating an answer
+    nobody will read. Below ASGI spec 2.4 Starlette detects the disconnect
+    and cancels this generator; otherwise it is watched for here. The
+    admission ``slot``, if any, is held until the stream ends, and the
+    tokens the turn used are then charged to the client's rate limit.
+    """
+    stats = TurnStats()
+    disconnect = None
+    if http_request is not None and not starlette_watches_disconnect(http_request):
+        disconnect = asyncio.create_task(wait_for_disconnect(http_request))
+    try:
+        async with session.lock:
+            if not await session_store.refresh(session):
+                raise ValueError("Conversation expired")
+            async with aclosing(
+                _stream_turn(request, session, stats, disconnect)
+            ) as frames:
+                async for frame in frames:
+                    yield frame
 
     except Exception as e:
         logger.error(f"Error in stream_response: {str(e)}")
@@ -80,29 +189,183 @@ async def stream_response(request: ChatRequest) -> AsyncGenerator[str, None]:
             {"type": "error", "content": str(e), "timestamp": get_timestamp()}
         )
         yield f"data: {error_data}\n\n"
+    finally:
+        if disconnect is not None:
+            disconnect.cancel()
+        if slot is not None:
+            slot.release()
+        if http_request is not None:
+            # Not awaited: if the client disconnected, this task is cancelled
+            rate_limiter.charge_later(
+                http_request, stats.input_tokens + stats.output_tokens
+            )
+
+
+async def _stream_turn(
+    request: ChatRequest,
+    session: Session,
+    stats: TurnStats,
+    disconnect: Optional[asyncio.Task],
+) -> AsyncGenerator[str, None]:
+    """Run one streamed turn; the caller holds the session lock."""
+    start = time.perf_counter()
+    # Convert messages to format expected by chatbot
+    new_messages = [(msg.role, msg.content) for msg in request.messages]
+    messages = session.messages + new_messages
 
+    # Log user message under the session's conversation ID
+    conversation_id = session.id
+    last_user_msg = messages[-1][1] if messages[-1][0] == "user" else ""
+    if last_user_msg:
+        conversation_logger.log_user_message(
+            last_user_msg, {"stream": True, "endpoint": "stream"}, conversation_id
+        )
+
+    # Get chatbot and stream the response
+    chatbot = get_chatbot()
+    cache_key, cached, cache_layer = lookup_cached_response(messages, chatbot.version)
+    if cached is not None:
+        chunks = replay_response(cached)
+    else:
+        # Earlier turns are already converted; only the new messages are
+        chunks = chatbot.astream(session.lc_messages + new_messages, stats)
+
+    # Coalesce tokens so each socket write carries several frames
+    encoder = SSEEncoder(timestamps=request.sse_timestamps, batched=request.sse_batch)
+    response_parts = []
+    batches = coalesce(
+        chunks, settings.sse_flush_interval, settings.sse_flush_bytes, disconnect
+    )
+    try:
+        async with aclosing(batches):
+            async for batch in batches:
+                if not response_parts:
+                    stats.ttft_seconds = time.perf_counter() - start
+                response_parts.extend(batch)
+                yield encoder.encode(batch)
+    except (asyncio.CancelledError, GeneratorExit):
+        # Starlette cancelled the response because the client left. Nothing
+        # may be awaited from here on, so the bookkeeping is synchronous
+        stats.total_seconds = time.perf_counter() - start
+        record_cancelled_turn(stats, conversation_id, response_parts, cache_layer)
+        raise
+
+    if disconnect is not None and disconnect.done() and not disconnect.cancelled():
+        stats.total_seconds = time.perf_counter() - start
+        record_cancelled_turn(stats, conversation_id, response_parts, cache_layer)
+        return
 
-async def _chat_handler(chat_request: ChatRequest):
+    # Log complete response with same conversation ID
+    stats.total_seconds = time.perf_counter() - start
+    stats.record_metrics("stream", cache_layer)
+    full_response = "".join(response_parts)
+    # Caches and history keep the answer without the tool progress indicators
+    answer = "".join(
+        part for part in response_parts if not isinstance(part, ToolIndicator)
+    )
+    if cached is None:
+        store_response(messages, cache_key, answer, chatbot.version, stats)
+    await session_store.append(session, new_messages + [("assistant", answer)])
+    log_tool_calls(stats, conversation_id)
+    if full_response:
+        conversation_logger.log_assistant_response(
+            full_response,
+            conversation_id,
+            {
+                "stream": True,
+                "endpoint": "stream",
+                "chunks_count": len(response_parts),
+                "cached": cache_layer,
+                "usage": stats.to_dict(),
+                "timings": stats.timings(),
+                "route": stats.route,
+            },
+        )
+
+    # Send completion signal
+    done = {"type": "done", "timestamp": get_timestamp()}
+    if session.persistent:
+        done["conversation_id"] = session.id
+    yield f"data: {json.dumps(done)}\n\n"
+
+
+async def acquire_slot() -> Slot:
+    """Wait for an admission slot, or shed the request with a 503."""
+    try:
+        return await admission_gate.acquire()
+    except Overloaded as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+async def _chat_handler(
+    chat_request: ChatRequest, http_request: Optional[Request] = None
+):
     """Internal chat handler logic."""
+    # Admission first, so a shed request leaves no new session behind
+    slot = await acquire_slot()
+    try:
+        session = await resolve_session(chat_request)
+    except BaseException:
+        slot.release()
+        raise
     if chat_request.stream:
+        headers = {
+            "Cache-Control": "no-cache",
+            "Connection": "keep-alive",
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Allow-Headers": "*",
+            "X-Accel-Buffering": "no",  # Disable nginx buffering
+            "Transfer-Encoding": "chunked",  # Enable chunked transfer
+        }
+        if session.persistent:
+            headers["X-Conversation-Id"] = session.id
+        # The generator releases the slot when it finishes; the background task
+        # covers a client that disconnects before the stream ever starts
         return StreamingResponse(
-            stream_response(chat_request),
+            stream_response(chat_request, session, http_request, slot),
             media_type="text/event-stream",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "Access-Control-Allow-Origin": "*",
-                "Access-Control-Allow-Headers": "*",
-                "X-Accel-Buffering": "no",  # Disable nginx buffering
-                "Transfer-Encoding": "chunked",  # Enable chunked transfer
-            },
+            background=BackgroundTask(slot.release),
+            headers=headers,
         )
     else:
         # Non-streaming response
         try:
-            messages = [(msg.role, msg.content) for msg in chat_request.messages]
-            chatbot = get_chatbot()
-            response = await chatbot.ainvoke(messages)
+            start = time.perf_counter()
+            async with slot, session.lock:
+                if not await session_store.refresh(session):
+                    raise HTTPException(status_code=404, detail="Conversation expired")
+                new_messages = [
+                    (msg.role, msg.content) for msg in chat_request.messages
+                ]
+                messages = session.messages + new_messages
+                chatbot = get_chatbot()
+                cache_key, cached, cache_layer = lookup_cached_response(
+                    messages, chatbot.version
+                )
+                stats = TurnStats()
+                if cached is not None:
+                    response = cached
+                else:
+                    response = await chatbot.ainvoke(
+                        session.lc_messages + new_messages, stats
+                    )
+                    store_response(
+                        messages, cache_key, response, chatbot.version, stats
+                    )
+                await session_store.append(
+                    session, new_messages + [("assistant", response)]
+                )
+            stats.total_seconds = time.perf_counter() - start
+            stats.record_metrics("non_stream", cache_layer)
+            log_tool_calls(stats, session.id)
+            if http_request is not None:
+                await rate_limiter.charge(
+                    http_request, stats.input_tokens + stats.output_tokens
+                )
 
             # Log the conversation with structured format
             if messages:
@@ -111,17 +374,35 @@ async def _chat_handler(chat_request: ChatRequest):
                     conversation_logger.log_conversation(
                         last_user_msg,
                         response,
-                        {"stream": False, "endpoint": "non_stream"},
+                        {
+                            "stream": False,
+                            "endpoint": "non_stream",
+                            "cached": cache_layer,
+                            "usage": stats.to_dict(),
+                            "timings": stats.timings(),
+                            "route": stats.route,
+                        },
+                        session.id,
                     )
 
-            return ChatResponse(response=response)
+            # Only stored sessions can be continued, so only they get an id
+            conversation_id = session.id if session.persistent else None
+            return ChatResponse(response=response, conversation_id=conversation_id)
+        except HTTPException:
+            raise
+        except UpstreamUnavailable as e:
+            logger.warning(f"Upstream unavailable: {str(e)}")
+            raise HTTPException(
+                status_code=503,
+                detail=str(e),
+                headers={"Retry-After": str(round(settings.breaker_reset_timeout))},
+            )
         except Exception as e:
             logger.error(f"Error in chat endpoint: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/chat", dependencies=[Depends(verify_api_key)])
+@router.post("/chat", dependencies=[Depends(verify_api_key), Depends(chat_rate_limit)])
 async def chat(request: Request, chat_request: ChatRequest):
     """Chat endpoint with rate limiting and API key authentication."""
-    # Rate limiting will be applied by decorator when limiter is set
-    return await _chat_handler(chat_request)
+    return await _chat_handler(chat_request, request)
@@ -0,0 +1,148 @@
+import asyncio
+from datetime import datetime, timezone
+from json.encoder import encode_basestring_ascii
+from typing import AsyncIterator, List, Optional
+
+from starlette.requests import Request
+
+
+def get_timestamp() -> str:
+    """Get current ISO timestamp."""
+    return datetime.now(timezone.utc).isoformat()
+
+
+def starlette_watches_disconnect(request: Request) -> bool:
+    """Whether StreamingResponse itself listens for the client leaving.
+
+    Below ASGI spec 2.4 it reads the receive channel and cancels the response
+    task on ``http.disconnect``, so a second reader would only race it for
+    that message.
+    """
+    version = request.scope.get("asgi", {}).get("spec_version", "2.0")
+    return tuple(map(int, version.split("."))) < (2, 4)
+
+
+async def wait_for_disconnect(request: Request):
+    """Return once the client closes the connection.
+
+    The request body has already been read, so the only message left on the
+    receive channel is ``http.disconnect``. Only for servers on ASGI spec 2.4
+    or later; see ``starlette_watches_disconnect``.
+    """
+    while True:
+        message = await request.receive()
+        if message["type"] == "http.disconnect":
+            return
+
+
+async def coalesce(
+    chunks: AsyncIterator[str],
+    max_delay: float,
+    max_bytes: int,
+    stop: Optional[asyncio.Future] = None,
+) -> AsyncIterator[List[str]]:
+    """
+    Group a chunk stream into batches flushed on a time or size threshold.
+
+    The first chunk is flushed immediately so time-to-first-token is not
+    delayed. After that, a batch is flushed once it holds ``max_bytes``
+    characters or ``max_delay`` seconds after its first chunk arrived,
+    whichever comes first. The pending ``__anext__`` keeps running across a
+    timed flush rather than being cancelled, so no chunk is lost.
+
+    If ``stop`` completes first (e.g. the client disconnected), the pending
+    ``__anext__`` is cancelled, which cancels the upstream generator
+    wherever it is waiting, the generator is closed, and the stream ends
+    without flushing.
+
+    Args:
+        chunks: Upstream text chunks
+        max_delay: Seconds a chunk may wait for more to join it
+        max_bytes: Characters that trigger an immediate flush
+        stop: Optional future that ends the stream early
+
+    Yields:
+        Non-empty lists of chunks, in order
+    """
+    loop = asyncio.get_running_loop()
+    iterator = chunks.__aiter__()
+    pending: Optional[asyncio.Future] = None
+    batch: List[str] = []
+    size = 0
+    deadline = 0.0
+    first = True
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            timeout = max(0.0, deadline - loop.time()) if batch else None
+            waiting = {pending} if stop is None else {pending, stop}
+            done, _ = await asyncio.wait(
+                waiting, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+            )
+            if stop is not None and stop in done:
+                return
+            if not done:
+                yield batch
+                batch, size = [], 0
+                continue
+
+            future, pending = pending, None
+            try:
+                chunk = future.result()
+            except StopAsyncIteration:
+                break
+            if not batch:
+                deadline = loop.time() + max_delay
+            batch.append(chunk)
+            size += len(chunk)
+            if first or size >= max_bytes:
+                first = False
+                yield batch
+                batch, size = [], 0
+        if batch:
+            yield batch
+    finally:
+        if pending is not None:
+            pending.cancel()
+            # Let the upstream generator unwind before returning
+            await asyncio.wait({pending})
+        # Close the upstream generator even when no __anext__ was in flight
+        # (stopped between chunks), rather than leaving it to garbage collection
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            await aclose()
+
+
+class SSEEncoder:
+    """Encodes token batches as SSE frames without a json.dumps per token.
+
+    By default every chunk still gets its own ``token`` frame, byte-for-byte
+    what ``json.dumps({"type": "token", "content": ..., "timestamp": ...})``
+    produced, but a whole batch is joined into one write and shares one
+    timestamp. Clients that opt into batched frames get one ``token`` frame
+    per batch, and clients may opt out of timestamps.
+    """
+
+    def __init__(self, timestamps: bool = True, batched: bool = False):
+        self.timestamps = timestamps
+        self.batched = batched
+        self._parts: List[str] = []
+
+    def encode(self, chunks: List[str]) -> str:
+        """Encode a batch of chunks as one string of SSE frames."""
+        if self.timestamps:
+            suffix = f', "timestamp": "{get_timestamp()}"}}\n\n'
+        else:
+            suffix = "}\n\n"
+        if self.batched:
+            chunks = ["".join(chunks)]
+
+        parts = self._parts
+        for chunk in chunks:
+            parts.append('data: {"type": "token", "content": ')
+            parts.append(encode_basestring_ascii(chunk))
+            parts.append(suffix)
+        frames = "".join(parts)
+        parts.clear()
+        return frames
@@ -1,41 +1,116 @@
+import hashlib
 import logging
-from typing import List, Tuple, AsyncIterator, Dict, Any
+import time
+from typing import List, Optional, Tuple, AsyncIterator, Any, Union
 from langchain_anthropic import ChatAnthropic
+from langchain_anthropic.chat_models import convert_to_anthropic_tool
 from langchain.schema import HumanMessage, AIMessage, SystemMessage
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import BaseMessage, ToolMessage
 import json
 
 from artemis.config import settings
 from artemis.chatbot.prompt import SYSTEM_PROMPT
 from artemis.chatbot.tools import get_tools
+from artemis.chatbot.executor import ToolExecutor
+from artemis.chatbot.history import HistoryManager
+from artemis.chatbot.resilience import UpstreamPolicy
+from artemis.chatbot.router import FAST, PRIMARY, query_router
+from artemis.chatbot.stats import TurnStats
 
 logger = logging.getLogger(__name__)
 
+# Anthropic prompt-cache breakpoint; the cached prefix lives for ~5 minutes
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# A (role, content) tuple, or a message already converted by a session
+ChatInput = Union[Tuple[str, str], BaseMessage]
+
+
+class ToolIndicator(str):
+    """Progress text streamed while tools run; not part of the answer itself."""
+
 
 class ArtemisAgent:
     def __init__(self):
-        self.llm = ChatAnthropic(
+        # Get available tools
+        self.tools = get_tools()
+
+        self.llm, self.llm_with_tools = self._build_llm(
+            settings.model_name, settings.max_tokens
+        )
+        models = [(settings.model_name, self.llm_with_tools)]
+        if settings.fallback_model_name:
+            _, fallback = self._build_llm(
+                settings.fallback_model_name, settings.max_tokens
+            )
+            models.append((settings.fallback_model_name, fallback))
+        # Retries, failover and circuit breaking for every LLM call
+        self.upstream = UpstreamPolicy(models)
+
+        # Simple lookups go to the fast model, which fails over to the primary
+        _, fast = self._build_llm(settings.fast_model_name, settings.fast_max_tokens)
+        self.router = query_router
+        self.upstreams = {
+            PRIMARY: self.upstream,
+            FAST: UpstreamPolicy([(settings.fast_model_name, fast)] + models),
+        }
+
+        self.executor = ToolExecutor(self.tools)
+        self.history = HistoryManager()
+
+        # Identifies the prompt and tool definitions, for cache keys
+        self.version = hashlib.sha256(
+            json.dumps(
+                [SYSTEM_PROMPT, [(t.name, t.description, t.args) for t in self.tools]],
+                sort_keys=True,
+            ).encode("utf-8")
+        ).hexdigest()[:16]
+
+    def _build_llm(self, model_name: str, max_tokens: int) -> Tuple[ChatAnthropic, Any]:
+        """Build a chat model and its tool-bound variant."""
+        llm = ChatAnthropic(
             anthropic_api_key=settings.anthropic_api_key,
-            model_name=settings.model_name,
+            model_name=model_name,
             temperature=settings.temperature,
-            max_tokens=settings.max_tokens,
+            max_tokens=max_tokens,
             streaming=True,
+            # UpstreamPolicy owns retries, so the SDK must not retry as well
+            max_retries=0,
         )
 
-        # Get available tools
-        self.tools = get_tools()
-
         # If we have tools, bind them to the LLM
         if self.tools:
-            self.llm_with_tools = self.llm.bind_tools(self.tools)
-        else:
-            self.llm_with_tools = self.llm
+            return llm, llm.bind_tools(self._tool_definitions())
+        return llm, llm
+
+    def _route(self, messages: List[ChatInput], stats: TurnStats) -> UpstreamPolicy:
+        """Pick the model for this turn and record the decision."""
+        decision = self.router.route(messages)
+        stats.route = decision.to_dict()
+        return self.upstreams[decision.route]
+
+    def _tool_definitions(self) -> List[Any]:
+        """Tool definitions for bind_tools, with a cache breakpoint if enabled."""
+        if not settings.prompt_caching:
+            return self.tools
+        definitions = [convert_to_anthropic_tool(tool) for tool in self.tools]
+        # A breakpoint on the last tool caches every tool definition before it
+        definitions[-1] = {**definitions[-1], "cache_control": CACHE_CONTROL}
+        return definitions
 
-    def _convert_messages(self, messages: List[Tuple[str, str]]) -> List[BaseMessage]:
-        """Convert message tuples to LangChain message objects."""
+    def _convert_messages(self, messages: List[ChatInput]) -> List[BaseMessage]:
+        """Convert message tuples to LangChain message objects.
+
+        Items that are already LangChain messages (e.g. a session's cached
+        history) are passed through unchanged.
+        """
         langchain_messages = []
 
-        for role, content in messages:
+        for message in messages:
+            if isinstance(message, BaseMessage):
+                langchain_messages.append(message)
+                continue
+            role, content = message
             if role == "user":
                 langchain_messages.append(HumanMessage(content=content))
             elif role == "assistant":
@@ -43,10 +118,52 @@ class ArtemisAgent:
 
         return langchain_messages
 
-    def _prepare_messages(self, messages: List[Tuple[str, str]]) -> List[BaseMessage]:
-        """Prepare messages with system prompt."""
+    async def _prepare_messages(self, messages: List[ChatInput]) -> List[BaseMessage]:
+        """Prepare a fixed-size history with the system prompt.
+
+        Recent turns are kept verbatim; older turns arrive as a summary in a
+        second system block, after the cache breakpoint on the static prompt.
+        """
         langchain_messages = self._convert_messages(messages)
-        return [SystemMessage(content=SYSTEM_PROMPT)] + langchain_messages
+        recent, summary = await self.history.window(langchain_messages)
+
+        blocks = [{"type": "text", "text": SYSTEM_PROMPT}]
+        if settings.prompt_caching:
+            blocks[0]["cache_control"] = CACHE_CONTROL
+        if summary:
+            blocks.append(
+                {
+                    "type": "text",
+                    "text": f"Summary of the earlier conversation:\n{summary}",
+                }
+            )
+
+        if len(blocks) == 1 and not settings.prompt_caching:
+            system = SystemMessage(content=SYSTEM_PROMPT)
+        else:
+            system = SystemMessage(content=blocks)
+        return [system] + recent
+
+    def _tool_results(self, tool_messages: List[ToolMessage]) -> List[ToolMessage]:
+        """Mark the last tool result as a cache breakpoint if caching is enabled.
+
+        Tool outputs are deterministic for given arguments, so a follow-up turn
+        that repeats the same calls reuses the whole cached prefix.
+        """
+        if settings.prompt_caching and tool_messages:
+            last = tool_messages[-1]
+            tool_messages[-1] = last.model_copy(
+                update={
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": str(last.content),
+                            "cache_control": CACHE_CONTROL,
+                        }
+                    ]
+                }
+            )
+        return tool_messages
 
     def _extract_content(self, message) -> str:
         """Extract content from different message formats."""
@@ -71,39 +188,40 @@ class ArtemisAgent:
                 return str(content)
         return str(message)
 
-    async def ainvoke(self, messages: List[Tuple[str, str]]) -> str:
+    async def ainvoke(
+        self, messages: List[ChatInput], stats: Optional[TurnStats] = None
+    ) -> str:
         """Process messages and return a response."""
-        full_messages = self._prepare_messages(messages)
+        stats = stats or TurnStats()
+        upstream = self._route(messages, stats)
+        start = time.perf_counter()
+        full_messages = await self._prepare_messages(messages)
+        stats.history_seconds = time.perf_counter() - start
 
         # Invoke LLM with tools
-        response = await self.llm_with_tools.ainvoke(full_messages)
+        start = time.perf_counter()
+        response = await upstream.ainvoke(full_messages)
+        stats.first_llm_seconds = time.perf_counter() - start
+        stats.llm_calls += 1
+        stats.add_usage(getattr(response, "usage_metadata", None))
 
         # If there are tool calls, execute them
         if hasattr(response, "tool_calls") and response.tool_calls:
             # Add the assistant's message with tool calls
             full_messages.append(response)
 
-            # Execute each tool call
-            for tool_call in response.tool_calls:
-                tool_name = tool_call["name"]
-                tool_args = tool_call["args"]
-
-                # Find and execute the tool
-                for tool in self.tools:
-                    if tool.name == tool_name:
-                        tool_output = await tool.ainvoke(tool_args)
-                        # Add tool result as a message
-                        from langchain_core.messages import ToolMessage
-
-                        full_messages.append(
-                            ToolMessage(
-                                content=str(tool_output), tool_call_id=tool_call["id"]
-                            )
-                        )
-                        break
+            # Execute all tool calls concurrently; results come back in call order
+            start = time.perf_counter()
+            tool_messages = await self.executor.execute(response.tool_calls, stats)
+            stats.tools_seconds = time.perf_counter() - start
+            full_messages.extend(self._tool_results(tool_messages))
 
             # Get final response after tool execution
-            final_response = await self.llm_with_tools.ainvoke(full_messages)
+            start = time.perf_counter()
+            final_response = await upstream.ainvoke(full_messages)
+            stats.second_llm_seconds = time.perf_counter() - start
+            stats.llm_calls += 1
+            stats.add_usage(getattr(final_response, "usage_metadata", None))
             final_content = self._extract_content(final_response)
             logger.debug(f"Final response content: {final_content[:100]}...")
             return final_content
@@ -111,15 +229,25 @@ class ArtemisAgent:
             # No tool calls, return direct response
             return self._extract_content(response)
 
-    async def astream(self, messages: List[Tuple[str, str]]) -> AsyncIterator[str]:
+    async def astream(
+        self, messages: List[ChatInput], stats: Optional[TurnStats] = None
+    ) -> AsyncIterator[str]:
         """Stream response tokens with tool support."""
-        full_messages = self._prepare_messages(messages)
+        stats = stats or TurnStats()
+        upstream = self._route(messages, stats)
+        start = time.perf_counter()
+        full_messages = await self._prepare_messages(messages)
+        stats.history_seconds = time.perf_counter() - start
 
         # Stream the initial response
         tool_calls = []
         content_started = False
 
-        async for chunk in self.llm_with_tools.astream(full_messages):
+        # Stream timings include time the consumer spends between chunks
+        stats.llm_calls += 1
+        start = time.perf_counter()
+        async for chunk in upstream.astream(full_messages):
+            stats.add_usage(getattr(chunk, "usage_metadata", None))
             # Extract content from chunk
             if hasattr(chunk, "content") and chunk.content:
                 # Check if content is a list with text items
@@ -153,45 +281,35 @@ class ArtemisAgent:
                         if tool_call_chunk.get("id"):
                             tool_calls[index]["id"] = tool_call_chunk["id"]
 
+        stats.first_llm_seconds = time.perf_counter() - start
+
+        # Parse the accumulated tool call arguments
+        ready_calls = []
+        for tool_call in tool_calls:
+            if tool_call.get("args"):
+                try:
+                    tool_call["args"] = json.loads(tool_call["args"])
+                except json.JSONDecodeError:
+                    continue
+
+                # Only indicate which tool is being used, not the output
+                yield ToolIndicator(f"\n\n🔧 Using {tool_call['name']} tool...\n\n")
+                ready_calls.append(tool_call)
+
         # If there were tool calls, execute them
-        if tool_calls:
-            for tool_call in tool_calls:
-                if tool_call.get("args"):
-                    try:
-                        tool_args = json.loads(tool_call["args"])
-                    except json.JSONDecodeError:
-                        continue
-
-                    tool_name = tool_call["name"]
-                    # Only indicate which tool is being used, not the output
-                    yield f"\n\n🔧 Using {tool_name} tool...\n\n"
-
-                    # Find and execute the tool
-                    for tool in self.tools:
-                        if tool.name == tool_name:
-                            tool_output = await tool.ainvoke(tool_args)
-                            # Don't yield the tool output, just execute it
-
-                            # Add tool result to messages for final response
-                            from langchain_core.messages import ToolMessage
-
-                            # Parse the args if it's a string
-                            if isinstance(tool_call.get("args"), str):
-                                tool_call["args"] = json.loads(tool_call["args"])
-
-                            full_messages.append(
-                                AIMessage(content="", tool_calls=[tool_call])
-                            )
-                            full_messages.append(
-                                ToolMessage(
-                                    content=str(tool_output),
-                                    tool_call_id=tool_call["id"],
-                                )
-                            )
-                            break
+        if ready_calls:
+            # Execute all tool calls concurrently; results come back in call order
+            full_messages.append(AIMessage(content="", tool_calls=ready_calls))
+            start = time.perf_counter()
+            tool_messages = await self.executor.execute(ready_calls, stats)
+            stats.tools_seconds = time.perf_counter() - start
+            full_messages.extend(self._tool_results(tool_messages))
 
             # Stream final response after tool execution
-            async for chunk in self.llm_with_tools.astream(full_messages):
+            stats.llm_calls += 1
+            start = time.perf_counter()
+            async for chunk in upstream.astream(full_messages):
+                stats.add_usage(getattr(chunk, "usage_metadata", None))
                 # Extract content from chunk
                 if hasattr(chunk, "content") and chunk.content:
                     # Check if content is a list with text items
@@ -203,3 +321,4 @@ class ArtemisAgent:
                                     yield text
                     elif isinstance(chunk.content, str):
                         yield chunk.content
+            stats.second_llm_seconds = time.perf_counter() - start
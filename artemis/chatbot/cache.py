@@ -0,0 +1,62 @@
+import hashlib
+import json
+import re
+from typing import List, Optional, Tuple
+
+from artemis.config import settings
+from artemis.storage.lru import LRUCache
+
+_REPLAY_PIECE = re.compile(r"\s*\S+\s*|\s+")
+
+
+def normalize_content(content: str) -> str:
+    """Collapse whitespace and case so trivially different messages share a key."""
+    return " ".join(content.split()).lower()
+
+
+def replay_chunks(text: str) -> List[str]:
+    """Split a cached answer into word-sized chunks for streaming replay."""
+    return _REPLAY_PIECE.findall(text)
+
+
+class ResponseCache:
+    """Exact-match cache of final answers, keyed on the normalized history.
+
+    The key also covers model, temperature and a version hash of the system
+    prompt and tool definitions, so changing any of those invalidates entries.
+    """
+
+    def __init__(self):
+        self.cache = LRUCache(
+            max_entries=settings.response_cache_max_entries,
+            max_bytes=settings.response_cache_max_bytes,
+            ttl=settings.response_cache_ttl,
+            sizeof=lambda text: len(text.encode("utf-8")),
+        )
+
+    def make_key(self, messages: List[Tuple[str, str]], version: str) -> str:
+        payload = json.dumps(
+            [
+                settings.model_name,
+                settings.temperature,
+                version,
+                [(role, normalize_content(content)) for role, content in messages],
+            ]
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        if not settings.response_cache_enabled:
+            return None
+        return self.cache.get(key)
+
+    def set(self, key: str, response: str):
+        if settings.response_cache_enabled and response:
+            self.cache.set(key, response)
+
+    def stats(self):
+        return self.cache.stats()
+
+
+# Global instance
+response_cache = ResponseCache()
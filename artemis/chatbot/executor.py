@@ -0,0 +1,116 @@
+import asyncio
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from langchain_core.messages import ToolMessage
+from langchain_core.tools import BaseTool
+
+from artemis.chatbot.stats import TurnStats
+from artemis.config import settings
+from artemis.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+TOOL_SECONDS = Histogram(
+    "artemis_tool_seconds",
+    "Duration of each tool call, by tool and outcome",
+    ["tool", "status"],
+)
+
+
+class ToolExecutor:
+    """Run the tool calls from one assistant turn concurrently.
+
+    Each tool gets its own timeout and concurrency cap. Results are returned
+    in the order the calls were made, and a failing or timed-out tool yields an
+    error ToolMessage instead of failing the whole turn.
+    """
+
+    def __init__(
+        self,
+        tools: List[BaseTool],
+        timeout: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        timeouts: Optional[Dict[str, float]] = None,
+    ):
+        self.tools = {tool.name: tool for tool in tools}
+        self.timeout = timeout if timeout is not None else settings.tool_timeout
+        self.timeouts = timeouts or {}
+        limit = (
+            max_concurrency
+            if max_concurrency is not None
+            else settings.tool_max_concurrency
+        )
+        self._semaphores = {name: asyncio.Semaphore(limit) for name in self.tools}
+
+    def _error_message(self, tool_call: Dict[str, Any], error: str, detail: str):
+        """Build a structured error ToolMessage for a failed tool call."""
+        content = json.dumps(
+            {"error": error, "tool": tool_call["name"], "detail": detail}
+        )
+        return ToolMessage(
+            content=content,
+            tool_call_id=tool_call["id"],
+            name=tool_call["name"],
+            status="error",
+        )
+
+    async def _invoke(self, tool_call: Dict[str, Any]) -> Tuple[ToolMessage, str]:
+        """Execute a single tool call under its timeout and concurrency cap.
+
+        Returns:
+            (tool message, status: ok, timeout, tool_error or unknown_tool)
+        """
+        tool_name = tool_call["name"]
+        tool = self.tools.get(tool_name)
+        if tool is None:
+            message = self._error_message(
+                tool_call, "unknown_tool", f"No tool named '{tool_name}'"
+            )
+            return message, "unknown_tool"
+
+        timeout = self.timeouts.get(tool_name, self.timeout)
+        try:
+            # Waiting for a slot counts against the timeout, so a backed-up
+            # tool cannot hold a turn for longer than the call itself could
+            async with asyncio.timeout(timeout):
+                async with self._semaphores[tool_name]:
+                    tool_output = await tool.ainvoke(tool_call["args"])
+        except asyncio.TimeoutError:
+            logger.warning(f"Tool {tool_name} timed out after {timeout}s")
+            message = self._error_message(
+                tool_call, "timeout", f"Tool did not finish within {timeout} seconds"
+            )
+            return message, "timeout"
+        except Exception as e:
+            logger.error(f"Tool {tool_name} failed: {str(e)}")
+            return self._error_message(tool_call, "tool_error", str(e)), "tool_error"
+
+        message = ToolMessage(
+            content=str(tool_output), tool_call_id=tool_call["id"], name=tool_name
+        )
+        return message, "ok"
+
+    async def _run_one(
+        self, tool_call: Dict[str, Any], stats: Optional[TurnStats]
+    ) -> ToolMessage:
+        """Execute a single tool call and record how long it took."""
+        start = time.perf_counter()
+        message, status = await self._invoke(tool_call)
+        elapsed = time.perf_counter() - start
+        TOOL_SECONDS.observe(elapsed, tool=tool_call["name"], status=status)
+        if stats is not None:
+            stats.add_tool_call(
+                tool_call["name"], tool_call["args"], status, elapsed, message.content
+            )
+        return message
+
+    async def execute(
+        self, tool_calls: List[Dict[str, Any]], stats: Optional[TurnStats] = None
+    ) -> List[ToolMessage]:
+        """Execute all tool calls at once and return results in call order."""
+        return list(
+            await asyncio.gather(*(self._run_one(tc, stats) for tc in tool_calls))
+        )
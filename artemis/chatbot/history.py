@@ -0,0 +1,172 @@
+import asyncio
+import hashlib
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from langchain_anthropic import ChatAnthropic
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+
+from artemis.config import settings
+from artemis.storage.lru import LRUCache
+from artemis.tokens import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_PROMPT = """You maintain a running summary of a conversation between a visitor and Artemis, an assistant that answers questions about Peter Wills.
+
+Update the existing summary with the new messages. Keep facts the visitor shared, what they asked about, and what Artemis told them, so later answers stay consistent. Write compact prose, at most {max_words} words. Return only the summary."""
+
+
+def _text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(item.get("text", "") for item in content if isinstance(item, dict))
+
+
+def _role(message: BaseMessage) -> str:
+    return "Visitor" if isinstance(message, HumanMessage) else "Artemis"
+
+
+class HistoryManager:
+    """Keeps the history sent to the model at a fixed size.
+
+    The last ``history_keep_turns`` turns are sent verbatim (fewer if they
+    exceed ``history_max_tokens``); everything older is folded into a rolling
+    summary. Summaries are cached by a hash of the history they cover, so each
+    turn only summarizes the messages that newly fell out of the window.
+
+    The summarizer never runs on the request path: on a cache miss the turn
+    gets an extractive summary at once, and the model's summary is written in
+    the background for the turns that follow.
+    """
+
+    def __init__(self):
+        self._summaries = LRUCache(
+            max_entries=settings.history_summary_cache_entries,
+            max_bytes=settings.history_summary_cache_entries * 4096,
+        )
+        self._llm = None
+        self._pending: Dict[str, asyncio.Task] = {}  # history hash -> summary task
+
+    def _summarizer(self) -> ChatAnthropic:
+        if self._llm is None:
+            self._llm = ChatAnthropic(
+                anthropic_api_key=settings.anthropic_api_key,
+                model_name=settings.fast_model_name,
+                temperature=0,
+                max_tokens=settings.history_summary_tokens,
+            )
+        return self._llm
+
+    def _split(
+        self, messages: List[BaseMessage]
+    ) -> Tuple[List[BaseMessage], List[BaseMessage]]:
+        """Split messages into (older, recent) on a turn boundary."""
+        turn_starts = [
+            i for i, message in enumerate(messages) if isinstance(message, HumanMessage)
+        ]
+        if not turn_starts:
+            return [], messages
+
+        kept = turn_starts[-settings.history_keep_turns :]
+        start = kept[0]
+        # Drop further whole turns if the verbatim window is still too large,
+        # but always keep the current turn
+        while start != kept[-1] and (
+            sum(estimate_tokens(_text(m)) for m in messages[start:])
+            > settings.history_max_tokens
+        ):
+            kept = kept[1:]
+            start = kept[0]
+        return messages[:start], messages[start:]
+
+    @staticmethod
+    def _extract(previous: Optional[str], new_messages: List[BaseMessage]) -> str:
+        """Append new messages to the previous summary, keeping the newest text."""
+        transcript = "\n".join(f"{_role(m)}: {_text(m)}" for m in new_messages)
+        summary = "\n".join(filter(None, [previous, transcript]))
+        return summary[-settings.history_summary_tokens * 4 :]
+
+    async def _summarize(
+        self, previous: Optional[str], new_messages: List[BaseMessage]
+    ) -> str:
+        """Fold new messages into the previous summary."""
+        transcript = "\n".join(f"{_role(m)}: {_text(m)}" for m in new_messages)
+        max_chars = settings.history_summary_tokens * 4
+        try:
+            response = await self._summarizer().ainvoke(
+                [
+                    SystemMessage(
+                        content=SUMMARY_PROMPT.format(
+                            max_words=settings.history_summary_tokens * 3 // 4
+                        )
+                    ),
+                    HumanMessage(
+                        content=f"Existing summary:\n{previous or '(none)'}\n\n"
+                        f"New messages:\n{transcript}"
+                    ),
+                ]
+            )
+            summary = _text(response).strip()
+        except Exception as e:
+            logger.warning(f"History summarization failed: {str(e)}")
+            return self._extract(previous, new_messages)
+        return summary[:max_chars]
+
+    async def _summarize_into(
+        self, key: str, previous: Optional[str], new_messages: List[BaseMessage]
+    ):
+        """Summarize in the background and cache the result under ``key``."""
+        try:
+            summary = await self._summarize(previous, new_messages)
+            self._summaries.set(key, summary)
+            logger.info(
+                f"Summarized {len(new_messages)} messages into "
+                f"{estimate_tokens(summary)} tokens"
+            )
+        finally:
+            self._pending.pop(key, None)
+
+    async def window(
+        self, messages: List[BaseMessage]
+    ) -> Tuple[List[BaseMessage], Optional[str]]:
+        """
+        Return the recent messages to send verbatim and a summary of the rest.
+
+        Args:
+            messages: Full conversation history, oldest first
+
+        Returns:
+            (recent messages, summary of older messages or None)
+        """
+        older, recent = self._split(messages)
+        if not older:
+            return recent, None
+
+        # Rolling hashes of every turn-aligned prefix of the older messages
+        prefix_hashes = []
+        digest = hashlib.sha256()
+        for i, message in enumerate(older):
+            digest.update(f"{_role(message)}\x00{_text(message)}\x00".encode("utf-8"))
+            if i + 1 == len(older) or isinstance(older[i + 1], HumanMessage):
+                prefix_hashes.append((i + 1, digest.copy().hexdigest()))
+
+        # Reuse the longest prefix that has already been summarized
+        full_hash = prefix_hashes[-1][1]
+        summary = self._summaries.get(full_hash)
+        if summary is not None:
+            return recent, summary
+
+        covered, previous = 0, None
+        for end, prefix_hash in reversed(prefix_hashes[:-1]):
+            previous = self._summaries.get(prefix_hash)
+            if previous is not None:
+                covered = end
+                break
+
+        if full_hash not in self._pending:
+            self._pending[full_hash] = asyncio.create_task(
+                self._summarize_into(full_hash, previous, older[covered:])
+            )
+        return recent, self._extract(previous, older[covered:])
@@ -0,0 +1,268 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from langchain_core.runnables import Runnable
+
+from artemis.config import settings
+from artemis.metrics import Counter, Gauge
+
+logger = logging.getLogger(__name__)
+
+# HTTP statuses worth retrying: rate limited, server errors and overloaded
+RETRYABLE_STATUS = {429, 500, 502, 503, 529}
+# Error types Anthropic reports in the body, including mid-stream error events
+RETRYABLE_ERROR_TYPES = ("overloaded_error", "rate_limit_error", "api_error")
+# Transport failures, matched by name so the SDK need not be imported here
+RETRYABLE_EXCEPTIONS = ("APIConnectionError", "APITimeoutError", "TimeoutError")
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+BREAKER_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+RETRIES = Counter(
+    "artemis_upstream_retries_total",
+    "LLM calls retried after a retryable upstream error, by model and reason",
+    ["model", "reason"],
+)
+FAILOVERS = Counter(
+    "artemis_upstream_failovers_total",
+    "LLM calls that moved on from a model, by the model given up on",
+    ["model"],
+)
+
+
+class UpstreamUnavailable(Exception):
+    """Every model failed with retryable errors or has its breaker open."""
+
+
+def retry_reason(error: BaseException) -> Optional[str]:
+    """Return a short reason if ``error`` is worth retrying, else None."""
+    status = getattr(error, "status_code", None)
+    if status in RETRYABLE_STATUS:
+        return str(status)
+    message = str(error)
+    for error_type in RETRYABLE_ERROR_TYPES:
+        if error_type in message:
+            return error_type
+    for cls in type(error).__mro__:
+        if cls.__name__ in RETRYABLE_EXCEPTIONS:
+            return cls.__name__
+    return None
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given (0-based) retry."""
+    ceiling = min(settings.upstream_backoff_max, settings.upstream_backoff * 2**attempt)
+    return random.uniform(0, ceiling)
+
+
+def _chunk_has_text(chunk: Any) -> bool:
+    content = getattr(chunk, "content", None)
+    if isinstance(content, str):
+        return bool(content)
+    if isinstance(content, list):
+        return any(
+            isinstance(item, dict) and item.get("type") == "text" and item.get("text")
+            for item in content
+        )
+    return False
+
+
+class CircuitBreaker:
+    """Per-model breaker that stops calls to a model that keeps failing.
+
+    After ``failure_threshold`` consecutive retryable failures the breaker
+    opens and the model is skipped for ``reset_timeout`` seconds. Then one
+    trial call is let through (half-open): success closes the breaker and
+    failure opens it again.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = 0.0
+        self._state = CLOSED
+        # When the half-open trial call started; a trial that never reports
+        # back (e.g. it was cancelled) expires after reset_timeout
+        self._trial_started: Optional[float] = None
+
+    @property
+    def state(self) -> str:
+        if self._state == OPEN:
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return HALF_OPEN
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go to this model now."""
+        state = self.state
+        if state == CLOSED:
+            return True
+        if state == OPEN:
+            return False
+        now = time.monotonic()
+        if (
+            self._trial_started is not None
+            and now - self._trial_started < self.reset_timeout
+        ):
+            return False
+        self._state = HALF_OPEN
+        self._trial_started = now
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self._state = CLOSED
+        self._trial_started = None
+
+    def record_failure(self):
+        self.failures += 1
+        self._trial_started = None
+        if self._state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self._state = OPEN
+            self.opened_at = time.monotonic()
+
+
+# Breakers are per model and shared by every caller in the process
+_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_breaker(model: str) -> CircuitBreaker:
+    breaker = _breakers.get(model)
+    if breaker is None:
+        breaker = _breakers.setdefault(
+            model,
+            CircuitBreaker(
+                settings.breaker_failure_threshold, settings.breaker_reset_timeout
+            ),
+        )
+    return breaker
+
+
+Gauge(
+    "artemis_upstream_breaker_state",
+    "Circuit breaker state per model (0 closed, 1 half-open, 2 open)",
+    ["model"],
+    function=lambda: {
+        (model,): BREAKER_STATE_VALUES[breaker.state]
+        for model, breaker in _breakers.items()
+    },
+)
+
+
+class UpstreamPolicy:
+    """Retry, failover and circuit breaking around the agent's LLM calls.
+
+    Models are tried in order (primary first, then the fallback). Each model
+    gets ``upstream_max_attempts`` tries with jittered exponential backoff
+    between them; errors that are not retryable are raised at once. Streams
+    are only retried until their first text chunk has been handed on, so a
+    client never sees a partial answer followed by a different one.
+    """
+
+    def __init__(self, models: List[Tuple[str, Runnable]]):
+        self.models = models
+        self.breakers = {name: get_breaker(name) for name, _ in models}
+
+    def _failed(
+        self, name: str, error: BaseException, reason: str, attempt: int
+    ) -> bool:
+        """Record a retryable failure; return whether to try this model again."""
+        breaker = self.breakers[name]
+        breaker.record_failure()
+        logger.warning(
+            f"LLM call to {name} failed (attempt {attempt + 1}, {reason}): "
+            f"{str(error)}; breaker {breaker.state}"
+        )
+        if breaker.state != CLOSED or attempt + 1 >= settings.upstream_max_attempts:
+            return False
+        RETRIES.inc(model=name, reason=reason)
+        return True
+
+    def _unavailable(self, last_error: Optional[BaseException]):
+        if last_error is None:
+            return UpstreamUnavailable(
+                "All models are temporarily unavailable (circuit open)"
+            )
+        return UpstreamUnavailable(f"Upstream unavailable: {str(last_error)}")
+
+    async def ainvoke(self, messages: List[Any]) -> Any:
+        """Invoke the first model that answers."""
+        last_error: Optional[BaseException] = None
+        for name, llm in self.models:
+            if not self.breakers[name].allow():
+                continue
+            attempt = 0
+            while True:
+                try:
+                    response = await llm.ainvoke(messages)
+                except Exception as e:
+                    reason = retry_reason(e)
+                    if reason is None:
+                        raise
+                    last_error = e
+                    if not self._failed(name, e, reason, attempt):
+                        break
+                    await asyncio.sleep(backoff_delay(attempt))
+                    attempt += 1
+                    continue
+                self.breakers[name].record_success()
+                return response
+            FAILOVERS.inc(model=name)
+        raise self._unavailable(last_error)
+
+    async def astream(self, messages: List[Any]) -> AsyncIterator[Any]:
+        """Stream from the first model that starts answering.
+
+        Chunks without text (message start, tool call fragments) are held back
+        until the first text chunk arrives, so a failed attempt can be retried
+        without the caller seeing any of it.
+        """
+        last_error: Optional[BaseException] = None
+        for name, llm in self.models:
+            if not self.breakers[name].allow():
+                continue
+            attempt = 0
+            while True:
+                held: List[Any] = []
+                committed = False
+                try:
+                    async for chunk in llm.astream(messages):
+                        if committed:
+                            yield chunk
+                            continue
+                        held.append(chunk)
+                        if _chunk_has_text(chunk):
+                            committed = True
+                            for held_chunk in held:
+                                yield held_chunk
+                            held = []
+                except Exception as e:
+                    reason = retry_reason(e)
+                    if reason is None:
+                        raise
+                    if committed:
+                        # Too late to retry: the caller has already seen text
+                        self.breakers[name].record_failure()
+                        raise
+                    last_error = e
+                    if not self._failed(name, e, reason, attempt):
+                        break
+                    await asyncio.sleep(backoff_delay(attempt))
+                    attempt += 1
+                    continue
+                self.breakers[name].record_success()
+                for held_chunk in held:
+                    yield held_chunk
+                return
+            FAILOVERS.inc(model=name)
+        raise self._unavailable(last_error)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {
+            name: {"state": breaker.state, "failures": breaker.failures}
+            for name, breaker in self.breakers.items()
+        }
@@ -0,0 +1,147 @@
+import logging
+import math
+import re
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+from langchain_core.messages import BaseMessage, HumanMessage
+
+from artemis.config import settings
+from artemis.metrics import Counter
+
+logger = logging.getLogger(__name__)
+
+FAST = "fast"
+PRIMARY = "primary"
+
+GREETING = re.compile(
+    r"^\s*(hi|hey|hello|yo|thanks|thank you|thx|cheers|bye|good (morning|evening))"
+    r"[\s!.?]*$",
+    re.IGNORECASE,
+)
+WORD = re.compile(r"[a-z0-9']+")
+
+# Words typical of short factual lookups about Peter
+LOOKUP_WORDS = frozenset(
+    """
+    email contact phone linkedin github website twitter location live based
+    where when who name title job role company employer current degree school
+    university study studied graduate graduated year years age hobbies languages
+    skills know knows
+    """.split()
+)
+# Words typical of open-ended questions that need reasoning or the research
+# and documents tools
+RESEARCH_WORDS = frozenset(
+    """
+    why how explain compare comparison difference analyze analyse detail
+    detailed deep dive research paper papers thesis phd publication method
+    methods approach architecture design tradeoff tradeoffs implement
+    implementation derive proof summarize summarise discuss opinion think
+    """.split()
+)
+
+# Logistic model over cheap features: positive weights push towards the fast
+# model. Hand-tuned on the kinds of questions in the conversation logs.
+WEIGHTS = {
+    "bias": 1.2,
+    "log_words": -0.9,
+    "lookup_words": 0.8,
+    "research_words": -1.4,
+    "questions": -0.4,
+    "history_turns": -0.15,
+    "code": -2.0,
+}
+
+ROUTES = Counter(
+    "artemis_router_decisions_total",
+    "Turns routed to each model, by route and deciding rule",
+    ["route", "reason"],
+)
+
+
+@dataclass
+class RouteDecision:
+    route: str  # "fast" or "primary"
+    model: str
+    score: float  # probability the turn is a simple lookup
+    reason: str  # "greeting", "long", "model", ...
+
+    def to_dict(self) -> Dict[str, Any]:
+        decision = asdict(self)
+        decision["score"] = round(self.score, 3)
+        return decision
+
+
+def _last_user_text(messages: Sequence[Any]) -> Tuple[str, int]:
+    """Return the newest user message and how many user turns preceded it."""
+    texts = []
+    for message in messages:
+        if isinstance(message, BaseMessage):
+            if isinstance(message, HumanMessage):
+                texts.append(str(message.content))
+        elif message[0] == "user":
+            texts.append(message[1])
+    if not texts:
+        return "", 0
+    return texts[-1], len(texts) - 1
+
+
+class QueryRouter:
+    """Classify each turn locally and pick the fast or the primary model.
+
+    Clear cases are settled by rules: greetings go to the fast model and long
+    messages to the primary one. Everything else is scored by a small
+    logistic model over length, keyword hits and code blocks; turns scoring
+    at least ``router_threshold`` are treated as simple lookups. No network call
+    is made, so routing costs microseconds.
+    """
+
+    def __init__(self, enabled: bool = True, threshold: float = 0.6):
+        self.enabled = enabled
+        self.threshold = threshold
+
+    def features(self, text: str, history_turns: int) -> Dict[str, float]:
+        words = WORD.findall(text.lower())
+        return {
+            "bias": 1.0,
+            "log_words": math.log1p(len(words)),
+            "lookup_words": sum(word in LOOKUP_WORDS for word in words),
+            "research_words": sum(word in RESEARCH_WORDS for word in words),
+            "questions": max(0, text.count("?") - 1),
+            "history_turns": min(history_turns, 10),
+            "code": float("```" in text),
+        }
+
+    def score(self, features: Dict[str, float]) -> float:
+        z = sum(WEIGHTS[name] * value for name, value in features.items())
+        return 1 / (1 + math.exp(-z))
+
+    def route(self, messages: List[Any]) -> RouteDecision:
+        """Decide which model answers this turn."""
+        text, history_turns = _last_user_text(messages)
+        if not self.enabled:
+            decision = RouteDecision(PRIMARY, settings.model_name, 0.0, "disabled")
+        elif GREETING.match(text):
+            decision = RouteDecision(FAST, settings.fast_model_name, 1.0, "greeting")
+        elif len(text) > settings.router_max_fast_chars:
+            decision = RouteDecision(PRIMARY, settings.model_name, 0.0, "long")
+        else:
+            score = self.score(self.features(text, history_turns))
+            if score >= self.threshold:
+                decision = RouteDecision(FAST, settings.fast_model_name, score, "model")
+            else:
+                decision = RouteDecision(PRIMARY, settings.model_name, score, "model")
+
+        ROUTES.inc(route=decision.route, reason=decision.reason)
+        logger.info(
+            f"Routed turn to {decision.route} ({decision.model}, "
+            f"score {decision.score:.2f}, {decision.reason})"
+        )
+        return decision
+
+
+# Global instance
+query_router = QueryRouter(
+    enabled=settings.router_enabled, threshold=settings.router_threshold
+)
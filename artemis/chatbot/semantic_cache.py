@@ -0,0 +1,315 @@
+import asyncio
+import contextlib
+import fcntl
+import logging
+import os
+import re
+import threading
+import zlib
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from artemis.config import settings
+from artemis.storage.vectors import load_vectors, save_vectors
+from artemis.tools.search import STOPWORDS, tokenize
+
+logger = logging.getLogger(__name__)
+
+# (embedding, agent version, question, answer)
+Row = Tuple[np.ndarray, str, str, str]
+
+# Fold common paraphrases onto one feature before hashing
+SYNONYMS = {
+    "job": "work",
+    "role": "work",
+    "occupation": "work",
+    "career": "work",
+    "employment": "work",
+    "employer": "company",
+    "working": "work",
+    "background": "experience",
+    "history": "experience",
+    "expertise": "skill",
+    "strength": "skill",
+    "contact": "email",
+    "reach": "email",
+    "hobby": "interest",
+    "hobbie": "interest",
+    "fun": "interest",
+    "cannot": "not",
+}
+
+# Negations flip a question's meaning, so a match must agree on them
+NEGATIONS = frozenset({"not", "no", "nor", "never"})
+
+# Tense and time qualifiers change which facts are asked about ("What does
+# Peter do?" vs "What did Peter do before?"). Each folds onto one marker, and
+# like negations a match must agree on them
+TENSES = {
+    "did": "past",
+    "was": "past",
+    "were": "past",
+    "had": "past",
+    "before": "past",
+    "previously": "past",
+    "previous": "past",
+    "formerly": "past",
+    "former": "past",
+    "earlier": "past",
+    "prior": "past",
+    "ago": "past",
+    "past": "past",
+    "now": "present",
+    "currently": "present",
+    "current": "present",
+    "today": "present",
+    "nowadays": "present",
+    "present": "present",
+    "will": "future",
+    "next": "future",
+    "future": "future",
+    "upcoming": "future",
+    "plan": "future",
+}
+QUALIFIERS = NEGATIONS | frozenset(TENSES.values())
+# "n't" contractions, spelled out before tokenizing ("doesn't" -> "does not")
+_CONTRACTION = re.compile(r"\b(ca|wo|\w+)n['’]t\b")
+_CONTRACTION_STEMS = {"ca": "can", "wo": "will"}
+
+# Question words, negations and tenses are stopwords for retrieval but carry
+# intent here
+_STOPWORDS = (
+    STOPWORDS
+    - {"what", "who", "where", "when", "why", "how", "do"}
+    - NEGATIONS
+    - set(TENSES)
+)
+
+
+class HashingEmbedder:
+    """Local text embedding: hashed word and character-trigram features.
+
+    No vocabulary or network call is needed, and features hash identically
+    across processes (crc32, not Python's salted hash).
+    """
+
+    # Bump when features or weights change; saved vectors are then discarded
+    VERSION = 3
+
+    def __init__(self, dim: int):
+        self.dim = dim
+
+    def _features(self, text: str) -> List[str]:
+        text = _CONTRACTION.sub(
+            lambda m: _CONTRACTION_STEMS.get(m[1], m[1]) + " not", text.lower()
+        )
+        words = [
+            TENSES.get(word) or SYNONYMS.get(word, word)
+            for word in tokenize(text, _STOPWORDS)
+        ]
+        features = [f"w:{word}" for word in words]
+        for word in words:
+            padded = f"#{word}#"
+            features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            h = zlib.crc32(feature.encode("utf-8"))
+            # Words count more than their character trigrams, and negations
+            # and tenses enough that a question never matches a version of
+            # itself that adds, drops or changes one
+            if feature.startswith("w:"):
+                weight = 6.0 if feature[2:] in QUALIFIERS else 2.0
+            else:
+                weight = 0.5
+            vector[h % self.dim] += weight if h & 0x80000000 else -weight
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SemanticCache:
+    """Answer cache for first-turn questions, matched by cosine similarity.
+
+    Embeddings live in a preallocated (capacity x dim) matrix used as a ring
+    buffer, so lookup is a single matrix-vector product. Rows are tagged with
+    the agent version they were answered under and never match across versions.
+
+    Every worker process keeps its own copy. New entries are merged into the
+    shared file on disk in the background, so workers pick up each other's
+    answers when they restart.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(settings.data_dir, "semantic_cache")
+        self.capacity = settings.semantic_cache_capacity
+        self.threshold = settings.semantic_cache_threshold
+        self.embedder = HashingEmbedder(settings.semantic_cache_dim)
+        self.matrix = np.zeros((self.capacity, self.embedder.dim), dtype=np.float32)
+        self.version_ids = np.full(self.capacity, -1, dtype=np.int32)
+        self.questions: List[Optional[str]] = [None] * self.capacity
+        self.answers: List[Optional[str]] = [None] * self.capacity
+        self.versions: List[str] = []
+        self.size = 0
+        self.next_row = 0
+        self.hits = 0
+        self.misses = 0
+        self._pending: List[Row] = []  # added since the last save
+        self._saving: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+        self._load()
+
+    def _version_id(self, version: str) -> int:
+        if version not in self.versions:
+            self.versions.append(version)
+        return self.versions.index(version)
+
+    def lookup(self, question: str, version: str) -> Optional[str]:
+        """Return a stored answer for a sufficiently similar question, if any."""
+        if not settings.semantic_cache_enabled or not self.size:
+            self.misses += 1
+            return None
+        query = self.embedder.embed(question)
+        if version not in self.versions or not query.any():
+            self.misses += 1
+            return None
+
+        similarities = self.matrix[: self.size] @ query
+        version_id = self.versions.index(version)
+        similarities[self.version_ids[: self.size] != version_id] = -1
+        row = int(np.argmax(similarities))
+        if similarities[row] < self.threshold:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        logger.info(
+            f"Semantic cache hit ({similarities[row]:.3f}): "
+            f"{question!r} ~ {self.questions[row]!r}"
+        )
+        return self.answers[row]
+
+    def add(self, question: str, answer: str, version: str):
+        """Store an answer, overwriting the oldest row once full."""
+        if not settings.semantic_cache_enabled or not answer:
+            return
+        vector = self.embedder.embed(question)
+        if not vector.any():
+            return
+
+        with self._lock:
+            row = self.next_row
+            self.matrix[row] = vector
+            self.version_ids[row] = self._version_id(version)
+            self.questions[row] = question
+            self.answers[row] = answer
+            self.next_row = (row + 1) % self.capacity
+            self.size = min(self.size + 1, self.capacity)
+            self._pending.append((vector, version, question, answer))
+            pending = len(self._pending)
+        if pending >= settings.semantic_cache_save_every:
+            self._save_in_background()
+
+    def _save_in_background(self):
+        """Save in a worker thread, so the event loop never waits on disk."""
+        if self._saving is not None and not self._saving.done():
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.save()
+            return
+        self._saving = loop.create_task(asyncio.to_thread(self.save))
+
+    def save(self):
+        """Merge the entries added since the last save into the file on disk.
+
+        The file is shared by all workers: it is reread under an exclusive
+        lock and this worker's new entries are appended (replacing older
+        answers to the same question), so no worker overwrites another's.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        try:
+            with self._file_lock():
+                added = {(version, question) for _, version, question, _ in pending}
+                rows = [
+                    row for row in self._read_rows() if (row[1], row[2]) not in added
+                ]
+                self._write_rows((rows + pending)[-self.capacity :])
+        except Exception as e:
+            logger.error(f"Error saving semantic cache: {str(e)}")
+            with self._lock:
+                self._pending = pending + self._pending
+
+    @contextlib.contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(f"{self.path}.lock", "a") as f:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            yield
+
+    def _read_rows(self) -> List[Row]:
+        """Read the saved rows, oldest first."""
+        loaded = load_vectors(self.path)
+        if loaded is None:
+            return []
+        matrix, metadata = loaded
+        if (
+            metadata.get("dim") != self.embedder.dim
+            or metadata.get("embedder", 1) != self.embedder.VERSION
+        ):
+            return []
+        versions = metadata["versions"]
+        return [
+            (matrix[i], versions[version_id], question, answer)
+            for i, (version_id, question, answer) in enumerate(
+                zip(metadata["version_ids"], metadata["questions"], metadata["answers"])
+            )
+            if i < matrix.shape[0]
+        ]
+
+    def _write_rows(self, rows: List[Row]):
+        versions = sorted({version for _, version, _, _ in rows})
+        save_vectors(
+            self.path,
+            np.stack([vector for vector, _, _, _ in rows]),
+            {
+                "dim": self.embedder.dim,
+                "embedder": self.embedder.VERSION,
+                "versions": versions,
+                "version_ids": [versions.index(version) for _, version, _, _ in rows],
+                "questions": [question for _, _, question, _ in rows],
+                "answers": [answer for _, _, _, answer in rows],
+            },
+        )
+
+    def _load(self):
+        rows = self._read_rows()[-self.capacity :]
+        for i, (vector, version, question, answer) in enumerate(rows):
+            self.matrix[i] = vector
+            self.version_ids[i] = self._version_id(version)
+            self.questions[i] = question
+            self.answers[i] = answer
+        self.size = len(rows)
+        self.next_row = self.size % self.capacity
+        if rows:
+            logger.info(f"Loaded {self.size} semantic cache entries from {self.path}")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": self.size,
+            "capacity": self.capacity,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Global instance
+semantic_cache = SemanticCache()
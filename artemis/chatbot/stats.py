@@ -0,0 +1,179 @@
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from artemis.config import settings
+from artemis.metrics import Counter, Histogram
+from artemis.tokens import estimate_tokens
+
+REQUESTS = Counter(
+    "artemis_chat_requests_total",
+    "Chat turns served, by endpoint and answering cache layer",
+    ["endpoint", "cached"],
+)
+REQUEST_SECONDS = Histogram(
+    "artemis_chat_request_seconds",
+    "Total time to serve a chat turn",
+    ["endpoint"],
+)
+TTFT_SECONDS = Histogram(
+    "artemis_chat_ttft_seconds",
+    "Time from request to the first streamed chunk",
+    ["endpoint"],
+)
+LLM_SECONDS = Histogram(
+    "artemis_llm_call_seconds",
+    "Duration of each LLM call (first: with tool choice, second: after tools)",
+    ["phase"],
+)
+HISTORY_SECONDS = Histogram(
+    "artemis_history_seconds",
+    "Time spent windowing and summarizing conversation history",
+)
+TOKENS = Counter(
+    "artemis_llm_tokens_total",
+    "LLM tokens by kind (input, output, cache_read, cache_creation)",
+    ["kind"],
+)
+CANCELLED = Counter(
+    "artemis_chat_cancelled_total",
+    "Streamed turns cancelled because the client disconnected",
+)
+ROUTE_SECONDS = Histogram(
+    "artemis_route_request_seconds",
+    "Total time to serve an uncached chat turn, by router decision",
+    ["route"],
+)
+ROUTE_TOKENS = Counter(
+    "artemis_route_tokens_total",
+    "LLM tokens by router decision and kind (input, output)",
+    ["route", "kind"],
+)
+TOKENS_SAVED = Counter(
+    "artemis_cancelled_tokens_saved_total",
+    "Estimated output tokens not generated thanks to cancelling abandoned streams",
+)
+
+
+def expected_output_tokens() -> float:
+    """Mean output tokens of completed, uncached turns (a guess before any)."""
+    turns = sum(
+        REQUESTS.value(endpoint=endpoint, cached="miss")
+        for endpoint in ("stream", "non_stream")
+    )
+    if not turns:
+        return settings.max_tokens / 8
+    return TOKENS.value(kind="output") / turns
+
+
+@dataclass
+class TurnStats:
+    """Per-request accounting collected by ArtemisAgent for one chat turn."""
+
+    llm_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+
+    # Timings in seconds; None when the phase did not happen
+    history_seconds: Optional[float] = None
+    first_llm_seconds: Optional[float] = None
+    tools_seconds: Optional[float] = None
+    second_llm_seconds: Optional[float] = None
+    ttft_seconds: Optional[float] = None
+    total_seconds: Optional[float] = None
+    # One entry per tool call: name, args, status, seconds and output
+    tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    # Router decision (route, model, score, reason); None for cached answers
+    route: Optional[Dict[str, Any]] = None
+
+    def add_usage(self, usage_metadata: Optional[Dict[str, Any]]):
+        """Accumulate LangChain usage_metadata from a response or stream chunk."""
+        if not usage_metadata:
+            return
+        self.input_tokens += usage_metadata.get("input_tokens", 0) or 0
+        self.output_tokens += usage_metadata.get("output_tokens", 0) or 0
+        details = usage_metadata.get("input_token_details") or {}
+        self.cache_read_tokens += details.get("cache_read", 0) or 0
+        self.cache_creation_tokens += details.get("cache_creation", 0) or 0
+
+    def add_tool_call(
+        self, name: str, args: Any, status: str, seconds: float, output: str
+    ):
+        self.tool_calls.append(
+            {
+                "name": name,
+                "args": args,
+                "status": status,
+                "seconds": seconds,
+                "output": output,
+            }
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Token usage, for the conversation log."""
+        return {
+            "llm_calls": self.llm_calls,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "cache_read_tokens": self.cache_read_tokens,
+            "cache_creation_tokens": self.cache_creation_tokens,
+        }
+
+    def timings(self) -> Dict[str, Any]:
+        """Phase timings, for the conversation log."""
+        phases = {
+            "history": self.history_seconds,
+            "first_llm": self.first_llm_seconds,
+            "tools": self.tools_seconds,
+            "second_llm": self.second_llm_seconds,
+            "ttft": self.ttft_seconds,
+            "total": self.total_seconds,
+        }
+        timings: Dict[str, Any] = {
+            name: round(seconds, 4)
+            for name, seconds in phases.items()
+            if seconds is not None
+        }
+        if self.tool_calls:
+            timings["tool_calls"] = [
+                {
+                    "name": call["name"],
+                    "status": call["status"],
+                    "seconds": round(call["seconds"], 4),
+                }
+                for call in self.tool_calls
+            ]
+        return timings
+
+    def record_cancelled(self, partial_response: str) -> int:
+        """Count a cancelled turn; return the estimated output tokens saved."""
+        streamed = max(self.output_tokens, estimate_tokens(partial_response))
+        saved = max(0, round(expected_output_tokens() - streamed))
+        CANCELLED.inc()
+        TOKENS_SAVED.inc(saved)
+        return saved
+
+    def record_metrics(self, endpoint: str, cached: Optional[str]):
+        """Feed this turn's timings and token counts into the metrics."""
+        REQUESTS.inc(endpoint=endpoint, cached=cached or "miss")
+        if self.total_seconds is not None:
+            REQUEST_SECONDS.observe(self.total_seconds, endpoint=endpoint)
+        if self.ttft_seconds is not None:
+            TTFT_SECONDS.observe(self.ttft_seconds, endpoint=endpoint)
+        if self.history_seconds is not None:
+            HISTORY_SECONDS.observe(self.history_seconds)
+        if self.first_llm_seconds is not None:
+            LLM_SECONDS.observe(self.first_llm_seconds, phase="first")
+        if self.second_llm_seconds is not None:
+            LLM_SECONDS.observe(self.second_llm_seconds, phase="second")
+        TOKENS.inc(self.input_tokens, kind="input")
+        TOKENS.inc(self.output_tokens, kind="output")
+        TOKENS.inc(self.cache_read_tokens, kind="cache_read")
+        TOKENS.inc(self.cache_creation_tokens, kind="cache_creation")
+        if self.route is not None:
+            route = self.route["route"]
+            if self.total_seconds is not None:
+                ROUTE_SECONDS.observe(self.total_seconds, route=route)
+            ROUTE_TOKENS.inc(self.input_tokens, route=route, kind="input")
+            ROUTE_TOKENS.inc(self.output_tokens, route=route, kind="output")
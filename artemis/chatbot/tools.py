@@ -1,25 +1,26 @@
 from typing import List
-from langchain.tools import Tool
-from artemis.tools.resume_info import resume_info
-from artemis.tools.research_deepdive import research_deepdive
-from artemis.tools.personal import personal_info
-from artemis.tools.architecture import architecture_info
+from langchain_core.tools import BaseTool
+from artemis.tools.registry import ToolRegistry
+from artemis.tools import (
+    resume_info,
+    research_deepdive,
+    personal,
+    architecture,
+    documents,
+)
 
+# Tool backends are constructed on first use (or by warm-up), not at import
+tool_registry = ToolRegistry(
+    [
+        resume_info.TOOL_SPEC,
+        research_deepdive.TOOL_SPEC,
+        personal.TOOL_SPEC,
+        architecture.TOOL_SPEC,
+        documents.TOOL_SPEC,
+    ]
+)
 
-def get_tools() -> List[Tool]:
-    """Return list of available tools for the chatbot."""
-    tools = []
-
-    # Add resume info tool
-    tools.append(resume_info.get_tool())
-
-    # Add research deep dive tool
-    tools.append(research_deepdive.get_tool())
 
-    # Add personal info tool
-    tools.append(personal_info.get_tool())
-
-    # Add architecture info tool
-    tools.append(architecture_info.get_tool())
-
-    return tools
+def get_tools() -> List[BaseTool]:
+    """Return list of available tools for the chatbot."""
+    return tool_registry.get_tools()
@@ -1,4 +1,6 @@
 import os
+from typing import Literal, Optional
+
 from pydantic_settings import BaseSettings
 
 
@@ -10,6 +12,122 @@ class Settings(BaseSettings):
     model_name: str = "claude-sonnet-4-20250514"
     max_tokens: int = 4096
     temperature: float = 0.7
+    prompt_caching: bool = False  # Anthropic prompt-cache breakpoints (opt-in)
+    fast_model_name: str = "claude-3-5-haiku-20241022"  # cheap model for side tasks
+
+    # Upstream resilience: retries, a fallback model and per-model circuit breakers
+    fallback_model_name: Optional[str] = None  # tried when model_name keeps failing
+    upstream_max_attempts: int = 3  # tries per model before failing over
+    upstream_backoff: float = 0.5  # base seconds for jittered exponential backoff
+    upstream_backoff_max: float = 8.0  # cap on a single backoff delay
+    breaker_failure_threshold: int = 5  # consecutive failures that open a breaker
+    breaker_reset_timeout: float = 30.0  # seconds before an open breaker is retried
+
+    # Local query router: simple lookups go to fast_model_name
+    router_enabled: bool = True
+    router_threshold: float = 0.6  # lookup probability needed for the fast model
+    router_max_fast_chars: int = 400  # longer messages always use model_name
+    fast_max_tokens: int = 1024  # response limit on the fast route
+
+    # Conversation history windowing
+    history_keep_turns: int = 6  # most recent turns sent verbatim
+    history_max_tokens: int = 4000  # cap on the verbatim window
+    history_summary_tokens: int = 300  # size of the rolling summary of older turns
+    history_summary_cache_entries: int = 1000
+
+    # Tool execution settings
+    tool_timeout: float = 30.0  # seconds before a tool call is abandoned
+    tool_max_concurrency: int = 4  # concurrent calls allowed per tool
+    tool_warmup: bool = True  # build tool backends in the background at startup
+    pdf_extract_workers: int = 0  # processes for PDF text extraction; 0 = one per core
+    research_token_budget: int = 1500  # tokens of context per research tool call
+    research_candidates: int = 20  # ranked sections/passages considered per call
+    documents_top_k: int = 5  # passages returned by the documents tool
+    documents_refresh_interval: float = 30.0  # seconds between change checks
+
+    # Memoized tool results
+    tool_memo_enabled: bool = True
+    tool_memo_max_entries: int = 512
+    tool_memo_max_bytes: int = 32 * 1024 * 1024
+    tool_memo_version_ttl: float = 2.0  # seconds a resource fingerprint is trusted
+    tool_memo_log_every: int = 50  # calls per tool between hit-rate log lines
+
+    # Response cache for repeated questions
+    response_cache_enabled: bool = True
+    response_cache_ttl: float = 3600.0  # seconds
+    response_cache_max_entries: int = 1000
+    response_cache_max_bytes: int = 16 * 1024 * 1024
+    response_cache_replay_delay: float = 0.01  # seconds between replayed chunks
+
+    # Semantic cache for paraphrased first-turn questions
+    semantic_cache_enabled: bool = True
+    semantic_cache_threshold: float = 0.85  # minimum cosine similarity for a hit
+    semantic_cache_capacity: int = 10000  # rows preallocated in the matrix
+    semantic_cache_dim: int = 256  # hashed embedding dimensions
+    semantic_cache_save_every: int = 20  # new entries between saves to disk
+
+    # SSE streaming: token frames are coalesced and flushed on time or size
+    sse_flush_interval: float = 0.03  # seconds a token may wait for company
+    sse_flush_bytes: int = 256  # characters that trigger an immediate flush
+
+    # Admission control in front of the agent, for the whole server; production
+    # splits the limits evenly across workers
+    admission_max_concurrency: int = 8  # chat requests served at once
+    admission_max_queue: int = 16  # requests allowed to wait for a slot
+    admission_queue_timeout: float = 2.0  # seconds a request may wait before a 503
+    admission_retry_after: int = 5  # Retry-After seconds sent with a 503
+
+    # Rate limiting per client, shared by all workers (SQLite file or Redis)
+    rate_limit_backend: Literal["sqlite", "redis"] = "sqlite"
+    rate_limit_redis_url: str = "redis://localhost:6379/0"
+    rate_limit_key: Literal["client_ip", "api_key"] = "client_ip"
+    rate_limit_trusted_proxies: int = 1  # proxies that append to X-Forwarded-For
+    rate_limit_chat_requests: int = 25  # chat requests per minute; 0 = unlimited
+    rate_limit_chat_tokens: int = 200_000  # LLM tokens per token window; 0 = off
+    rate_limit_token_window: float = 3600.0  # seconds for the token budget to refill
+    rate_limit_health_requests: int = 60  # /health requests per minute
+    rate_limit_metrics_requests: int = 60  # /metrics requests per minute
+
+    # Server-side conversation sessions (SQLite, with an in-memory LRU tier)
+    session_cache_max_entries: int = 10000
+    session_cache_max_bytes: int = 64 * 1024 * 1024
+    session_ttl: float = 7 * 24 * 3600.0  # seconds of inactivity before expiry
+
+    # Conversation log writer (background thread fed by a bounded queue)
+    log_queue_size: int = 10000
+    log_queue_full: Literal["drop", "block"] = "drop"  # policy when the queue is full
+    log_block_timeout: float = 0.05  # seconds a caller may block before dropping
+    log_batch_size: int = 200  # records per write
+    log_flush_interval: float = 0.5  # max seconds a record waits for its batch
+    log_fsync: Literal["never", "batch", "interval"] = "interval"
+    log_fsync_interval: float = 5.0  # seconds between fsyncs for "interval"
+    log_shutdown_timeout: float = 5.0  # seconds to drain the queue on shutdown
+    log_segment_max_bytes: int = 64 * 1024 * 1024  # roll segments at this size
+    log_compression: Literal["gzip", "zstd", "none"] = "gzip"  # closed segments
+
+    # Log shipping to S3-compatible storage (e.g. Cloudflare R2); off without a bucket
+    log_ship_bucket: Optional[str] = None
+    log_ship_prefix: str = "logs/"
+    log_ship_endpoint_url: Optional[str] = None  # R2/MinIO endpoint; None = AWS S3
+    log_ship_region: Optional[str] = None  # "auto" for R2
+    log_ship_interval: float = 60.0  # seconds between upload batches
+    log_ship_concurrency: int = 4  # parallel uploads (and multipart parts)
+    log_ship_multipart_bytes: int = 8 * 1024 * 1024  # multipart threshold/part size
+    log_ship_max_retries: int = 4  # per segment per batch
+    log_ship_backoff: float = 1.0  # base seconds for jittered exponential backoff
+    log_spool_max_bytes: int = 512 * 1024 * 1024  # unshipped segments kept on disk
+
+    # Local state (indexes, caches) - relative to the working directory
+    data_dir: str = "data"
+
+    # Server: "development" runs one auto-reloading process; "production" loads
+    # shared resources once and pre-forks workers
+    server_mode: Literal["development", "production"] = "development"
+    workers: int = 0  # production worker processes; 0 = CPU quota, else 2
+    graceful_shutdown_timeout: float = 30.0  # seconds to drain streams on shutdown
+
+    # Bearer token for Prometheus scrapes of /metrics; X-API-Key is always accepted
+    metrics_token: Optional[str] = None
 
     # API settings - Railway automatically sets PORT
     api_host: str = "0.0.0.0"
@@ -0,0 +1,302 @@
+import fcntl
+import logging
+import os
+import random
+import socket
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from artemis.config import settings
+from artemis.log_store import INDEX_FILE, SEGMENT_PATTERN, read_index
+
+logger = logging.getLogger(__name__)
+
+
+class LogSink(ABC):
+    """Destination for closed log segments."""
+
+    @abstractmethod
+    def upload(self, path: str, key: str):
+        """Upload the file at ``path`` under ``key``; raise on failure."""
+
+
+class S3LogSink(LogSink):
+    """Uploads segments to any S3-compatible bucket (AWS S3, Cloudflare R2, MinIO).
+
+    boto3 is only imported when no client is injected, so the app runs
+    without it when shipping is disabled. Tests can pass a client bound to
+    moto or a local MinIO endpoint instead of real S3.
+    """
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        client: Any = None,
+    ):
+        self.bucket = bucket
+        self.endpoint_url = endpoint_url
+        self.region = region
+        self._client = client
+        self._transfer_config = None
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            import boto3
+
+            self._client = boto3.client(
+                "s3", endpoint_url=self.endpoint_url, region_name=self.region
+            )
+        return self._client
+
+    def _config(self) -> Any:
+        if self._transfer_config is None:
+            from boto3.s3.transfer import TransferConfig
+
+            # Large segments go up as multipart uploads with parallel parts
+            self._transfer_config = TransferConfig(
+                multipart_threshold=settings.log_ship_multipart_bytes,
+                multipart_chunksize=settings.log_ship_multipart_bytes,
+                max_concurrency=settings.log_ship_concurrency,
+            )
+        return self._transfer_config
+
+    def upload(self, path: str, key: str):
+        self.client.upload_file(path, self.bucket, key, Config=self._config())
+
+
+class LogShipper:
+    """Ships closed log segments to a sink in periodic batches.
+
+    The log directory is the spool: a segment stays on disk until it has been
+    uploaded, then it is deleted. Segments left over from earlier runs are
+    found through the segment index at startup. Every ``log_ship_interval``
+    seconds (or sooner when a segment closes) pending segments are uploaded
+    with bounded concurrency. Each upload is retried with jittered backoff;
+    failed segments wait for the next batch. If the spool grows beyond
+    ``log_spool_max_bytes`` the oldest segments are deleted unshipped, so
+    a slow or unreachable bucket never fills the disk. Request handling
+    never waits on any of this: the only caller-facing method is
+    ``notify``, which just records a path.
+
+    Several worker processes may share a log directory; an exclusive
+    ``flock`` on each segment ensures it is uploaded by only one of them.
+    """
+
+    def __init__(self, sink: LogSink, log_dir: str, prefix: str = ""):
+        self.sink = sink
+        self.log_dir = log_dir
+        self.prefix = prefix
+        self.host = socket.gethostname()
+        self.shipped = 0
+        self.failed = 0
+        self.discarded = 0
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        """Start with no worker thread (also run in forked children)."""
+        self._pending: List[str] = []
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._seeded = False
+
+    def start(self):
+        """Start the background shipping thread if it is not running."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="log-shipper", daemon=True
+                )
+                self._thread.start()
+
+    def notify(self, path: str):
+        """Queue a closed segment for upload."""
+        with self._lock:
+            if path not in self._pending:
+                self._pending.append(path)
+        self.start()
+        self._wake.set()
+
+    def _seed(self):
+        """Queue closed segments from earlier runs that were never shipped."""
+        for entry in read_index(self.log_dir):
+            path = os.path.join(self.log_dir, entry.get("file", ""))
+            if os.path.exists(path):
+                with self._lock:
+                    if path not in self._pending:
+                        self._pending.append(path)
+        self._seeded = True
+
+    def _key(self, path: str) -> str:
+        filename = os.path.basename(path)
+        match = SEGMENT_PATTERN.match(filename)
+        date = match.group(1) if match else "unknown"
+        # Hostname keeps pids from different containers apart
+        return f"{self.prefix}{date}/{self.host}/{filename}"
+
+    def _spool_bytes(self) -> int:
+        """Bytes on disk used by every segment in the log directory."""
+        total = 0
+        for filename in os.listdir(self.log_dir):
+            if SEGMENT_PATTERN.match(filename):
+                try:
+                    total += os.path.getsize(os.path.join(self.log_dir, filename))
+                except OSError:
+                    pass  # Shipped by another worker meanwhile
+        return total
+
+    def _discard(self, path: str) -> int:
+        """Delete an unshipped segment unless it is being uploaded; return its size."""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            return 0
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            size = os.fstat(fd).st_size
+            os.remove(path)
+        except OSError:
+            return 0
+        finally:
+            os.close(fd)
+        self.discarded += 1
+        logger.error(f"Log spool over limit; discarded unshipped {path}")
+        return size
+
+    def _enforce_spool_limit(self, batch: List[str]) -> List[str]:
+        """Delete the oldest closed segments while the spool is over its cap.
+
+        Everything on disk counts: segments still being written and segments
+        queued by other workers too. Only closed segments are deleted, oldest
+        first, whichever worker queued them.
+        """
+        total = self._spool_bytes()
+        if total > settings.log_spool_max_bytes:
+            for entry in read_index(self.log_dir):
+                if total <= settings.log_spool_max_bytes:
+                    break
+                total -= self._discard(
+                    os.path.join(self.log_dir, entry.get("file", ""))
+                )
+        return [path for path in batch if os.path.exists(path)]
+
+    def _ship(self, path: str) -> bool:
+        """Upload and delete one segment; False means retry in a later batch."""
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            return True  # Shipped by another worker
+        try:
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return True  # Another worker is uploading it
+            if os.fstat(fd).st_nlink == 0:
+                return True  # Uploaded and deleted while we waited
+
+            key = self._key(path)
+            for attempt in range(settings.log_ship_max_retries + 1):
+                try:
+                    self.sink.upload(path, key)
+                    os.remove(path)
+                    self.shipped += 1
+                    return True
+                except Exception as e:
+                    if attempt == settings.log_ship_max_retries:
+                        logger.error(f"Giving up on shipping {path} for now: {e}")
+                        break
+                    # Full jitter keeps workers from retrying in lockstep
+                    delay = random.uniform(0, settings.log_ship_backoff * 2**attempt)
+                    logger.warning(
+                        f"Shipping {path} failed ({str(e)}); retrying in {delay:.1f}s"
+                    )
+                    if self._stop.wait(delay):
+                        break
+            self.failed += 1
+            return False
+        finally:
+            os.close(fd)
+
+    def _ship_index(self):
+        path = os.path.join(self.log_dir, INDEX_FILE)
+        if os.path.exists(path):
+            try:
+                self.sink.upload(path, f"{self.prefix}index/{self.host}/{INDEX_FILE}")
+            except Exception as e:
+                logger.warning(f"Error shipping log index: {str(e)}")
+
+    def ship_pending(self):
+        """Upload every pending segment once, in parallel."""
+        if not self._seeded:
+            self._seed()
+        with self._lock:
+            batch, self._pending = self._pending, []
+        batch = self._enforce_spool_limit(batch)
+        if not batch:
+            return
+
+        with ThreadPoolExecutor(
+            max_workers=settings.log_ship_concurrency,
+            thread_name_prefix="log-upload",
+        ) as pool:
+            results = list(pool.map(self._ship, batch))
+
+        retry = [path for path, ok in zip(batch, results) if not ok]
+        with self._lock:
+            self._pending = retry + self._pending
+        self._ship_index()
+        logger.info(
+            f"Shipped {len(batch) - len(retry)}/{len(batch)} log segments "
+            f"to {self.prefix or '/'}"
+        )
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._wake.wait(timeout=settings.log_ship_interval)
+            self._wake.clear()
+            try:
+                self.ship_pending()
+            except Exception as e:
+                logger.error(f"Error in log shipper: {str(e)}")
+
+    def close(self, timeout: Optional[float] = None):
+        """Make a final shipping pass, bounded by ``timeout`` seconds."""
+        if self._thread is None:
+            return
+        self._wake.set()
+        self._stop.set()
+        self._thread.join(timeout=timeout)
+        if not self._thread.is_alive():
+            try:
+                self.ship_pending()
+            except Exception as e:
+                logger.error(f"Error in final log shipping pass: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "shipped": self.shipped,
+            "failed": self.failed,
+            "discarded": self.discarded,
+        }
+
+
+def create_log_shipper(log_dir: str) -> Optional[LogShipper]:
+    """Build the shipper from settings, or None if shipping is not configured."""
+    if not settings.log_ship_bucket:
+        return None
+    sink = S3LogSink(
+        settings.log_ship_bucket,
+        endpoint_url=settings.log_ship_endpoint_url,
+        region=settings.log_ship_region,
+    )
+    return LogShipper(sink, log_dir, prefix=settings.log_ship_prefix)
@@ -0,0 +1,213 @@
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import IO, Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+INDEX_FILE = "segments.jsonl"
+SEGMENT_PATTERN = re.compile(
+    r"^conversations_(\d{4}-\d{2}-\d{2})_(\d+)_(\d+)\.jsonl(\.gz|\.zst)?$"
+)
+
+
+def open_segment(path: str) -> IO[str]:
+    """Open a log segment for reading, compressed or not."""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".zst"):
+        import io
+
+        import zstandard
+
+        stream = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"))
+        return io.TextIOWrapper(stream, encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def read_index(log_dir: str) -> List[Dict[str, Any]]:
+    """Return the closed segments recorded in a log directory's index."""
+    path = os.path.join(log_dir, INDEX_FILE)
+    if not os.path.exists(path):
+        return []
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                entries.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    return entries
+
+
+class _Segment:
+    """The segment currently being written by this process."""
+
+    def __init__(self, path: str, date: str):
+        self.path = path
+        self.date = date
+        self.file = open(path, "a", encoding="utf-8")
+        self.size = self.file.tell()
+        self.records = 0
+        self.start: Optional[float] = None
+        self.end: Optional[float] = None
+
+
+class SegmentedLogStore:
+    """Append-only JSONL log split into per-process, per-day segments.
+
+    Segments are named ``conversations_{date}_{pid}_{seq}.jsonl``, so each
+    worker process writes its own files and lines never interleave. A segment
+    is closed when the date of the records changes or it reaches
+    ``max_bytes``; closed segments are compressed on a background thread and
+    then recorded in ``segments.jsonl`` with their time range, so readers can
+    skip segments outside a query window without opening them. Callbacks in
+    ``on_close`` then receive the final path of each closed segment.
+
+    Not thread-safe: the background log writer is the only caller.
+    """
+
+    def __init__(self, log_dir: str, max_bytes: int, compression: str = "gzip"):
+        self.log_dir = log_dir
+        self.max_bytes = max_bytes
+        self.compression = compression
+        if compression == "zstd":
+            try:
+                import zstandard  # noqa: F401
+            except ImportError:
+                logger.warning("zstandard is not installed; compressing with gzip")
+                self.compression = "gzip"
+        self.on_close: List[Callable[[str], None]] = []
+        os.makedirs(log_dir, exist_ok=True)
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self):
+        """Forget the parent's open segment and compressor (run in forked children)."""
+        self._segment: Optional[_Segment] = None
+        self._compressor: Optional[ThreadPoolExecutor] = None
+        self._index_lock = threading.Lock()
+
+    def _next_path(self, date: str) -> str:
+        """Pick the next unused sequence number for this date and process."""
+        pid = os.getpid()
+        seq = 0
+        for filename in os.listdir(self.log_dir):
+            match = SEGMENT_PATTERN.match(filename)
+            if match and match.group(1) == date and int(match.group(2)) == pid:
+                seq = max(seq, int(match.group(3)) + 1)
+        return os.path.join(self.log_dir, f"conversations_{date}_{pid}_{seq:04d}.jsonl")
+
+    def write(self, entries: List[Tuple[float, str]], fsync: bool = False):
+        """
+        Append formatted lines, rolling segments as needed.
+
+        Args:
+            entries: (created timestamp, line ending in a newline) pairs
+            fsync: Whether to fsync the segment after writing
+        """
+        segment = None
+        for created, line in entries:
+            date = datetime.fromtimestamp(created).strftime("%Y-%m-%d")
+            segment = self._segment
+            if segment is not None and (
+                segment.date != date or segment.size >= self.max_bytes
+            ):
+                self._close_segment()
+                segment = None
+            if segment is None:
+                segment = self._segment = _Segment(self._next_path(date), date)
+
+            segment.file.write(line)
+            segment.size += len(line.encode("utf-8"))
+            segment.records += 1
+            segment.start = created if segment.start is None else segment.start
+            segment.end = created
+
+        if segment is not None:
+            segment.file.flush()
+            if fsync:
+                os.fsync(segment.file.fileno())
+
+    def _close_segment(self):
+        segment, self._segment = self._segment, None
+        if segment is None:
+            return
+        segment.file.close()
+        entry = {
+            "file": os.path.basename(segment.path),
+            "pid": os.getpid(),
+            "start": segment.start,
+            "end": segment.end,
+            "records": segment.records,
+            "bytes": segment.size,
+        }
+        if self.compression == "none":
+            self._record(entry)
+            return
+        if self._compressor is None:
+            self._compressor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="log-compressor"
+            )
+        try:
+            self._compressor.submit(self._compress, segment.path, entry)
+        except RuntimeError:
+            # Executors refuse new work once the interpreter is exiting, which
+            # is when the atexit close of the last segment happens
+            self._compress(segment.path, entry)
+
+    def _compress(self, path: str, entry: Dict[str, Any]):
+        suffix = ".zst" if self.compression == "zstd" else ".gz"
+        target = path + suffix
+        try:
+            with open(path, "rb") as src, open(target + ".tmp", "wb") as raw:
+                if self.compression == "zstd":
+                    import zstandard
+
+                    with zstandard.ZstdCompressor().stream_writer(raw) as dst:
+                        shutil.copyfileobj(src, dst)
+                else:
+                    with gzip.GzipFile(fileobj=raw, mode="wb") as dst:
+                        shutil.copyfileobj(src, dst)
+            os.replace(target + ".tmp", target)
+            os.remove(path)
+            entry["file"] = os.path.basename(target)
+            entry["compressed_bytes"] = os.path.getsize(target)
+        except Exception as e:
+            # Keep the uncompressed segment; it is still indexed and readable
+            logger.error(f"Error compressing log segment {path}: {str(e)}")
+        self._record(entry)
+
+    def _record(self, entry: Dict[str, Any]):
+        """Append one line to the shared index; O_APPEND keeps lines whole."""
+        line = (json.dumps(entry) + "\n").encode("utf-8")
+        with self._index_lock:
+            fd = os.open(
+                os.path.join(self.log_dir, INDEX_FILE),
+                os.O_WRONLY | os.O_APPEND | os.O_CREAT,
+                0o644,
+            )
+            try:
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+        path = os.path.join(self.log_dir, entry["file"])
+        for callback in self.on_close:
+            try:
+                callback(path)
+            except Exception as e:
+                logger.error(f"Error in log segment callback: {str(e)}")
+
+    def close(self):
+        """Close the open segment and wait for pending compression."""
+        self._close_segment()
+        if self._compressor is not None:
+            self._compressor.shutdown(wait=True)
+            self._compressor = None
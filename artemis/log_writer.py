@@ -0,0 +1,149 @@
+import atexit
+import logging
+import os
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from artemis.config import settings
+from artemis.log_store import SegmentedLogStore
+
+logger = logging.getLogger(__name__)
+
+# Marks the end of the queue on shutdown
+_STOP = object()
+
+
+class BackgroundLogHandler(logging.Handler):
+    """Logging handler that hands records to a background writer thread.
+
+    ``emit`` only enqueues the record, so callers on the event loop never
+    format JSON or touch the disk. The writer drains the bounded queue in
+    batches, writing each batch with one ``write`` call and flushing (and
+    optionally fsyncing) per batch to a ``SegmentedLogStore``.
+
+    When the queue is full, ``log_queue_full`` decides between dropping the
+    record (counted in ``dropped``) and blocking the caller for up to
+    ``log_block_timeout`` seconds before dropping it.
+    """
+
+    def __init__(self, store: SegmentedLogStore):
+        super().__init__()
+        self.store = store
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self._reported_drops = 0
+        self._last_fsync = time.monotonic()
+        self._reset()
+        os.register_at_fork(after_in_child=self._reset)
+        atexit.register(self.close)
+
+    def _reset(self):
+        """Start from an empty queue with no writer (also run in forked children)."""
+        self._queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+    def _ensure_writer(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="conversation-log-writer", daemon=True
+                )
+                self._thread.start()
+
+    def emit(self, record: logging.LogRecord):
+        if self._closed:
+            return
+        self._ensure_writer()
+        try:
+            if settings.log_queue_full == "block":
+                self._queue.put(record, timeout=settings.log_block_timeout)
+            else:
+                self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _next_batch(self) -> List[Any]:
+        """Wait for a record, then collect more until the batch or interval fills."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + settings.log_flush_interval
+        while batch[-1] is not _STOP and len(batch) < settings.log_batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            stop = batch[-1] is _STOP
+            records = batch[:-1] if stop else batch
+            if records:
+                self._write(records)
+            if self.dropped != self._reported_drops:
+                logger.warning(
+                    f"Conversation log queue full: dropped "
+                    f"{self.dropped - self._reported_drops} records"
+                )
+                self._reported_drops = self.dropped
+            if stop:
+                return
+
+    def _write(self, records: List[logging.LogRecord]):
+        entries = []
+        for record in records:
+            try:
+                entries.append((record.created, self.format(record) + "\n"))
+            except Exception:
+                self.handleError(record)
+
+        try:
+            self.store.write(entries, fsync=self._should_fsync())
+            self.written += len(entries)
+            self.batches += 1
+        except Exception as e:
+            logger.error(
+                f"Error writing {len(entries)} conversation log records: {str(e)}"
+            )
+
+    def _should_fsync(self) -> bool:
+        if settings.log_fsync == "batch":
+            return True
+        if settings.log_fsync == "interval":
+            now = time.monotonic()
+            if now - self._last_fsync >= settings.log_fsync_interval:
+                self._last_fsync = now
+                return True
+        return False
+
+    def close(self):
+        """Drain queued records and stop the writer."""
+        if not self._closed:
+            self._closed = True
+            if self._thread is not None:
+                try:
+                    self._queue.put(_STOP, timeout=settings.log_shutdown_timeout)
+                    self._thread.join(timeout=settings.log_shutdown_timeout)
+                except queue.Full:
+                    logger.error("Conversation log writer did not drain before exit")
+            self.store.close()
+        super().close()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "batches": self.batches,
+            "dropped": self.dropped,
+        }
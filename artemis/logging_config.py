@@ -5,6 +5,11 @@ import uuid
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 
+from artemis.config import settings
+from artemis.log_shipper import create_log_shipper
+from artemis.log_store import SegmentedLogStore
+from artemis.log_writer import BackgroundLogHandler
+
 
 class JSONFormatter(logging.Formatter):
     """Custom JSON formatter for structured logging."""
@@ -12,7 +17,8 @@ class JSONFormatter(logging.Formatter):
     def format(self, record):
         """Format log record as JSON."""
         log_entry = {
-            "timestamp": datetime.now().isoformat(),
+            # When the event happened, not when the writer thread got to it
+            "timestamp": datetime.fromtimestamp(record.created).isoformat(),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -33,12 +39,18 @@ class ConversationLogger:
         self.log_dir = log_dir
         os.makedirs(log_dir, exist_ok=True)
 
-        # Set up conversation log file (daily rotation)
-        today = datetime.now().strftime("%Y-%m-%d")
-        self.conversation_log_file = os.path.join(
-            log_dir, f"conversations_{today}.jsonl"
+        # Per-process segments, rolled daily and by size, compressed when closed
+        self.store = SegmentedLogStore(
+            log_dir,
+            max_bytes=settings.log_segment_max_bytes,
+            compression=settings.log_compression,
         )
 
+        # Optionally ship closed segments to S3-compatible storage
+        self.shipper = create_log_shipper(log_dir)
+        if self.shipper is not None:
+            self.store.on_close.append(self.shipper.notify)
+
         # Set up conversation logger
         self.conversation_logger = logging.getLogger("conversation")
         self.conversation_logger.setLevel(logging.INFO)
@@ -47,10 +59,10 @@ class ConversationLogger:
         for handler in self.conversation_logger.handlers[:]:
             self.conversation_logger.removeHandler(handler)
 
-        # Create file handler with JSON formatter
-        handler = logging.FileHandler(self.conversation_log_file, encoding="utf-8")
-        handler.setFormatter(JSONFormatter())
-        self.conversation_logger.addHandler(handler)
+        # Queue records for a background writer with JSON formatter
+        self.handler = BackgroundLogHandler(self.store)
+        self.handler.setFormatter(JSONFormatter())
+        self.conversation_logger.addHandler(self.handler)
 
         # Don't propagate to root logger
         self.conversation_logger.propagate = False
@@ -60,9 +72,11 @@ class ConversationLogger:
         user_message: str,
         assistant_response: str,
         metadata: Dict[str, Any] = None,
+        conversation_id: str = None,
     ):
         """Log a complete conversation turn."""
-        conversation_id = str(uuid.uuid4())
+        if not conversation_id:
+            conversation_id = str(uuid.uuid4())
         metadata = metadata or {}
 
         log_data = {
@@ -90,9 +104,15 @@ class ConversationLogger:
 
         return conversation_id
 
-    def log_user_message(self, message: str, metadata: Dict[str, Any] = None):
+    def log_user_message(
+        self,
+        message: str,
+        metadata: Dict[str, Any] = None,
+        conversation_id: str = None,
+    ):
         """Log just a user message (for streaming scenarios)."""
-        conversation_id = str(uuid.uuid4())
+        if not conversation_id:
+            conversation_id = str(uuid.uuid4())
         metadata = metadata or {}
 
         log_data = {
@@ -216,6 +236,23 @@ class ConversationLogger:
         record.conversation_data = log_data
         self.conversation_logger.handle(record)
 
+    def start_shipping(self):
+        """Start shipping segments left over from earlier runs."""
+        if self.shipper is not None:
+            self.shipper.start()
+
+    def close(self):
+        """Flush queued log records to disk, then ship the closed segments."""
+        self.handler.close()
+        if self.shipper is not None:
+            self.shipper.close(timeout=settings.log_shutdown_timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.handler.stats()
+        if self.shipper is not None:
+            stats["shipping"] = self.shipper.stats()
+        return stats
+
 
 # Global instance
 conversation_logger = ConversationLogger()
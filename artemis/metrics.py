@@ -0,0 +1,196 @@
+import bisect
+import math
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+# Latency buckets in seconds, from cache replays up to long tool-using turns
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+
+LabelValues = Tuple[str, ...]
+# A callback returns one value, or a value per label-value tuple
+Sampler = Callable[[], Union[float, Dict[LabelValues, float]]]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(
+    names: Sequence[str],
+    values: Sequence[str],
+    const: Optional[Dict[str, str]] = None,
+) -> str:
+    if const:
+        names = tuple(const) + tuple(names)
+        values = tuple(const.values()) + tuple(values)
+    if not names:
+        return ""
+    escaped = (
+        str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        for value in values
+    )
+    pairs = ",".join(f'{name}="{value}"' for name, value in zip(names, escaped))
+    return "{" + pairs + "}"
+
+
+class Registry:
+    """Collects metrics and renders them in the Prometheus text format.
+
+    Constant labels (e.g. the worker's pid) are added to every sample.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, "_Metric"] = {}
+        self._const_labels: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def set_const_labels(self, **labels: str):
+        with self._lock:
+            self._const_labels = {name: str(value) for name, value in labels.items()}
+
+    def register(self, metric: "_Metric"):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric '{metric.name}' is already registered")
+            self._metrics[metric.name] = metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            const = self._const_labels
+        lines: List[str] = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.render(const))
+        return "\n".join(lines) + "\n"
+
+
+class _Metric:
+    type = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        function: Optional[Sampler] = None,
+        registry: Optional[Registry] = None,
+    ):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.function = function
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+        (registry or default_registry).register(self)
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> Dict[LabelValues, float]:
+        if self.function is None:
+            with self._lock:
+                return dict(self._values)
+        sampled = self.function()
+        return sampled if isinstance(sampled, dict) else {(): sampled}
+
+    def value(self, **labels: str) -> float:
+        return self._samples().get(self._key(labels), 0.0)
+
+    def render(self, const: Optional[Dict[str, str]] = None) -> List[str]:
+        return [
+            f"{self.name}{_format_labels(self.labelnames, key, const)} "
+            f"{_format_value(value)}"
+            for key, value in sorted(self._samples().items())
+        ]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally read from a callback."""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    """Value that goes up and down, optionally read from a callback."""
+
+    type = "gauge"
+
+    def set(self, value: float, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1, **labels: str):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    """Cumulative bucket counts plus sum and count per label set."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        registry: Optional[Registry] = None,
+    ):
+        super().__init__(name, help, labelnames, registry=registry)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (per-bucket counts incl. +Inf, sum)
+        self._series: Dict[LabelValues, Tuple[List[int], float]] = {}
+
+    def observe(self, value: float, **labels: str):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self._series[key] = (counts, total + value)
+
+    def count(self, **labels: str) -> int:
+        with self._lock:
+            series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def render(self, const: Optional[Dict[str, str]] = None) -> List[str]:
+        with self._lock:
+            series = {key: (list(c), total) for key, (c, total) in self._series.items()}
+        lines = []
+        bucket_labels = self.labelnames + ("le",)
+        for key, (counts, total) in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(
+                    bucket_labels, key + (_format_value(bound),), const
+                )
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key, const)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+# Global instance
+default_registry = Registry()
@@ -0,0 +1,251 @@
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Dict, Optional
+
+import uvicorn
+
+from artemis.config import settings
+from artemis.metrics import default_registry
+
+logger = logging.getLogger(__name__)
+
+# Workers that die sooner than this after starting are restarted with a delay,
+# so a worker that crashes on startup does not spin the master
+MIN_WORKER_LIFETIME = 5.0
+
+# Worker count when neither WORKERS nor a container CPU quota is set. The host
+# core count is not used: inside a container it is the host's, not ours
+DEFAULT_WORKERS = 2
+
+CGROUP_V2_CPU_MAX = "/sys/fs/cgroup/cpu.max"
+CGROUP_V1_CPU_DIR = "/sys/fs/cgroup/cpu"
+
+
+def cpu_quota() -> Optional[float]:
+    """Return the CPU limit of this process's cgroup in cores, or None if unlimited.
+
+    Reads ``cpu.max`` (cgroup v2), falling back to ``cpu.cfs_quota_us`` and
+    ``cpu.cfs_period_us`` (cgroup v1).
+    """
+    try:
+        with open(CGROUP_V2_CPU_MAX) as f:
+            quota, period = f.read().split()[:2]
+    except (OSError, ValueError):
+        try:
+            with open(os.path.join(CGROUP_V1_CPU_DIR, "cpu.cfs_quota_us")) as f:
+                quota = f.read().strip()
+            with open(os.path.join(CGROUP_V1_CPU_DIR, "cpu.cfs_period_us")) as f:
+                period = f.read().strip()
+        except OSError:
+            return None
+    try:
+        quota_us, period_us = int(quota), int(period)
+    except ValueError:
+        return None  # "max": no limit
+    if quota_us <= 0 or period_us <= 0:
+        return None  # -1: no limit (cgroup v1)
+    return quota_us / period_us
+
+
+def default_workers() -> int:
+    """One worker per whole core of the CPU quota, else ``DEFAULT_WORKERS``."""
+    quota = cpu_quota()
+    if quota is None:
+        return DEFAULT_WORKERS
+    return max(1, int(quota))
+
+
+def memory_usage(pid: str = "self") -> Optional[Dict[str, float]]:
+    """Return RSS and its shared/private split in MiB, from /proc (Linux only).
+
+    Pages shared copy-on-write with the master count as shared until a worker
+    writes to them.
+    """
+    usage: Dict[str, float] = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                field, _, rest = line.partition(":")
+                if field in ("Rss", "Pss", "Shared_Clean", "Shared_Dirty"):
+                    usage[field] = int(rest.split()[0]) / 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    if "Rss" not in usage:
+        return None
+    shared = usage.get("Shared_Clean", 0.0) + usage.get("Shared_Dirty", 0.0)
+    return {
+        "rss": usage["Rss"],
+        "pss": usage.get("Pss", usage["Rss"]),
+        "shared": shared,
+        "private": usage["Rss"] - shared,
+    }
+
+
+def format_memory(usage: Optional[Dict[str, float]]) -> str:
+    if usage is None:
+        return "memory usage unavailable"
+    return (
+        f"RSS {usage['rss']:.1f} MiB (shared {usage['shared']:.1f} MiB, "
+        f"private {usage['private']:.1f} MiB, PSS {usage['pss']:.1f} MiB)"
+    )
+
+
+def preload(workers: int):
+    """Load the app and every tool backend once, before forking workers.
+
+    Paper text, summaries and the resume are parsed here, then the heap is
+    frozen so the workers' garbage collector never writes to those objects
+    and their pages stay shared copy-on-write. The admission limits are split
+    across the workers, since each one admits requests on its own.
+    """
+    from artemis.api.admission import admission_gate
+    from artemis.api.main import app
+    from artemis.chatbot.tools import tool_registry
+
+    admission_gate.split(workers)
+
+    start = time.perf_counter()
+    times = tool_registry.warm_up_sync()
+    print(
+        f"📦 Preloaded {len(times)} tool backends in "
+        f"{time.perf_counter() - start:.2f}s; master {format_memory(memory_usage())}"
+    )
+    gc.collect()
+    gc.freeze()
+    return app
+
+
+class PreforkServer:
+    """Pre-fork master: binds the socket once and runs uvicorn in N workers.
+
+    SIGTERM or SIGINT on the master is forwarded to every worker as SIGTERM,
+    which uvicorn treats as a graceful shutdown: it stops accepting, lets
+    in-flight requests and SSE streams finish for up to
+    ``graceful_shutdown_timeout`` seconds, then runs the shutdown events.
+    Workers still running after that (plus a margin) are killed. Workers run
+    in their own process groups, so a terminal Ctrl-C reaches them only once,
+    through the master. A worker that exits unexpectedly is replaced.
+
+    Each worker labels its ``/metrics`` samples with its pid, so the series
+    scraped from different workers stay apart.
+    """
+
+    def __init__(self, app, workers: int):
+        self.workers = workers
+        self.config = uvicorn.Config(
+            app,
+            host=settings.api_host,
+            port=settings.api_port,
+            loop="uvloop",
+            http="httptools",
+            timeout_graceful_shutdown=settings.graceful_shutdown_timeout,
+            log_level="warning",
+        )
+        self.socket: Optional[socket.socket] = None
+        self.children: Dict[int, float] = {}  # pid -> start time
+        self.stopping_since: Optional[float] = None
+
+    def _spawn(self):
+        pid = os.fork()
+        if pid == 0:
+            os.setpgid(0, 0)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            default_registry.set_const_labels(pid=str(os.getpid()))
+            code = 0
+            try:
+                uvicorn.Server(self.config).run(sockets=[self.socket])
+            except BaseException:
+                logger.exception("Worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+
+    def _stop(self, signum, frame):
+        if self.stopping_since is not None:
+            return
+        print(
+            f"🛑 Received {signal.Signals(signum).name}; draining "
+            f"{len(self.children)} workers"
+        )
+        self.stopping_since = time.monotonic()
+        for pid in self.children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def _kill_stragglers(self):
+        deadline = settings.graceful_shutdown_timeout + settings.log_shutdown_timeout
+        if time.monotonic() - self.stopping_since < deadline + 5:
+            return
+        for pid in list(self.children):
+            logger.warning(f"Worker {pid} did not exit in time; killing it")
+            try:
+                os.kill(pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def _report_memory(self):
+        for pid in self.children:
+            print(f"   Worker {pid}: {format_memory(memory_usage(str(pid)))}")
+
+    def run(self):
+        self.socket = self.config.bind_socket()
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        for _ in range(self.workers):
+            self._spawn()
+        print(
+            f"🚀 Serving on {settings.api_host}:{settings.api_port} with "
+            f"{self.workers} workers"
+        )
+        reported = False
+
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                newest = max(self.children.values())
+                if self.stopping_since is not None:
+                    self._kill_stragglers()
+                elif not reported and time.monotonic() - newest > MIN_WORKER_LIFETIME:
+                    # Workers have finished starting up; show what they share
+                    self._report_memory()
+                    reported = True
+                time.sleep(0.2)
+                continue
+
+            started = self.children.pop(pid, None)
+            if started is None or self.stopping_since is not None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            logger.error(f"Worker {pid} exited with status {code}; restarting it")
+            if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                time.sleep(1.0)
+            self._spawn()
+
+        self.socket.close()
+        print("✅ All workers stopped")
+
+
+def serve_production(workers: Optional[int] = None):
+    """Preload shared resources, then serve with pre-forked uvicorn workers."""
+    count = workers or settings.workers or default_workers()
+    app = preload(count)
+    PreforkServer(app, count).run()
+
+
+def serve_development():
+    """Single process with auto-reload, for local development."""
+    uvicorn.run(
+        "artemis.api.main:app",
+        host=settings.api_host,
+        port=settings.api_port,
+        reload=True,
+    )
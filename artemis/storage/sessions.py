@@ -0,0 +1,272 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from artemis.config import settings
+from artemis.storage.lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS messages (
+    session_id TEXT NOT NULL REFERENCES sessions(id),
+    seq INTEGER NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (session_id, seq)
+);
+"""
+
+
+def to_langchain_message(role: str, content: str) -> Optional[BaseMessage]:
+    """Convert one (role, content) pair to a LangChain message."""
+    if role == "user":
+        return HumanMessage(content=content)
+    if role == "assistant":
+        return AIMessage(content=content)
+    return None
+
+
+@dataclass
+class Session:
+    """A server-side conversation.
+
+    ``messages`` holds the raw (role, content) transcript; ``lc_messages``
+    holds the same messages already converted for the agent, so each turn only
+    converts the messages it adds.
+    """
+
+    id: str
+    messages: List[Tuple[str, str]] = field(default_factory=list)
+    lc_messages: List[BaseMessage] = field(default_factory=list)
+    # Number of stored messages, i.e. the seq the next one gets
+    seq: int = 0
+    updated_at: float = field(default_factory=time.time)
+    # False for clients that did not ask for a stored session
+    persistent: bool = True
+    # Serializes turns within one conversation
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def add(self, role: str, content: str):
+        message = to_langchain_message(role, content)
+        if message is not None:
+            self.messages.append((role, content))
+            self.lc_messages.append(message)
+
+
+def _session_size(session: Session) -> int:
+    return sum(len(content) for _, content in session.messages) + 256
+
+
+class SessionStore:
+    """Conversation sessions: an in-memory LRU tier over SQLite in WAL mode.
+
+    SQLite calls run in a worker thread so they never block the event loop.
+    The connection is opened lazily per process, so the store is safe to
+    create before forking workers. Every worker has its own memory tier, so
+    callers ``refresh`` a session before each turn to pick up messages other
+    workers appended. Sessions idle for ``session_ttl`` seconds expire.
+    """
+
+    PRUNE_EVERY = 100  # session creations between deletes of expired sessions
+
+    def __init__(self, path: Optional[str] = None, ttl: Optional[float] = None):
+        self.path = path or os.path.join(settings.data_dir, "sessions.db")
+        self.ttl = ttl if ttl is not None else settings.session_ttl
+        self.cache = LRUCache(
+            max_entries=settings.session_cache_max_entries,
+            max_bytes=settings.session_cache_max_bytes,
+            sizeof=_session_size,
+        )
+        self._conn: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+        self._lock = threading.Lock()
+        self._creates = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(
+                self.path, check_same_thread=False, timeout=10, isolation_level=None
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn, self._pid = conn, os.getpid()
+        return self._conn
+
+    def _expired(self, updated_at: float) -> bool:
+        return time.time() - updated_at >= self.ttl
+
+    def _load(
+        self, session_id: str, from_seq: int = 0
+    ) -> Optional[Tuple[float, List[Tuple[int, str, str]]]]:
+        """Return (updated_at, messages from ``from_seq`` on), or None if the
+        session is missing or expired."""
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT updated_at FROM sessions WHERE id = ?", (session_id,)
+            ).fetchone()
+            if row is None or self._expired(row[0]):
+                return None
+            messages = conn.execute(
+                "SELECT seq, role, content FROM messages "
+                "WHERE session_id = ? AND seq >= ? ORDER BY seq",
+                (session_id, from_seq),
+            ).fetchall()
+            return row[0], messages
+
+    def _insert(self, session_id: str, new: List[Tuple[str, str]]) -> int:
+        """Append messages after the last stored one; return the first seq.
+
+        The seq is read inside the write transaction, so workers appending to
+        the same session concurrently never collide.
+        """
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "INSERT INTO sessions (id, created_at, updated_at) "
+                    "VALUES (?, ?, ?) "
+                    "ON CONFLICT(id) DO UPDATE SET updated_at = excluded.updated_at",
+                    (session_id, now, now),
+                )
+                (start_seq,) = conn.execute(
+                    "SELECT COALESCE(MAX(seq) + 1, 0) FROM messages "
+                    "WHERE session_id = ?",
+                    (session_id,),
+                ).fetchone()
+                conn.executemany(
+                    "INSERT INTO messages (session_id, seq, role, content, created_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [
+                        (session_id, start_seq + i, role, content, now)
+                        for i, (role, content) in enumerate(new)
+                    ],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return start_seq
+
+    def _prune(self):
+        """Delete sessions idle for longer than the TTL, with their messages."""
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute(
+                    "DELETE FROM messages WHERE session_id IN "
+                    "(SELECT id FROM sessions WHERE updated_at <= ?)",
+                    (cutoff,),
+                )
+                deleted = conn.execute(
+                    "DELETE FROM sessions WHERE updated_at <= ?", (cutoff,)
+                ).rowcount
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        if deleted:
+            logger.info(f"Deleted {deleted} expired sessions")
+
+    async def create(self) -> Session:
+        """Start a new, empty session."""
+        session = Session(id=str(uuid.uuid4()))
+        await asyncio.to_thread(self._insert, session.id, [])
+        self.cache.set(session.id, session)
+        self._creates += 1
+        if self._creates % self.PRUNE_EVERY == 0:
+            try:
+                await asyncio.to_thread(self._prune)
+            except sqlite3.Error as e:
+                logger.error(f"Error pruning expired sessions: {str(e)}")
+        return session
+
+    def ephemeral(self) -> Session:
+        """A session for a client that keeps its own transcript; never stored."""
+        return Session(id=str(uuid.uuid4()), persistent=False)
+
+    async def get(self, session_id: str) -> Optional[Session]:
+        """Return a session from memory, falling back to SQLite."""
+        session = self.cache.get(session_id)
+        # Another worker may have kept the session alive; only SQLite knows
+        if session is not None and not self._expired(session.updated_at):
+            return session
+
+        loaded = await asyncio.to_thread(self._load, session_id)
+        if loaded is None:
+            return None
+        session = Session(id=session_id, updated_at=loaded[0])
+        self._add_rows(session, loaded[1])
+        self.cache.set(session_id, session)
+        return session
+
+    async def refresh(self, session: Session) -> bool:
+        """Pick up messages other workers appended since this one last looked.
+
+        Call with the session's lock held. Returns False if the session has
+        expired or been deleted.
+        """
+        if not session.persistent:
+            return True
+        loaded = await asyncio.to_thread(self._load, session.id, session.seq)
+        if loaded is None:
+            self.cache.delete(session.id)
+            return False
+        session.updated_at = loaded[0]
+        if loaded[1]:
+            self._add_rows(session, loaded[1])
+            self.cache.set(session.id, session)
+        return True
+
+    async def append(self, session: Session, new: List[Tuple[str, str]]):
+        """Append messages to a session in memory and on disk."""
+        if not session.persistent:
+            return
+        start_seq = await asyncio.to_thread(self._insert, session.id, new)
+        session.updated_at = time.time()
+        if start_seq != session.seq:
+            # Another worker appended in the meantime: reload in stored order
+            loaded = await asyncio.to_thread(self._load, session.id)
+            session.messages, session.lc_messages, session.seq = [], [], 0
+            self._add_rows(session, loaded[1] if loaded else [])
+        else:
+            self._add_rows(
+                session,
+                [
+                    (start_seq + i, role, content)
+                    for i, (role, content) in enumerate(new)
+                ],
+            )
+        # Re-set so the LRU tier accounts for the session's new size
+        self.cache.set(session.id, session)
+
+    @staticmethod
+    def _add_rows(session: Session, rows: List[Tuple[int, str, str]]):
+        for seq, role, content in rows:
+            session.add(role, content)
+            session.seq = seq + 1
+
+
+# Global instance
+session_store = SessionStore()
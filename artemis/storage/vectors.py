@@ -0,0 +1,35 @@
+import os
+import tempfile
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from artemis.storage.files import atomic_write_json, read_json
+
+
+def save_vectors(path: str, matrix: np.ndarray, metadata: Dict[str, Any]):
+    """Persist an embedding matrix (.npy) and its row metadata (.json) atomically."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".npy")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.save(f, matrix)
+        os.replace(tmp_path, f"{path}.npy")
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    atomic_write_json(f"{path}.json", metadata)
+
+
+def load_vectors(path: str) -> Optional[Tuple[np.ndarray, Dict[str, Any]]]:
+    """Load a matrix saved with save_vectors, or None if missing or unreadable."""
+    metadata = read_json(f"{path}.json")
+    if metadata is None:
+        return None
+    try:
+        matrix = np.load(f"{path}.npy")
+    except (OSError, ValueError):
+        return None
+    return matrix, metadata
@@ -0,0 +1,8 @@
+def estimate_tokens(text: str) -> int:
+    """Estimate the Claude token count of text without calling the API.
+
+    English prose averages about four characters per token; this slightly
+    overestimates for prose and underestimates for dense code or math, which is
+    acceptable for budgeting.
+    """
+    return (len(text) + 3) // 4
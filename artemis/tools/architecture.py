@@ -1,9 +1,10 @@
 import logging
 import os
 from typing import Dict, Any
-from langchain.tools import Tool
 from pydantic import BaseModel, Field
 
+from artemis.tools.registry import ToolSpec
+
 logger = logging.getLogger(__name__)
 
 
@@ -58,24 +59,16 @@ class ArchitectureInfo:
         else:
             return self.architecture_content
 
-    def get_tool(self) -> Tool:
-        """
-        Get the architecture info as a LangChain tool.
-        
-        Returns:
-            A LangChain Tool instance
-        """
-        return Tool(
-            name="architecture",
-            description=(
-                "Provides detailed information about Artemis' architecture, system design, "
-                "components, data flow, and deployment. Use this when asked about how Artemis "
-                "works, its technical architecture, system components, or deployment details."
-            ),
-            func=self.get_architecture_info,
-            args_schema=ArchitectureInput,
-        )
-
 
-# Create a singleton instance
-architecture_info = ArchitectureInfo()
\ No newline at end of file
+TOOL_SPEC = ToolSpec(
+    name="architecture",
+    description=(
+        "Provides detailed information about Artemis' architecture, system design, "
+        "components, data flow, and deployment. Use this when asked about how Artemis "
+        "works, its technical architecture, system components, or deployment details."
+    ),
+    args_schema=ArchitectureInput,
+    factory=ArchitectureInfo,
+    method="get_architecture_info",
+    resources=("resources/architecture-diagram.md",),
+)
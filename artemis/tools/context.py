@@ -0,0 +1,60 @@
+from dataclasses import dataclass, field
+from typing import List
+
+from artemis.tokens import estimate_tokens
+
+
+@dataclass
+class ContextCandidate:
+    """A piece of text competing for space in a tool result."""
+
+    label: str
+    text: str
+    score: float
+    tokens: int = 0
+
+    def __post_init__(self):
+        if not self.tokens:
+            self.tokens = estimate_tokens(self.text)
+
+
+@dataclass
+class AssembledContext:
+    selected: List[ContextCandidate] = field(default_factory=list)
+    dropped: List[ContextCandidate] = field(default_factory=list)
+
+    @property
+    def selected_tokens(self) -> int:
+        return sum(c.tokens for c in self.selected)
+
+    @property
+    def dropped_tokens(self) -> int:
+        return sum(c.tokens for c in self.dropped)
+
+
+def assemble_context(
+    candidates: List[ContextCandidate], token_budget: int
+) -> AssembledContext:
+    """
+    Fill a token budget greedily with the highest scoring candidates.
+
+    A candidate that does not fit is dropped, but smaller, lower scoring
+    candidates may still fill the remaining space. Selected candidates keep
+    their rank order.
+
+    Args:
+        candidates: Text pieces with relevance scores
+        token_budget: Maximum estimated tokens to select
+
+    Returns:
+        The selected and dropped candidates
+    """
+    context = AssembledContext()
+    remaining = token_budget
+    for candidate in sorted(candidates, key=lambda c: -c.score):
+        if candidate.tokens <= remaining:
+            context.selected.append(candidate)
+            remaining -= candidate.tokens
+        else:
+            context.dropped.append(candidate)
+    return context
@@ -0,0 +1,229 @@
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+from pydantic import BaseModel, Field
+
+from artemis.config import settings
+from artemis.storage.files import atomic_write_json, read_json
+from artemis.tools.registry import ToolSpec
+from artemis.tools.search import PassageIndex, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Bump when chunking or tokenization changes, to invalidate persisted chunks
+INDEX_VERSION = 1
+
+_FRONT_MATTER = re.compile(r"\A---\n(.*?)\n---\n", re.DOTALL)
+_TITLE = re.compile(r"^title:\s*[\"']?(.*?)[\"']?\s*$", re.MULTILINE)
+_HEADING = re.compile(r"^#+\s+(.*)$", re.MULTILINE)
+
+
+class DocumentsInput(BaseModel):
+    """Input schema for the documents tool."""
+
+    query: str = Field(
+        description="What to look for in Peter's blog posts, project write-ups and about-me pages"
+    )
+
+
+def chunk_markdown(
+    text: str, max_chars: int = 1200
+) -> Tuple[str, List[Tuple[int, int, str]]]:
+    """
+    Split a markdown document into paragraph-aligned chunks.
+
+    Args:
+        text: Raw markdown, optionally with Jekyll front matter
+        max_chars: Soft upper bound on chunk length
+
+    Returns:
+        The document title (or "" if none) and (start, end, text) chunks, where
+        start/end are paragraph indices with end exclusive
+    """
+    title = ""
+    match = _FRONT_MATTER.match(text)
+    if match:
+        title_match = _TITLE.search(match.group(1))
+        if title_match:
+            title = title_match.group(1)
+        text = text[match.end() :]
+    if not title:
+        heading = _HEADING.search(text)
+        if heading:
+            title = heading.group(1).strip()
+
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", text) if p.strip()]
+    chunks = []
+    start, size = 0, 0
+    for i, paragraph in enumerate(paragraphs):
+        if size and size + len(paragraph) > max_chars:
+            chunks.append((start, i, "\n\n".join(paragraphs[start:i])))
+            start, size = i, 0
+        size += len(paragraph)
+    if start < len(paragraphs):
+        chunks.append((start, len(paragraphs), "\n\n".join(paragraphs[start:])))
+    return title, chunks
+
+
+class DocumentSearch:
+    """Retrieval over the documents/ tree of markdown files.
+
+    Chunks and term counts are persisted with a manifest of file mtimes, sizes
+    and content hashes, so restarts and content updates only re-index the
+    files that actually changed.
+    """
+
+    def __init__(self):
+        self.documents_dir = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+            "documents",
+        )
+        self.index_path = os.path.join(settings.data_dir, "documents_index.json")
+        self.index = PassageIndex()
+        self.manifest: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self._last_refresh = 0.0
+        self._load_manifest()
+        self.refresh(force=True)
+
+    def _load_manifest(self):
+        """Load persisted chunks and add them to the in-memory index."""
+        stored = read_json(self.index_path, default={})
+        if stored.get("version") != INDEX_VERSION:
+            return
+        self.manifest = stored.get("files", {})
+        for relpath, entry in self.manifest.items():
+            self._index_entry(relpath, entry)
+
+    def _index_entry(self, relpath: str, entry: Dict[str, Any]):
+        self.index.add_document(
+            relpath,
+            [tuple(chunk) for chunk in entry["chunks"]],
+            term_counts=entry["term_counts"],
+        )
+
+    def _scan(self) -> Dict[str, os.stat_result]:
+        """Return the stat of every markdown file under documents/."""
+        files = {}
+        for root, _, filenames in os.walk(self.documents_dir):
+            for filename in filenames:
+                if filename.endswith(".md"):
+                    path = os.path.join(root, filename)
+                    files[os.path.relpath(path, self.documents_dir)] = os.stat(path)
+        return files
+
+    def refresh(self, force: bool = False):
+        """Re-index files whose content changed since the last refresh."""
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self._last_refresh
+            if not force and elapsed < settings.documents_refresh_interval:
+                return
+            self._last_refresh = now
+
+            start = time.perf_counter()
+            reindexed, touched = 0, False
+            files = self._scan()
+
+            for relpath in set(self.manifest) - set(files):
+                self.index.remove_document(relpath)
+                del self.manifest[relpath]
+                touched = True
+
+            for relpath, stat in sorted(files.items()):
+                entry = self.manifest.get(relpath)
+                if (
+                    entry
+                    and entry["mtime_ns"] == stat.st_mtime_ns
+                    and entry["size"] == stat.st_size
+                ):
+                    continue
+
+                with open(os.path.join(self.documents_dir, relpath), "rb") as f:
+                    content = f.read()
+                digest = hashlib.sha256(content).hexdigest()
+                touched = True
+                if entry and entry["sha256"] == digest:
+                    # Touched but unchanged: just record the new mtime
+                    entry["mtime_ns"] = stat.st_mtime_ns
+                    entry["size"] = stat.st_size
+                    continue
+
+                title, chunks = chunk_markdown(content.decode("utf-8"))
+                entry = {
+                    "mtime_ns": stat.st_mtime_ns,
+                    "size": stat.st_size,
+                    "sha256": digest,
+                    "title": title or relpath,
+                    "chunks": chunks,
+                    "term_counts": [dict(Counter(tokenize(c[2]))) for c in chunks],
+                }
+                self.manifest[relpath] = entry
+                self._index_entry(relpath, entry)
+                reindexed += 1
+
+            if touched:
+                atomic_write_json(
+                    self.index_path, {"version": INDEX_VERSION, "files": self.manifest}
+                )
+            if force or reindexed:
+                size = (
+                    os.path.getsize(self.index_path)
+                    if os.path.exists(self.index_path)
+                    else 0
+                )
+                logger.info(
+                    f"Documents index: {len(files)} files ({reindexed} re-indexed), "
+                    f"{len(self.index)} passages, {size / 1024:.1f} KB on disk, "
+                    f"{time.perf_counter() - start:.3f}s"
+                )
+
+    def search_documents(self, query: str) -> str:
+        """
+        Return the passages from documents/ that best match the query.
+
+        Args:
+            query: What to look for
+
+        Returns:
+            Numbered passages with their source document titles
+        """
+        try:
+            self.refresh()
+            with self._lock:
+                hits = self.index.search(query, top_k=settings.documents_top_k)
+                if not hits:
+                    return f"No documents matched '{query}'."
+
+                parts = [f"Query: {query}\n"]
+                for i, hit in enumerate(hits, start=1):
+                    doc_id = hit.passage.doc_id
+                    title = self.manifest[doc_id]["title"]
+                    parts.append(f"[{i}] {title} ({doc_id})\n{hit.passage.text}\n")
+            return "\n".join(parts)
+
+        except Exception as e:
+            error_msg = f"Error searching documents: {str(e)}"
+            logger.error(error_msg)
+            return error_msg
+
+
+TOOL_SPEC = ToolSpec(
+    name="documents",
+    description=(
+        "Searches Peter's own writing: blog posts (statistics, data science interviews, "
+        "engineering, network comparison, genre classification and more), project "
+        "write-ups from his portfolio, and about-me pages. Returns the most relevant "
+        "passages. Use this when asked what Peter has written or thinks about a topic, "
+        "or for detail on a specific past project."
+    ),
+    args_schema=DocumentsInput,
+    factory=DocumentSearch,
+    method="search_documents",
+    resources=("documents",),
+)
@@ -0,0 +1,127 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+from artemis.config import settings
+from artemis.storage.lru import LRUCache
+
+logger = logging.getLogger(__name__)
+
+
+def resource_version(paths: Iterable[str]) -> str:
+    """
+    Fingerprint a set of files and directories by path, mtime and size.
+
+    Directories are walked, so adding, removing or editing any file under
+    them changes the version.
+    """
+    stamp = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, filenames in sorted(os.walk(path)):
+                for filename in sorted(filenames):
+                    file_path = os.path.join(root, filename)
+                    stat = os.stat(file_path)
+                    stamp.append((file_path, stat.st_mtime_ns, stat.st_size))
+        elif os.path.exists(path):
+            stat = os.stat(path)
+            stamp.append((path, stat.st_mtime_ns, stat.st_size))
+        else:
+            stamp.append((path, None, None))
+    return hashlib.sha256(json.dumps(stamp).encode("utf-8")).hexdigest()[:16]
+
+
+def is_error_result(result: Any) -> bool:
+    """
+    Whether a tool reported a failure in its result instead of raising.
+
+    Tools hand errors to the model as text ("Error ...", or JSON with an
+    "error" key), so a failed call returns a string like any other result.
+    """
+    if not isinstance(result, str):
+        return False
+    return result.lstrip().lower().startswith(("error", '{"error"'))
+
+
+class ToolResultMemo:
+    """Memoizes tool results keyed on tool name, canonical args and resource version.
+
+    Tools are deterministic functions of their arguments and their backing
+    files, so a result can be reused until one of those files changes.
+    """
+
+    def __init__(self):
+        self.cache = LRUCache(
+            max_entries=settings.tool_memo_max_entries,
+            max_bytes=settings.tool_memo_max_bytes,
+        )
+        self.hits: Counter = Counter()
+        self.calls: Counter = Counter()
+        # tool name -> (checked_at, version); avoids walking directories per call
+        self._versions: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    def _version(self, name: str, resources: Tuple[str, ...]) -> str:
+        now = time.monotonic()
+        checked = self._versions.get(name)
+        if checked and now - checked[0] < settings.tool_memo_version_ttl:
+            return checked[1]
+        version = resource_version(resources)
+        self._versions[name] = (now, version)
+        return version
+
+    def call(
+        self,
+        name: str,
+        canonical_args: Dict[str, Any],
+        resources: Tuple[str, ...],
+        run: Callable[[], Any],
+        is_error: Callable[[Any], bool] = is_error_result,
+    ) -> Any:
+        """Return the memoized result for these args, or run the tool and store it.
+
+        Errors are returned but not stored, so a transient failure is retried
+        on the next call rather than served until the resources change.
+        """
+        if not settings.tool_memo_enabled:
+            return run()
+
+        key = (
+            name,
+            json.dumps(canonical_args, sort_keys=True, default=str),
+            self._version(name, resources),
+        )
+        result = self.cache.get(key)
+        hit = result is not None
+        if not hit:
+            result = run()
+            if not is_error(result):
+                self.cache.set(key, result)
+
+        with self._lock:
+            self.calls[name] += 1
+            if hit:
+                self.hits[name] += 1
+            calls, hits = self.calls[name], self.hits[name]
+        if calls % settings.tool_memo_log_every == 0:
+            logger.info(
+                f"Tool memo '{name}': {hits}/{calls} hits ({hits / calls:.0%}), "
+                f"{self.cache.current_bytes} bytes cached, "
+                f"{self.cache.evictions} evictions"
+            )
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "calls": calls,
+                "hits": self.hits[name],
+                "hit_rate": self.hits[name] / calls,
+            }
+            for name, calls in self.calls.items()
+        }
@@ -0,0 +1,177 @@
+import logging
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+import pypdf
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ExtractedPDF:
+    """Text extracted from one PDF, with per-page timings."""
+
+    filename: str
+    text: str
+    pages: int
+    page_seconds: List[float] = field(default_factory=list)
+
+    @property
+    def seconds(self) -> float:
+        return sum(self.page_seconds)
+
+
+def _page_count(filepath: str) -> int:
+    """Return the number of pages in a PDF."""
+    with open(filepath, "rb") as file:
+        return len(pypdf.PdfReader(file).pages)
+
+
+def _extract_pages(
+    filepath: str, start: int, stop: int
+) -> List[Tuple[int, str, float]]:
+    """Extract text from pages [start, stop) as (page_number, text, seconds)."""
+    results = []
+    with open(filepath, "rb") as file:
+        pdf_reader = pypdf.PdfReader(file)
+        for page_number in range(start, stop):
+            page_start = time.perf_counter()
+            text = pdf_reader.pages[page_number].extract_text()
+            results.append((page_number, text, time.perf_counter() - page_start))
+    return results
+
+
+def _resolve_workers(max_workers: Optional[int]) -> int:
+    if not max_workers or max_workers < 1:
+        return os.cpu_count() or 1
+    return max_workers
+
+
+def extract_pdfs(
+    filepaths: List[str], max_workers: Optional[int] = None
+) -> Dict[str, ExtractedPDF]:
+    """
+    Extract text from several PDFs across a process pool.
+
+    Work is split at file granularity (page counts) and then at page
+    granularity (page ranges), so one large paper is spread over all workers.
+    Results are merged in the order of ``filepaths`` and page order, whatever
+    order the workers finish in.
+
+    Args:
+        filepaths: PDFs to extract
+        max_workers: Worker processes to use; 0 or None means one per core
+
+    Returns:
+        Mapping of file path to ExtractedPDF, in the order given
+    """
+    workers = _resolve_workers(max_workers)
+    start = time.perf_counter()
+
+    if workers == 1:
+        pool = _InlineExecutor()
+    else:
+        # Spawn rather than fork: backends may be built from a warm-up thread
+        context = multiprocessing.get_context("spawn")
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+    with pool:
+        page_counts = _count_pages(
+            [pool.submit(_page_count, path) for path in filepaths], filepaths
+        )
+        page_results = _extract_in_pool(pool, page_counts, workers)
+
+    extracted = {}
+    for path, count in page_counts.items():
+        if page_results.get(path) is None:
+            continue
+        pages = sorted(page_results[path])
+        extracted[path] = ExtractedPDF(
+            filename=os.path.basename(path),
+            text="\n".join(text for _, text, _ in pages),
+            pages=count,
+            page_seconds=[seconds for _, _, seconds in pages],
+        )
+        _log_timings(extracted[path])
+
+    logger.info(
+        f"Extracted {len(extracted)} PDFs ({sum(page_counts.values())} pages) "
+        f"with {workers} workers in {time.perf_counter() - start:.2f}s"
+    )
+    return extracted
+
+
+class _InlineExecutor(Executor):
+    """Executor that runs each task immediately in the calling thread."""
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def _count_pages(futures, filepaths: List[str]) -> Dict[str, int]:
+    """Collect page counts in input order, skipping unreadable files."""
+    page_counts = {}
+    for path, future in zip(filepaths, futures):
+        try:
+            page_counts[path] = future.result()
+        except Exception as e:
+            logger.error(f"Error loading paper {os.path.basename(path)}: {str(e)}")
+    return page_counts
+
+
+def _collect(future, path: str) -> Optional[List[Tuple[int, str, float]]]:
+    try:
+        return future.result()
+    except Exception as e:
+        logger.error(f"Error extracting text from {os.path.basename(path)}: {str(e)}")
+        return None
+
+
+def _extract_in_pool(
+    pool: Executor, page_counts: Dict[str, int], workers: int
+) -> Dict[str, Optional[List[Tuple[int, str, float]]]]:
+    """Fan page ranges out over the pool, sized so each worker gets several."""
+    total_pages = sum(page_counts.values())
+    pages_per_task = max(1, math.ceil(total_pages / (workers * 4)))
+
+    futures = []
+    for path, count in page_counts.items():
+        for page_start in range(0, count, pages_per_task):
+            page_stop = min(count, page_start + pages_per_task)
+            futures.append(
+                (path, pool.submit(_extract_pages, path, page_start, page_stop))
+            )
+
+    page_results: Dict[str, Optional[List[Tuple[int, str, float]]]] = {
+        path: [] for path in page_counts
+    }
+    for path, future in futures:
+        pages = _collect(future, path)
+        if pages is None or page_results[path] is None:
+            # One failed range invalidates the whole paper
+            page_results[path] = None
+        else:
+            page_results[path].extend(pages)
+    return page_results
+
+
+def _log_timings(pdf: ExtractedPDF):
+    """Log per-file and per-page extraction timings."""
+    if pdf.page_seconds:
+        slowest = pdf.page_seconds.index(max(pdf.page_seconds))
+        logger.info(
+            f"Extracted {pdf.filename}: {pdf.pages} pages, {pdf.seconds:.2f}s "
+            f"(slowest page {slowest + 1}: {pdf.page_seconds[slowest]:.2f}s)"
+        )
+    for page_number, seconds in enumerate(pdf.page_seconds, start=1):
+        logger.debug(f"Extracted {pdf.filename} page {page_number} in {seconds:.3f}s")
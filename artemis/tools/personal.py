@@ -1,7 +1,8 @@
 import logging
-from langchain.tools import Tool
 from pydantic import BaseModel, Field
 
+from artemis.tools.registry import ToolSpec
+
 logger = logging.getLogger(__name__)
 
 
@@ -75,24 +76,16 @@ class PersonalInfo:
             logger.error(error_msg)
             return error_msg
 
-    def get_tool(self) -> Tool:
-        """
-        Get the personal info as a LangChain tool.
 
-        Returns:
-            A LangChain Tool instance
-        """
-        return Tool(
-            name="personal",
-            description=(
-                "Get Peter's personal background information including his upbringing, education, "
-                "life experiences, interests, and personal qualities. Use this tool when someone "
-                "asks about Peter generally or his qualities as a human being."
-            ),
-            func=self.get_personal_info_text,
-            args_schema=PersonalInput,
-        )
-
-
-# Create a singleton instance
-personal_info = PersonalInfo()
+TOOL_SPEC = ToolSpec(
+    name="personal",
+    description=(
+        "Get Peter's personal background information including his upbringing, education, "
+        "life experiences, interests, and personal qualities. Use this tool when someone "
+        "asks about Peter generally or his qualities as a human being."
+    ),
+    args_schema=PersonalInput,
+    factory=PersonalInfo,
+    method="get_personal_info_text",
+    resources=("artemis/tools/personal.py",),
+)
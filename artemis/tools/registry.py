@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+from langchain_core.tools import BaseTool, StructuredTool
+from pydantic import BaseModel
+
+from artemis.tools.memo import ToolResultMemo
+
+logger = logging.getLogger(__name__)
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+
+
+@dataclass(frozen=True)
+class ToolSpec:
+    """Static description of a tool: everything bind_tools needs, plus how to
+    build the backend that actually answers calls."""
+
+    name: str
+    description: str
+    args_schema: Type[BaseModel]
+    factory: Callable[[], Any]
+    method: str
+    # Files/directories (relative to the project root) that results depend on
+    resources: Tuple[str, ...] = ()
+
+
+class ToolRegistry:
+    """Lazily constructed tool backends.
+
+    Tool names and schemas are available immediately; each backend is built
+    the first time it is called or when ``warm_up`` runs, whichever is first.
+    """
+
+    def __init__(self, specs: List[ToolSpec]):
+        self.specs = {spec.name: spec for spec in specs}
+        self.construction_times: Dict[str, float] = {}
+        self._backends: Dict[str, Any] = {}
+        self._locks = {name: threading.Lock() for name in self.specs}
+        self.memo = ToolResultMemo()
+        self._resources = {
+            name: tuple(os.path.join(PROJECT_ROOT, path) for path in spec.resources)
+            for name, spec in self.specs.items()
+        }
+
+    def get_backend(self, name: str) -> Any:
+        """Return the backend for a tool, constructing it on first use."""
+        backend = self._backends.get(name)
+        if backend is not None:
+            return backend
+
+        with self._locks[name]:
+            if name not in self._backends:
+                start = time.perf_counter()
+                self._backends[name] = self.specs[name].factory()
+                elapsed = time.perf_counter() - start
+                self.construction_times[name] = elapsed
+                logger.info(f"Constructed tool backend '{name}' in {elapsed:.3f}s")
+            return self._backends[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._backends
+
+    def _call(self, name: str, **kwargs) -> Any:
+        spec = self.specs[name]
+        # Fill in defaults so equivalent calls share one memo entry
+        canonical_args = spec.args_schema(**kwargs).model_dump()
+        return self.memo.call(
+            name,
+            canonical_args,
+            self._resources[name],
+            lambda: getattr(self.get_backend(name), spec.method)(**kwargs),
+        )
+
+    def get_tools(self) -> List[BaseTool]:
+        """Build LangChain tools without constructing any backends."""
+        return [
+            StructuredTool(
+                name=spec.name,
+                description=spec.description,
+                args_schema=spec.args_schema,
+                func=partial(self._call, spec.name),
+            )
+            for spec in self.specs.values()
+        ]
+
+    def warm_up_sync(self) -> Dict[str, float]:
+        """Construct every backend in the current thread."""
+        for name in self.specs:
+            try:
+                self.get_backend(name)
+            except Exception as e:
+                logger.error(f"Error warming up tool '{name}': {str(e)}")
+        return dict(self.construction_times)
+
+    async def warm_up(self) -> Dict[str, float]:
+        """Construct every backend off the event loop."""
+        return await asyncio.to_thread(self.warm_up_sync)
+
+    def stats(self) -> Dict[str, Any]:
+        """Report backend load state, construction time and memo hit rates."""
+        memo_stats = self.memo.stats()
+        return {
+            name: {
+                "loaded": self.is_loaded(name),
+                "construction_seconds": self.construction_times.get(name),
+                "memo": memo_stats.get(name),
+            }
+            for name in self.specs
+        }
@@ -1,13 +1,29 @@
 import logging
-from typing import Dict, Any, Union, List
-from langchain.tools import Tool
+from typing import Dict, List
 from pydantic import BaseModel, Field
-import pypdf
 import os
 import re
 
+from artemis.config import settings
+from artemis.tools.context import ContextCandidate, assemble_context
+from artemis.tools.pdf_extract import extract_pdfs
+from artemis.tools.registry import ToolSpec
+from artemis.tools.search import STOPWORDS, PassageIndex, line_windows
+
 logger = logging.getLogger(__name__)
 
+# Words that say a question is about the research in general rather than
+# about something specific inside a paper
+QUERY_STOPWORDS = STOPWORDS | frozenset(
+    """
+    peter wills research paper papers work publication publications interest
+    interests academic study studies
+    """.split()
+)
+
+# Summaries of Peter's primary research, listed first for general questions
+PRIMARY_PAPERS = ("change-point-detection", "metrics-for-graph-comparison")
+
 
 class ResearchDeepDiveInput(BaseModel):
     """Input schema for the research deep dive tool."""
@@ -32,30 +48,29 @@ class ResearchDeepDive:
         )
         self.papers = {}
         self.summaries = {}
+        self.summary_sections: Dict[str, List[str]] = {}
+        self.index = PassageIndex()
         self._load_papers()
         self._load_summaries()
+        self._build_index()
 
     def _load_papers(self):
-        """Load and extract text from all research PDFs."""
+        """Load and extract text from all research PDFs in parallel."""
         try:
-            for filename in os.listdir(self.research_dir):
-                if filename.endswith(".pdf"):
-                    filepath = os.path.join(self.research_dir, filename)
-                    try:
-                        with open(filepath, "rb") as file:
-                            pdf_reader = pypdf.PdfReader(file)
-                            text_parts = []
-                            for page in pdf_reader.pages:
-                                text_parts.append(page.extract_text())
-                            paper_name = filename.replace(".pdf", "").replace("-", " ")
-                            self.papers[paper_name] = {
-                                "filename": filename,
-                                "text": "\n".join(text_parts),
-                                "pages": len(pdf_reader.pages),
-                            }
-                            logger.info(f"Successfully loaded paper: {filename}")
-                    except Exception as e:
-                        logger.error(f"Error loading paper {filename}: {str(e)}")
+            filepaths = [
+                os.path.join(self.research_dir, filename)
+                for filename in sorted(os.listdir(self.research_dir))
+                if filename.endswith(".pdf")
+            ]
+            extracted = extract_pdfs(filepaths, settings.pdf_extract_workers)
+            for pdf in extracted.values():
+                paper_name = pdf.filename.replace(".pdf", "").replace("-", " ")
+                self.papers[paper_name] = {
+                    "filename": pdf.filename,
+                    "text": pdf.text,
+                    "pages": pdf.pages,
+                }
+                logger.info(f"Successfully loaded paper: {pdf.filename}")
         except Exception as e:
             logger.error(f"Error accessing research directory: {str(e)}")
 
@@ -81,116 +96,119 @@ class ResearchDeepDive:
         except Exception as e:
             logger.error(f"Error loading summaries: {str(e)}")
 
-    def _extract_sections(self, text: str) -> Dict[str, str]:
-        """Extract common sections from a research paper."""
-        sections = {}
-        current_section = "introduction"
-        current_content = []
-
-        # Common section headers in research papers
-        section_patterns = [
-            r"abstract",
-            r"introduction",
-            r"related\s+work",
-            r"background",
-            r"methodology",
-            r"methods",
-            r"approach",
-            r"experiments",
-            r"results",
-            r"discussion",
-            r"conclusion",
-            r"future\s+work",
-            r"references",
-            r"appendix",
-        ]
-
-        lines = text.split("\n")
-        for line in lines:
-            line_lower = line.lower().strip()
-
-            # Check if this line is a section header
-            is_section = False
-            for pattern in section_patterns:
-                if re.match(rf"^\d*\.?\s*{pattern}", line_lower) and len(line) < 50:
-                    is_section = True
-                    if current_content:
-                        sections[current_section] = "\n".join(current_content)
-                    current_section = pattern.replace(r"\s+", " ")
-                    current_content = []
-                    break
-
-            if not is_section:
-                current_content.append(line)
-
-        # Add the last section
-        if current_content:
-            sections[current_section] = "\n".join(current_content)
-
-        return sections
-
-    def _search_context(
-        self, text: str, query: str, context_lines: int = 5
-    ) -> List[str]:
-        """Search for query terms and return with context."""
-        lines = text.split("\n")
-        query_terms = [term.lower() for term in query.split() if len(term) > 2]
-        results = []
-
-        for i, line in enumerate(lines):
-            line_lower = line.lower()
-            if any(term in line_lower for term in query_terms):
-                # Get context
-                start = max(0, i - context_lines)
-                end = min(len(lines), i + context_lines + 1)
-                context = lines[start:end]
-                results.append("\n".join(context))
-
-        return results
+    def _split_summary(self, summary: str) -> List[str]:
+        """Split a markdown summary into its level-2 sections."""
+        sections = re.split(r"\n(?=## )", summary)
+        # Drop the title-only preamble before the first section
+        return [section.strip() for section in sections if section.startswith("## ")]
+
+    def _build_index(self):
+        """Index paper passages and summary sections together for ranking."""
+        for paper_name, info in self.papers.items():
+            self.index.add_document(paper_name, line_windows(info["text"]))
+        for key, summary in self.summaries.items():
+            sections = self._split_summary(summary)
+            self.summary_sections[key] = sections
+            self.index.add_document(
+                f"{key} summary",
+                [(i, i + 1, section) for i, section in enumerate(sections)],
+            )
+        logger.info(
+            f"Indexed {len(self.index)} passages and sections from "
+            f"{len(self.papers)} papers and {len(self.summaries)} summaries"
+        )
+
+    def _rank_candidates(self, query: str, paper_name: str) -> List[ContextCandidate]:
+        """Rank summary sections and paper passages against the query."""
+        doc_filter = None
+        if paper_name:
+            wanted = paper_name.lower().replace("-", " ")
+            doc_filter = lambda doc_id: wanted in doc_id.replace("-", " ")
+
+        hits = self.index.search(
+            query,
+            top_k=settings.research_candidates,
+            doc_filter=doc_filter,
+            stopwords=QUERY_STOPWORDS,
+        )
+        candidates = []
+        for hit in hits:
+            doc_id = hit.passage.doc_id
+            if doc_id.endswith(" summary"):
+                label = f"Summary of {doc_id[: -len(' summary')]}"
+            else:
+                label = f"Passage from {doc_id}"
+            candidates.append(ContextCandidate(label, hit.passage.text, hit.score))
+        if candidates:
+            return candidates
+
+        # General question: summary sections in reading order, interleaved across
+        # papers so each paper's overview comes before any paper's details
+        keys = sorted(
+            (k for k in self.summaries if paper_name.lower() in k),
+            key=lambda k: k not in PRIMARY_PAPERS,
+        )
+        depth = max((len(self.summary_sections[k]) for k in keys), default=0)
+        rank = 0
+        for i in range(depth):
+            for key in keys:
+                if i < len(self.summary_sections[key]):
+                    candidates.append(
+                        ContextCandidate(
+                            f"Summary of {key}", self.summary_sections[key][i], -rank
+                        )
+                    )
+                    rank += 1
+        return candidates
 
     def query_research(self, query: str, paper_name: str = "") -> str:
         """
-        Return research paper summaries for the given query.
+        Return research context for the given query, within a token budget.
+
+        Summary sections and full-text passages are ranked against the query
+        and packed greedily into ``settings.research_token_budget`` tokens.
+        General questions that match nothing specific get the summaries'
+        opening sections instead.
 
         Args:
-            query: Question about the research (used for context)
+            query: Question about the research
             paper_name: Optional specific paper to search in
 
         Returns:
-            Research paper summaries relevant to the query
+            Summary sections and passages relevant to the query
         """
         try:
             if not self.summaries:
                 return "Error: No research paper summaries loaded"
 
-            # Build context from summaries
-            context_parts = []
-            
-            # Add context about the query
-            context_parts.append(f"Query: {query}\n")
-            
-            if paper_name:
-                # Find matching paper summary
-                matched = False
-                for key, summary in self.summaries.items():
-                    if paper_name.lower() in key.lower():
-                        context_parts.append(f"Paper Summary for '{key}':\n{summary}")
-                        matched = True
-                        break
-                if not matched:
-                    return f"Paper '{paper_name}' not found. Available papers: {', '.join(self.summaries.keys())}"
-            else:
-                # Include all summaries
+            if paper_name and not any(
+                paper_name.lower() in key.lower() for key in self.summaries
+            ):
+                return f"Paper '{paper_name}' not found. Available papers: {', '.join(self.summaries.keys())}"
+
+            candidates = self._rank_candidates(query, paper_name)
+            context = assemble_context(candidates, settings.research_token_budget)
+            logger.info(
+                f"Research context: selected {context.selected_tokens} tokens "
+                f"({len(context.selected)} items), dropped {context.dropped_tokens} "
+                f"tokens ({len(context.dropped)} items)"
+            )
+
+            context_parts = [f"Query: {query}\n"]
+            context_parts.append(
+                "Research context (Peter Wills' Research). "
+                "Note: Peter's primary research focus is on graph/network analysis, "
+                "particularly the two papers on Change Point Detection in a Dynamic Stochastic Blockmodel "
+                "and Metrics for Graph Comparison.\n"
+            )
+            for i, candidate in enumerate(context.selected, start=1):
+                context_parts.append(f"[{i}] {candidate.label}\n{candidate.text}\n")
+            if context.dropped:
                 context_parts.append(
-                    "Research Paper Summaries (Peter Wills' Research):\n"
+                    f"({len(context.dropped)} less relevant items omitted. "
+                    f"Available papers: {', '.join(self.summaries.keys())}; "
+                    "pass paper_name or a more specific query for more detail.)"
                 )
-                context_parts.append(
-                    "Note: Peter's primary research focus is on graph/network analysis, "
-                    "particularly the two papers on Change Point Detection in a Dynamic Stochastic Blockmodel "
-                    "and Metrics for Graph Comparison.\n"
-                )
-                for key, summary in self.summaries.items():
-                    context_parts.append(f"\n=== {key.replace('-', ' ').title()} ===\n{summary}\n")
 
             return "\n".join(context_parts)
 
@@ -218,27 +236,20 @@ class ResearchDeepDive:
 
         return "\n".join(paper_list)
 
-    def get_tool(self) -> Tool:
-        """
-        Get the research deep dive as a LangChain tool.
-
-        Returns:
-            A LangChain Tool instance
-        """
-        return Tool(
-            name="research",
-            description=(
-                "Retrieves research paper summaries about Peter Wills' academic work. "
-                "Returns summaries of Peter's research papers for context injection. "
-                "Can return all paper summaries or focus on a specific paper. "
-                "Use this tool to get research context that will be used to answer questions. "
-                "Example queries: 'tell me about Peter's research', 'graph comparison metrics', "
-                "'what is a droplet soliton', 'research interests', 'publications'"
-            ),
-            func=lambda query, paper_name="": self.query_research(query, paper_name),
-            args_schema=ResearchDeepDiveInput,
-        )
-
 
-# Create a singleton instance
-research_deepdive = ResearchDeepDive()
+TOOL_SPEC = ToolSpec(
+    name="research",
+    description=(
+        "Retrieves research context about Peter Wills' academic work. "
+        "Returns the summary sections and full-text passages most relevant to the query; "
+        "general questions get an overview of each paper. "
+        "Can search all papers or focus on a specific paper. "
+        "Use this tool to get research context that will be used to answer questions. "
+        "Example queries: 'tell me about Peter's research', 'graph comparison metrics', "
+        "'what is a droplet soliton', 'research interests', 'publications'"
+    ),
+    args_schema=ResearchDeepDiveInput,
+    factory=ResearchDeepDive,
+    method="query_research",
+    resources=("resources/research",),
+)
@@ -1,19 +1,53 @@
 import logging
 import json
 import os
-from typing import Dict, Any, Optional
-from langchain.tools import Tool
+from typing import Dict, Any, Literal, Optional, Tuple
 from pydantic import BaseModel, Field
 import pypdf
 
+from artemis.tools.registry import ToolSpec
+
 logger = logging.getLogger(__name__)
 
 
+# Section selector -> key in the parsed resume JSON
+RESUME_SECTIONS = {
+    "all": None,
+    "personal": "personalInfo",
+    "skills": "technicalSkills",
+    "experience": "professionalExperience",
+    "education": "education",
+    "publications": "publications",
+    "projects": "projectNarratives",
+}
+
+
+def _compact_json(data: Any) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
 class ResumeInfoInput(BaseModel):
     """Input schema for the resume info tool."""
 
     query: str = Field(
-        description="Not used - the tool returns complete resume JSON regardless of input. Kept for compatibility."
+        default="",
+        description="Not used - select what to return with section. Kept for compatibility.",
+    )
+    section: Literal[
+        "all",
+        "personal",
+        "skills",
+        "experience",
+        "education",
+        "publications",
+        "projects",
+    ] = Field(
+        default="all",
+        description=(
+            "Which part of the resume to return: 'personal' (name, title, contact), "
+            "'skills', 'experience', 'education', 'publications', 'projects' "
+            "(detailed project narratives), or 'all'."
+        ),
     )
 
 
@@ -31,8 +65,17 @@ class ResumeInfo:
             "resources",
             "resume_parsed.json",
         )
+        self.projects_path = os.path.join(
+            os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+            "resources",
+            "professional",
+            "projects.md",
+        )
         self.resume_data = None
+        self._serialized: Dict[str, str] = {}
+        self._versions: Optional[Tuple[Optional[int], Optional[int]]] = None
         self._initialize_resume_data()
+        self._serialize_sections()
 
     def _extract_pdf_text(self) -> str:
         """Extract text from the resume PDF."""
@@ -185,65 +228,93 @@ Return ONLY valid JSON, no markdown formatting, no code blocks, no additional te
             logger.error(f"Error initializing resume data: {str(e)}")
             self.resume_data = {"error": "Failed to parse resume"}
 
-    def query_resume(self, query: str) -> str:
+    def _source_versions(self) -> Tuple[Optional[int], Optional[int]]:
+        """Return the mtimes of the parsed resume JSON and projects.md."""
+        versions = []
+        for path in (self.cache_path, self.projects_path):
+            try:
+                versions.append(os.stat(path).st_mtime_ns)
+            except OSError:
+                versions.append(None)
+        return tuple(versions)
+
+    def _serialize_sections(self):
+        """Pre-serialize each resume section, rebuilding only if sources changed."""
+        versions = self._source_versions()
+        if versions == self._versions:
+            return
+
+        if self._versions is not None and versions[0] != self._versions[0]:
+            logger.info("Parsed resume changed on disk, reloading")
+            self._initialize_resume_data()
+
+        try:
+            with open(self.projects_path, "r") as f:
+                projects_content = f.read()
+        except Exception as e:
+            logger.warning(f"Could not read projects.md: {str(e)}")
+            projects_content = "Projects file not available"
+
+        if not self.resume_data or "error" in self.resume_data:
+            unavailable = json.dumps({"error": "Resume data not available"})
+            serialized = {section: unavailable for section in RESUME_SECTIONS}
+        else:
+            full_data = {**self.resume_data, "projectNarratives": projects_content}
+            serialized = {"all": _compact_json(full_data)}
+            for section, key in RESUME_SECTIONS.items():
+                if section == "projects":
+                    # Markdown is smaller and more readable unescaped
+                    serialized[section] = projects_content
+                elif key is not None:
+                    serialized[section] = _compact_json(
+                        {key: self.resume_data.get(key)}
+                    )
+
+        # Swap in atomically so concurrent readers never see a partial rebuild
+        self._serialized = serialized
+        self._versions = versions
+
+    def query_resume(self, query: str = "", section: str = "all") -> str:
         """
-        Return the structured resume data as JSON with projects narrative.
+        Return a section of the structured resume data.
 
         Args:
             query: Not used - kept for compatibility
+            section: One of RESUME_SECTIONS; "all" returns everything
 
         Returns:
-            JSON string of the structured resume data with projects
+            Compact JSON for the section, or markdown for "projects"
         """
         try:
-            if not self.resume_data or "error" in self.resume_data:
-                return json.dumps({"error": "Resume data not available"})
-
-            # Create a copy of resume data to avoid modifying the cached version
-            result_data = self.resume_data.copy()
-
-            # Read projects.md file
-            projects_path = os.path.join(
-                os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
-                "resources",
-                "professional",
-                "projects.md",
-            )
-
-            try:
-                with open(projects_path, "r") as f:
-                    projects_content = f.read()
-                result_data["projectNarratives"] = projects_content
-            except Exception as e:
-                logger.warning(f"Could not read projects.md: {str(e)}")
-                result_data["projectNarratives"] = "Projects file not available"
-
-            return json.dumps(result_data, indent=2)
+            if section not in RESUME_SECTIONS:
+                return json.dumps(
+                    {
+                        "error": f"Unknown section '{section}'",
+                        "sections": list(RESUME_SECTIONS),
+                    }
+                )
+            self._serialize_sections()
+            return self._serialized[section]
 
         except Exception as e:
             error_msg = f"Error accessing resume data: {str(e)}"
             logger.error(error_msg)
             return json.dumps({"error": error_msg})
 
-    def get_tool(self) -> Tool:
-        """
-        Get the resume info as a LangChain tool.
-
-        Returns:
-            A LangChain Tool instance
-        """
-        return Tool(
-            name="resume",
-            description=(
-                "Get Peter's complete professional resume data as structured JSON. "
-                "Returns all information including personal info, technical skills, work experience, education, and publications. "
-                "Also includes detailed project narratives from Peter's work history with specific accomplishments and impact. "
-                "The agent can then analyze this data to answer specific questions about Peter's background."
-            ),
-            func=self.query_resume,
-            args_schema=ResumeInfoInput,
-        )
-
 
-# Create a singleton instance
-resume_info = ResumeInfo()
+TOOL_SPEC = ToolSpec(
+    name="resume",
+    description=(
+        "Get Peter's professional resume data as structured JSON. "
+        "Select a section - personal info, technical skills, work experience, education, "
+        "publications, or detailed project narratives with specific accomplishments and impact - "
+        "or 'all' for everything. Prefer the narrowest section that answers the question."
+    ),
+    args_schema=ResumeInfoInput,
+    factory=ResumeInfo,
+    method="query_resume",
+    resources=(
+        "resources/resume_parsed.json",
+        "resources/professional/projects.md",
+    ),
+)
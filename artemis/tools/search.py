@@ -0,0 +1,180 @@
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+STOPWORDS = frozenset(
+    """
+    a about above after again all also am an and any are as at be because been
+    before being below between both but by can could did do does doing down during
+    each few for from further had has have having he her here hers him his how i if
+    in into is it its itself just me more most my no nor not now of off on once only
+    or other our out over own same she should so some such than that the their them
+    then there these they this those through to too under until up very was we were
+    what when where which while who whom why will with would you your tell give show
+    explain describe know
+    """.split()
+)
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: str, stopwords: Iterable[str] = STOPWORDS) -> List[str]:
+    """Lowercase, split on non-alphanumerics, drop stopwords and fold plurals."""
+    tokens = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        if len(token) < 2 or token in stopwords:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        tokens.append(token)
+    return tokens
+
+
+def line_windows(
+    text: str, window: int = 12, stride: int = 6
+) -> List[Tuple[int, int, str]]:
+    """Split text into overlapping windows of non-empty lines.
+
+    Returns (start_line, end_line, text) tuples, where line numbers index the
+    non-empty lines and end_line is exclusive.
+    """
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    windows = []
+    for start in range(0, max(1, len(lines) - window + stride), stride):
+        end = min(len(lines), start + window)
+        if start >= end:
+            break
+        windows.append((start, end, "\n".join(lines[start:end])))
+    return windows
+
+
+@dataclass
+class Passage:
+    """One indexed window of a document."""
+
+    doc_id: str
+    start: int
+    end: int
+    text: str
+    length: int
+    terms: Tuple[str, ...]
+
+
+@dataclass
+class SearchHit:
+    score: float
+    passage: Passage
+
+
+class PassageIndex:
+    """In-memory inverted index over passages, scored with BM25.
+
+    Documents can be added and removed independently, so callers can re-index
+    only the documents that changed.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.passages: Dict[int, Passage] = {}
+        self.postings: Dict[str, Dict[int, int]] = {}
+        self.doc_passages: Dict[str, List[int]] = {}
+        self._next_id = 0
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    def add_document(
+        self,
+        doc_id: str,
+        passages: List[Tuple[int, int, str]],
+        term_counts: Optional[List[Dict[str, int]]] = None,
+    ):
+        """
+        Index a document's passages, replacing any previous version.
+
+        Args:
+            doc_id: Document identifier
+            passages: (start, end, text) windows, e.g. from line_windows
+            term_counts: Precomputed term frequencies per passage, if available
+        """
+        self.remove_document(doc_id)
+        ids = []
+        for i, (start, end, text) in enumerate(passages):
+            counts = term_counts[i] if term_counts else Counter(tokenize(text))
+            passage_id = self._next_id
+            self._next_id += 1
+
+            length = sum(counts.values())
+            self.passages[passage_id] = Passage(
+                doc_id, start, end, text, length, tuple(counts)
+            )
+            self._total_length += length
+            for term, count in counts.items():
+                self.postings.setdefault(term, {})[passage_id] = count
+            ids.append(passage_id)
+        self.doc_passages[doc_id] = ids
+
+    def remove_document(self, doc_id: str):
+        """Drop every passage belonging to a document."""
+        for passage_id in self.doc_passages.pop(doc_id, []):
+            passage = self.passages.pop(passage_id)
+            self._total_length -= passage.length
+            for term in passage.terms:
+                postings = self.postings.get(term)
+                if postings is not None:
+                    postings.pop(passage_id, None)
+                    if not postings:
+                        del self.postings[term]
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 5,
+        doc_filter: Optional[Callable[[str], bool]] = None,
+        stopwords: Iterable[str] = STOPWORDS,
+    ) -> List[SearchHit]:
+        """
+        Return the top_k highest scoring passages for a query.
+
+        Overlapping windows from the same document are deduplicated: only the
+        best scoring window of any overlapping group is kept.
+        """
+        if not self.passages:
+            return []
+
+        n = len(self.passages)
+        avg_length = self._total_length / n or 1.0
+        scores: Dict[int, float] = {}
+        for term in set(tokenize(query, stopwords)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for passage_id, tf in postings.items():
+                length = self.passages[passage_id].length
+                norm = tf + self.k1 * (1 - self.b + self.b * length / avg_length)
+                scores[passage_id] = scores.get(passage_id, 0.0) + idf * (
+                    tf * (self.k1 + 1) / norm
+                )
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        hits: List[SearchHit] = []
+        for passage_id, score in ranked:
+            passage = self.passages[passage_id]
+            if doc_filter is not None and not doc_filter(passage.doc_id):
+                continue
+            if any(
+                hit.passage.doc_id == passage.doc_id
+                and hit.passage.start < passage.end
+                and passage.start < hit.passage.end
+                for hit in hits
+            ):
+                continue
+            hits.append(SearchHit(score, passage))
+            if len(hits) >= top_k:
+                break
+        return hits
@@ -1,8 +1,24 @@
+import argparse
 import os
 import sys
-import uvicorn
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Artemis API server")
+    parser.add_argument(
+        "--production",
+        action="store_true",
+        help="Pre-fork worker processes instead of a single reloading one "
+        "(same as SERVER_MODE=production)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes in production mode (default: WORKERS, or one "
+        "per core of the container CPU quota, or 2)",
+    )
+    args = parser.parse_args()
+
     # Check for required ARTEMIS_API_KEY at startup
     if not os.getenv("ARTEMIS_API_KEY"):
         print("❌ Error: ARTEMIS_API_KEY environment variable is required but not set.")
@@ -12,10 +28,9 @@ if __name__ == "__main__":
     print("🚀 Starting Artemis API server...")
     
     from artemis.config import settings
+    from artemis.server import serve_development, serve_production
 
-    uvicorn.run(
-        "artemis.api.main:app",
-        host=settings.api_host,
-        port=settings.api_port,
-        reload=True,
-    )
+    if args.production or settings.server_mode == "production":
+        serve_production(args.workers)
+    else:
+        serve_development()
@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# Settings are read once at import time: provide the required key and keep
+# local state (rate limit buckets, sessions, caches) out of the working tree
+os.environ.setdefault("ANTHROPIC_API_KEY", "test-key")
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="artemis-test-"))
+os.environ.setdefault("ARTEMIS_API_KEY", "test-api-key")
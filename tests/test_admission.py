@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from artemis.api.admission import REJECTED, AdmissionGate
+from artemis.api.models import ChatRequest
+from artemis.api.routes import chat
+
+
+def gate(max_concurrency=8, max_queue=16):
+    return AdmissionGate(max_concurrency, max_queue, queue_timeout=1.0, retry_after=5)
+
+
+def test_split_divides_the_server_limits_across_workers():
+    admission = gate()
+    admission.split(4)
+    assert (admission.max_concurrency, admission.max_queue) == (2, 4)
+
+
+def test_split_rounds_up_and_keeps_one_slot_per_worker():
+    admission = gate(max_concurrency=2, max_queue=3)
+    admission.split(4)
+    assert (admission.max_concurrency, admission.max_queue) == (1, 1)
+
+
+def test_split_starts_from_the_configured_limits():
+    admission = gate()
+    admission.split(2)
+    admission.split(2)
+    assert (admission.max_concurrency, admission.max_queue) == (4, 8)
+
+
+@pytest.fixture
+def small_gate(monkeypatch):
+    """One slot, one queue place and a short wait, in front of the chat route."""
+    admission = AdmissionGate(1, 1, queue_timeout=0.05, retry_after=7)
+    monkeypatch.setattr(chat, "admission_gate", admission)
+    return admission
+
+
+async def test_full_queue_is_shed_with_retry_after(small_gate):
+    holder = await small_gate.acquire()
+    waiter = asyncio.create_task(small_gate.acquire())
+    await asyncio.sleep(0)
+
+    with pytest.raises(HTTPException) as e:
+        await chat._chat_handler(ChatRequest(message="Hi", stream=False))
+    assert e.value.status_code == 503
+    assert e.value.headers == {"Retry-After": "7"}
+    assert REJECTED.value(reason="queue_full") >= 1
+
+    # The queued request gets the slot once it is released, and frees it in turn
+    holder.release()
+    (await waiter).release()
+    assert small_gate.stats() == {
+        "active": 0,
+        "queued": 0,
+        "max_concurrency": 1,
+        "max_queue": 1,
+        "admitted": 2,
+    }
+
+
+async def test_queue_timeout_is_shed_with_retry_after(small_gate):
+    holder = await small_gate.acquire()
+    before = REJECTED.value(reason="timeout")
+
+    with pytest.raises(HTTPException) as e:
+        await chat._chat_handler(ChatRequest(message="Hi", stream=False))
+    assert e.value.status_code == 503
+    assert e.value.headers == {"Retry-After": "7"}
+    assert REJECTED.value(reason="timeout") == before + 1
+    assert small_gate.stats()["queued"] == 0
+
+    # The timed-out request took no slot: releasing the holder frees the gate
+    holder.release()
+    assert small_gate.stats()["active"] == 0
+    (await small_gate.acquire()).release()
+    assert small_gate.stats()["active"] == 0
@@ -0,0 +1,248 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI, HTTPException
+
+from artemis.api.models import ChatRequest
+from artemis.api.ratelimit import ALWAYS, SQLiteBucketStore
+from artemis.api.routes import chat
+from artemis.chatbot.agent import ToolIndicator
+from artemis.chatbot.stats import CANCELLED
+
+
+class EndlessAgent:
+    """Streams tokens until stopped, reporting usage as it goes."""
+
+    version = "test"
+
+    def __init__(self):
+        self.stopped = asyncio.Event()
+
+    async def astream(self, messages, stats):
+        stats.input_tokens = 1000
+        try:
+            while True:
+                stats.output_tokens += 1
+                yield "token "
+                await asyncio.sleep(0.005)
+        finally:
+            self.stopped.set()
+
+
+class EchoAgent:
+    """Answers every question by repeating it."""
+
+    version = "test-echo"
+
+    async def ainvoke(self, messages, stats):
+        return f"You said: {messages[-1][1]}"
+
+    async def astream(self, messages, stats):
+        for word in f"You said: {messages[-1][1]}".split(" "):
+            yield word + " "
+
+
+class ToolAgent:
+    """Answers around one tool call that ends with the given status."""
+
+    version = "test-tools"
+
+    def __init__(self, status):
+        self.status = status
+
+    async def astream(self, messages, stats):
+        yield "Let me check. "
+        yield ToolIndicator("\n\n🔧 Using resume tool...\n\n")
+        stats.add_tool_call("resume", {}, self.status, 0.01, "output")
+        yield "Peter works at Acme."
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    agent = EndlessAgent()
+    monkeypatch.setattr(chat, "get_chatbot", lambda: agent)
+    monkeypatch.setattr(chat, "lookup_cached_response", lambda m, v: ("", None, None))
+    return agent
+
+
+class RecordingLogger:
+    """Stands in for the conversation logger; keeps response metadata."""
+
+    def __init__(self):
+        self.responses = []
+
+    def log_assistant_response(self, response, conversation_id, metadata):
+        self.responses.append(metadata)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+@pytest.fixture(autouse=True)
+def responses(monkeypatch):
+    recorder = RecordingLogger()
+    monkeypatch.setattr(chat, "conversation_logger", recorder)
+    return recorder.responses
+
+
+async def disconnect_mid_stream(spec_version: str, frames: int = 3):
+    """POST a streamed chat and hang up after a few body frames."""
+    app = FastAPI()
+    app.include_router(chat.router, prefix="/api")
+    body = json.dumps({"message": "Tell me everything", "stream": True}).encode()
+    disconnected = asyncio.Event()
+    received = []
+
+    async def receive():
+        if not received:
+            received.append(body)
+            return {"type": "http.request", "body": body, "more_body": False}
+        await disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and message.get("body"):
+            received.append(message["body"])
+            if len(received) > frames:
+                disconnected.set()
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0", "spec_version": spec_version},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/chat",
+        "raw_path": b"/api/chat",
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"x-api-key", b"test-api-key"),
+        ],
+        "client": ("127.0.0.1", 50000),
+        "server": ("testserver", 80),
+    }
+    await asyncio.wait_for(app(scope, receive, send), timeout=5)
+
+
+async def test_shed_requests_leave_no_session(monkeypatch):
+    async def overloaded():
+        raise HTTPException(status_code=503, detail="Server overloaded")
+
+    async def create():
+        raise AssertionError("session created for a shed request")
+
+    monkeypatch.setattr(chat, "acquire_slot", overloaded)
+    monkeypatch.setattr(chat.session_store, "create", create)
+    with pytest.raises(HTTPException) as e:
+        await chat._chat_handler(ChatRequest(message="Hi", stream=False, session=True))
+    assert e.value.status_code == 503
+
+
+async def test_sessions_are_stored_only_on_request():
+    transcript = ChatRequest(
+        messages=[
+            {"role": "user", "content": "Hi"},
+            {"role": "assistant", "content": "Hello!"},
+            {"role": "user", "content": "Where does Peter work?"},
+        ]
+    )
+    assert not (await chat.resolve_session(transcript)).persistent
+    assert not (await chat.resolve_session(ChatRequest(message="Hi"))).persistent
+    opted_in = ChatRequest(message="Hi", session=True)
+    assert (await chat.resolve_session(opted_in)).persistent
+
+
+async def test_only_stored_sessions_return_a_conversation_id(monkeypatch):
+    monkeypatch.setattr(chat, "get_chatbot", lambda: EchoAgent())
+    stored = await chat._chat_handler(
+        ChatRequest(message="Hi, remember me", stream=False, session=True)
+    )
+    assert await chat.session_store.get(stored.conversation_id) is not None
+
+    async def create():
+        raise AssertionError("session created without opting in")
+
+    monkeypatch.setattr(chat.session_store, "create", create)
+    legacy = await chat._chat_handler(ChatRequest(message="Hi", stream=False))
+    assert legacy.conversation_id is None
+
+
+async def test_unknown_conversation_releases_its_slot():
+    request = ChatRequest(message="Hi", conversation_id="missing", stream=False)
+    with pytest.raises(HTTPException) as e:
+        await chat._chat_handler(request)
+    assert e.value.status_code == 404
+    assert chat.admission_gate.stats()["active"] == 0
+
+
+@pytest.mark.parametrize("spec_version", ["2.3", "2.4"])
+async def test_disconnect_mid_stream_cancels_the_turn(spec_version, agent, responses):
+    before = CANCELLED._values.get((), 0)
+    await disconnect_mid_stream(spec_version)
+
+    assert agent.stopped.is_set()
+    assert [metadata["status"] for metadata in responses] == ["cancelled"]
+    assert responses[0]["usage"]["input_tokens"] == 1000
+    assert CANCELLED._values.get((), 0) == before + 1
+    assert chat.admission_gate.stats()["active"] == 0
+
+
+@pytest.mark.parametrize("spec_version", ["2.3", "2.4"])
+async def test_disconnect_mid_stream_still_charges_tokens(
+    spec_version, agent, monkeypatch, tmp_path
+):
+    limiter = chat.rate_limiter
+    store = SQLiteBucketStore(str(tmp_path / "ratelimit.db"))
+    monkeypatch.setattr(limiter, "store", store)
+    await disconnect_mid_stream(spec_version)
+    await asyncio.gather(*limiter._charges)
+
+    capacity = chat.settings.rate_limit_chat_tokens
+    rate = capacity / chat.settings.rate_limit_token_window
+    _, level = store.take("chat:tokens:ip:127.0.0.1", 0, capacity, rate, ALWAYS)
+    # 1000 input tokens plus the output streamed before the disconnect
+    assert capacity - level > 1000
+
+
+@pytest.mark.parametrize("status", ["ok", "timeout", "tool_error"])
+async def test_only_answers_with_working_tools_are_cached(status, monkeypatch):
+    monkeypatch.setattr(chat, "get_chatbot", lambda: ToolAgent(status))
+    question = f"Where does Peter work, asked with a {status} tool?"
+    request = ChatRequest(message=question)
+    session = await chat.session_store.create()
+    frames = "".join([frame async for frame in chat.stream_response(request, session)])
+
+    # The client sees the indicator; the cache and history get the answer only
+    assert "Using resume tool" in frames
+    answer = "Let me check. Peter works at Acme."
+    assert session.messages[-1] == ("assistant", answer)
+    key = chat.response_cache.make_key([("user", question)], ToolAgent.version)
+    expected = answer if status == "ok" else None
+    assert chat.response_cache.get(key) == expected
+    assert chat.semantic_cache.lookup(question, ToolAgent.version) == expected
+
+
+@pytest.mark.parametrize("batched", [False, True])
+async def test_stream_honours_the_sse_options(batched, monkeypatch):
+    monkeypatch.setattr(chat, "get_chatbot", lambda: EchoAgent())
+    monkeypatch.setattr(chat.settings, "sse_flush_interval", 10)
+    request = ChatRequest(
+        message=f"Batched {batched}, please", sse_batch=batched, sse_timestamps=False
+    )
+    session = await chat.resolve_session(request)
+    frames = [
+        json.loads(line[len("data: ") :])
+        async for chunk in chat.stream_response(request, session)
+        for line in chunk.split("\n\n")
+        if line
+    ]
+
+    tokens = [frame for frame in frames if frame["type"] == "token"]
+    assert all("timestamp" not in frame for frame in tokens)
+    text = "".join(frame["content"] for frame in tokens)
+    assert text == f"You said: Batched {batched}, please "
+    # The first token is flushed alone; the rest arrive in one batch at the end
+    assert len(tokens) == (2 if batched else 5)
@@ -0,0 +1,42 @@
+import asyncio
+import json
+
+from langchain_core.tools import tool
+
+from artemis.chatbot.executor import ToolExecutor
+
+
+@tool
+async def slow(seconds: float) -> str:
+    """Sleep, then answer."""
+    await asyncio.sleep(seconds)
+    return "done"
+
+
+def call(call_id: str, seconds: float):
+    return {"id": call_id, "name": "slow", "args": {"seconds": seconds}}
+
+
+async def test_results_keep_call_order():
+    executor = ToolExecutor([slow], timeout=1.0)
+    messages = await executor.execute([call("a", 0.05), call("b", 0.0)])
+    assert [m.tool_call_id for m in messages] == ["a", "b"]
+    assert [m.content for m in messages] == ["done", "done"]
+
+
+async def test_unknown_tool_is_an_error_message():
+    executor = ToolExecutor([slow])
+    [message] = await executor.execute([{"id": "a", "name": "nope", "args": {}}])
+    assert json.loads(message.content)["error"] == "unknown_tool"
+
+
+async def test_waiting_for_a_slot_counts_against_the_timeout():
+    executor = ToolExecutor([slow], timeout=0.2, max_concurrency=1)
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    # The slot frees up when the first call times out, too late for the second
+    first, second = await executor.execute([call("a", 0.5), call("b", 0.1)])
+    elapsed = loop.time() - start
+    assert json.loads(first.content)["error"] == "timeout"
+    assert json.loads(second.content)["error"] == "timeout"
+    assert elapsed < 0.4
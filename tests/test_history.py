@@ -0,0 +1,108 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from artemis.chatbot.history import HistoryManager
+from artemis.config import settings
+
+
+class FakeSummarizer:
+    """Stands in for the fast model; answers once ``release`` is set."""
+
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+
+    async def ainvoke(self, messages):
+        self.calls.append(messages[-1].content)
+        await self.release.wait()
+        return AIMessage(content=f"summary #{len(self.calls)}")
+
+
+@pytest.fixture
+def history(monkeypatch):
+    monkeypatch.setattr(settings, "history_keep_turns", 2)
+    monkeypatch.setattr(settings, "history_max_tokens", 4000)
+    manager = HistoryManager()
+    manager._llm = FakeSummarizer()
+    return manager
+
+
+def conversation(turns, words=5):
+    messages = []
+    for i in range(turns):
+        messages.append(HumanMessage(content=f"question {i} " + "word " * words))
+        messages.append(AIMessage(content=f"answer {i} " + "word " * words))
+    return messages
+
+
+async def settle(history):
+    await asyncio.gather(*history._pending.values())
+
+
+async def test_short_conversations_are_sent_whole(history):
+    messages = conversation(2)
+    assert await history.window(messages) == (messages, None)
+    assert history._llm.calls == []
+
+
+async def test_window_keeps_the_last_turns(history):
+    messages = conversation(5)
+    recent, summary = await history.window(messages)
+    assert recent == messages[-4:]
+    assert "question 0" in summary and "answer 2" in summary
+
+
+async def test_window_drops_turns_over_the_token_cap_but_keeps_the_current_one(
+    history, monkeypatch
+):
+    monkeypatch.setattr(settings, "history_max_tokens", 50)
+    messages = conversation(3, words=40)
+    recent, _ = await history.window(messages)
+    assert recent == messages[-2:]
+
+
+async def test_summary_is_built_off_the_request_path_and_cached(history):
+    messages = conversation(5)
+    summarizer = history._llm
+
+    # The first window does not wait for the (still blocked) summarizer
+    recent, summary = await asyncio.wait_for(history.window(messages), 1)
+    assert summary.startswith("Visitor: question 0")
+    assert len(summarizer.calls) == 1
+
+    summarizer.release.set()
+    await settle(history)
+    assert await history.window(messages) == (recent, "summary #1")
+    assert len(summarizer.calls) == 1
+
+
+async def test_summary_rolls_forward_one_turn_at_a_time(history):
+    history._llm.release.set()
+    messages = conversation(5)
+    await history.window(messages)
+    await settle(history)
+
+    # Only the turn that newly left the window is summarized, on top of the
+    # previous summary, which is also what the turn itself is given meanwhile
+    _, summary = await history.window(messages + conversation(6)[-2:])
+    assert summary.startswith("summary #1\nVisitor: question 3")
+    await settle(history)
+    prompt = history._llm.calls[-1]
+    assert "Existing summary:\nsummary #1" in prompt
+    assert "question 3" in prompt and "question 2" not in prompt
+
+
+async def test_summarizer_failure_falls_back_to_an_extract(history):
+    class Broken:
+        async def ainvoke(self, messages):
+            raise RuntimeError("overloaded")
+
+    history._llm = Broken()
+    messages = conversation(4)
+    await history.window(messages)
+    await settle(history)
+    _, summary = await history.window(messages)
+    assert summary.startswith("Visitor: question 0")
+    assert len(summary) <= settings.history_summary_tokens * 4
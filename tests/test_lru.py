@@ -0,0 +1,74 @@
+import types
+
+import pytest
+
+from artemis.storage import lru
+from artemis.storage.lru import LRUCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(lru, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = LRUCache(max_entries=10, max_bytes=1000, ttl=60)
+    cache.set("a", "value")
+    clock[0] += 59
+    assert cache.get("a") == "value"
+    clock[0] += 1
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert cache.current_bytes == 0
+    assert cache.stats()["expirations"] == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_replacing_an_entry_restarts_its_ttl(clock):
+    cache = LRUCache(max_entries=10, max_bytes=1000, ttl=60)
+    cache.set("a", "old")
+    clock[0] += 50
+    cache.set("a", "new")
+    clock[0] += 50
+    assert cache.get("a") == "new"
+
+
+def test_byte_bound_evicts_least_recently_used():
+    cache = LRUCache(max_entries=10, max_bytes=10)
+    cache.set("a", "aaaa")
+    cache.set("b", "bbbb")
+    assert cache.get("a") == "aaaa"  # b is now the least recently used
+    cache.set("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.get("c") == "cccc"
+    assert cache.current_bytes == 8
+    assert cache.evictions == 1
+
+
+def test_replacing_an_entry_updates_its_size():
+    cache = LRUCache(max_entries=10, max_bytes=10)
+    cache.set("a", "aaaa")
+    cache.set("a", "aaaaaaaa")
+    assert cache.current_bytes == 8
+    cache.set("b", "bb")
+    assert len(cache) == 2
+    assert cache.current_bytes == 10
+
+
+def test_values_larger_than_the_cache_are_not_stored():
+    cache = LRUCache(max_entries=10, max_bytes=10)
+    cache.set("a", "aaaa")
+    cache.set("huge", "x" * 11)
+    assert cache.get("huge") is None
+    assert cache.get("a") == "aaaa"
+
+
+def test_entry_count_bound():
+    cache = LRUCache(max_entries=2, max_bytes=1000)
+    for key in "abc":
+        cache.set(key, key, size=1)
+    assert len(cache) == 2
+    assert cache.get("a") is None
@@ -0,0 +1,71 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from artemis.api.ratelimit import (
+    RateLimitRule,
+    SQLiteBucketStore,
+    metrics_rate_limit,
+    rate_limiter,
+)
+from artemis.config import settings
+from artemis.metrics import Counter, Histogram, Registry
+
+
+def test_const_labels_are_added_to_every_sample():
+    registry = Registry()
+    requests = Counter("requests_total", "Requests", ["route"], registry=registry)
+    latency = Histogram("latency_seconds", "Latency", buckets=(1,), registry=registry)
+    requests.inc(route="chat")
+    latency.observe(0.5)
+
+    registry.set_const_labels(pid="123")
+    lines = registry.render().splitlines()
+
+    assert 'requests_total{pid="123",route="chat"} 1' in lines
+    assert 'latency_seconds_bucket{pid="123",le="1"} 1' in lines
+    assert 'latency_seconds_bucket{pid="123",le="+Inf"} 1' in lines
+    assert 'latency_seconds_sum{pid="123"} 0.5' in lines
+    assert 'latency_seconds_count{pid="123"} 1' in lines
+
+
+def test_no_const_labels_by_default():
+    registry = Registry()
+    Counter("requests_total", "Requests", registry=registry).inc()
+    assert "requests_total 1" in registry.render().splitlines()
+
+
+@pytest.fixture
+def client(monkeypatch, tmp_path):
+    from artemis.api import main
+
+    store = SQLiteBucketStore(str(tmp_path / "ratelimit.db"))
+    monkeypatch.setattr(rate_limiter, "store", store)
+    monkeypatch.setattr(settings, "metrics_token", "scrape-token")
+    return TestClient(main.app)
+
+
+@pytest.mark.parametrize(
+    "headers, status",
+    [
+        ({}, 401),
+        ({"X-API-Key": "wrong"}, 403),
+        ({"Authorization": "Bearer wrong"}, 401),
+        ({"X-API-Key": "test-api-key"}, 200),
+        ({"Authorization": "Bearer scrape-token"}, 200),
+    ],
+)
+def test_metrics_require_the_api_key_or_metrics_token(client, headers, status):
+    response = client.get("/metrics", headers=headers)
+    assert response.status_code == status
+    if status == 200:
+        assert "# TYPE artemis_admission_active gauge" in response.text
+
+
+def test_metrics_are_rate_limited(client, monkeypatch):
+    from artemis.api import main
+
+    limit = rate_limiter.limit(RateLimitRule("metrics-test", requests=2, window=60))
+    monkeypatch.setitem(main.app.dependency_overrides, metrics_rate_limit, limit)
+    headers = {"X-API-Key": "test-api-key"}
+    statuses = [client.get("/metrics", headers=headers).status_code for _ in range(3)]
+    assert statuses == [200, 200, 429]
@@ -0,0 +1,101 @@
+import types
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from artemis.api import ratelimit
+from artemis.api.ratelimit import (
+    ALWAYS,
+    BucketStore,
+    RateLimiter,
+    RateLimitRule,
+    SQLiteBucketStore,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(ratelimit, "time", types.SimpleNamespace(time=lambda: now[0]))
+    return now
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteBucketStore(str(tmp_path / "ratelimit.db"))
+
+
+def request(client="10.0.0.1"):
+    return Request(
+        {"type": "http", "headers": [], "client": (client, 1234), "state": {}}
+    )
+
+
+def test_bucket_empties_and_refills(store, clock):
+    # 2 units, refilling at 1 unit per 10 seconds
+    assert store.take("k", 1, 2, 0.1, 1) == (True, 1)
+    assert store.take("k", 1, 2, 0.1, 1) == (True, 0)
+    allowed, level = store.take("k", 1, 2, 0.1, 1)
+    assert not allowed and level == 0
+
+    clock[0] += 10
+    assert store.take("k", 1, 2, 0.1, 1) == (True, 0)
+    clock[0] += 1000
+    # Refill is capped at the capacity
+    assert store.take("k", 0, 2, 0.1, 0) == (True, 2)
+
+
+def test_charges_go_into_debt_and_refill_past_zero(store, clock):
+    # 100 tokens, refilling at 1 token per second
+    allowed, level = store.take("k", 250, 100, 1.0, ALWAYS)
+    assert allowed and level == -150
+
+    allowed, level = store.take("k", 0, 100, 1.0, 1e-9)
+    assert not allowed and level == -150
+    clock[0] += 150
+    assert not store.take("k", 0, 100, 1.0, 1e-9)[0]
+    clock[0] += 1
+    assert store.take("k", 0, 100, 1.0, 1e-9) == (True, 1)
+
+
+def test_buckets_are_per_key(store, clock):
+    store.take("a", 1, 1, 0.1, 1)
+    assert not store.take("a", 1, 1, 0.1, 1)[0]
+    assert store.take("b", 1, 1, 0.1, 1)[0]
+
+
+async def test_request_budget_rejects_with_retry_after(store, clock):
+    limiter = RateLimiter(store)
+    check = limiter.limit(RateLimitRule("chat", requests=2, window=60.0))
+    await check(request())
+    await check(request())
+    with pytest.raises(HTTPException) as e:
+        await check(request())
+    assert e.value.status_code == 429
+    assert e.value.headers["Retry-After"] == "30"
+    # Another client has its own budget
+    await check(request("10.0.0.2"))
+
+
+async def test_token_budget_admits_until_overspent(store, clock):
+    limiter = RateLimiter(store)
+    rule = RateLimitRule("chat", requests=0, window=60.0, tokens=3600)
+    check = limiter.limit(rule)
+
+    first = request()
+    await check(first)
+    # The request used more than the whole budget: 400 tokens of debt
+    await limiter.charge(first, 4000)
+    with pytest.raises(HTTPException) as e:
+        await check(request())
+    assert e.value.detail == "Rate limit exceeded (tokens)"
+    assert e.value.headers["Retry-After"] == "400"
+
+    clock[0] += 401
+    await check(request())
+
+
+def test_bucket_store_is_abstract():
+    with pytest.raises(TypeError):
+        BucketStore()
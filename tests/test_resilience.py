@@ -0,0 +1,177 @@
+import types
+
+import pytest
+
+from artemis.chatbot import resilience
+from artemis.chatbot.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    UpstreamPolicy,
+    UpstreamUnavailable,
+    retry_reason,
+)
+from artemis.config import settings
+
+
+class Overloaded(Exception):
+    status_code = 529
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+class FakeLLM:
+    """Fails with the queued errors, then answers."""
+
+    def __init__(self, name, errors=(), chunks=("Hello", " there")):
+        self.name = name
+        self.errors = list(errors)
+        self.chunks = chunks
+        self.calls = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        return self.name
+
+    async def astream(self, messages):
+        self.calls += 1
+        error = self.errors.pop(0) if self.errors else None
+        yield types.SimpleNamespace(content="")  # message start, no text
+        if error is not None:
+            raise error
+        for chunk in self.chunks:
+            yield types.SimpleNamespace(content=chunk)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(
+        resilience, "time", types.SimpleNamespace(monotonic=lambda: now[0])
+    )
+    return now
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setattr(settings, "upstream_backoff", 0.0)
+    monkeypatch.setattr(settings, "upstream_max_attempts", 2)
+    monkeypatch.setattr(settings, "breaker_failure_threshold", 3)
+
+
+def test_retry_reason():
+    assert retry_reason(Overloaded()) == "529"
+    assert retry_reason(Exception("overloaded_error: try later")) == "overloaded_error"
+    assert retry_reason(TimeoutError()) == "TimeoutError"
+    assert retry_reason(BadRequest()) is None
+
+
+def test_breaker_opens_then_half_opens_after_the_timeout(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.allow()
+
+    clock[0] += 30
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()  # the single trial call
+    assert not breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.failures == 0
+
+
+def test_failed_trial_reopens_the_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock[0] += 29
+    assert not breaker.allow()
+
+
+def test_abandoned_trial_expires(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow()
+    # The trial never reports back; another one is allowed after the timeout
+    clock[0] += 30
+    assert breaker.allow()
+
+
+async def test_retries_then_succeeds():
+    primary = FakeLLM("primary", errors=[Overloaded()])
+    policy = UpstreamPolicy([("primary", primary)])
+    assert await policy.ainvoke([]) == "primary"
+    assert primary.calls == 2
+    assert policy.stats()["primary"] == {"state": CLOSED, "failures": 0}
+
+
+async def test_fails_over_to_the_fallback():
+    primary = FakeLLM("primary", errors=[Overloaded(), Overloaded()])
+    fallback = FakeLLM("fallback")
+    policy = UpstreamPolicy([("primary", primary), ("fallback", fallback)])
+    assert await policy.ainvoke([]) == "fallback"
+    assert primary.calls == 2
+    assert policy.stats()["primary"]["failures"] == 2
+
+
+async def test_open_breaker_skips_the_model():
+    primary = FakeLLM("primary", errors=[Overloaded()] * 3)
+    fallback = FakeLLM("fallback")
+    policy = UpstreamPolicy([("primary", primary), ("fallback", fallback)])
+    await policy.ainvoke([])  # two failures
+    await policy.ainvoke([])  # third failure opens the breaker
+    assert policy.stats()["primary"]["state"] == OPEN
+
+    calls = primary.calls
+    assert await policy.ainvoke([]) == "fallback"
+    assert primary.calls == calls
+
+
+async def test_non_retryable_errors_are_raised_at_once():
+    primary = FakeLLM("primary", errors=[BadRequest()])
+    fallback = FakeLLM("fallback")
+    policy = UpstreamPolicy([("primary", primary), ("fallback", fallback)])
+    with pytest.raises(BadRequest):
+        await policy.ainvoke([])
+    assert fallback.calls == 0
+
+
+async def test_all_models_failing_is_unavailable():
+    policy = UpstreamPolicy(
+        [
+            ("primary", FakeLLM("primary", errors=[Overloaded()] * 2)),
+            ("fallback", FakeLLM("fallback", errors=[Overloaded()] * 2)),
+        ]
+    )
+    with pytest.raises(UpstreamUnavailable):
+        await policy.ainvoke([])
+
+
+async def test_stream_retries_before_the_first_text_chunk():
+    primary = FakeLLM("primary", errors=[Overloaded()])
+    policy = UpstreamPolicy([("primary", primary)])
+    chunks = [chunk.content async for chunk in policy.astream([])]
+    # The failed attempt's empty start chunk was held back, not passed on
+    assert chunks == ["", "Hello", " there"]
+    assert primary.calls == 2
+
+
+async def test_stream_fails_over_to_the_fallback():
+    primary = FakeLLM("primary", errors=[Overloaded(), Overloaded()])
+    fallback = FakeLLM("fallback", chunks=("Hi",))
+    policy = UpstreamPolicy([("primary", primary), ("fallback", fallback)])
+    chunks = [chunk.content async for chunk in policy.astream([])]
+    assert chunks == ["", "Hi"]
@@ -0,0 +1,90 @@
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from artemis.chatbot.router import FAST, PRIMARY, QueryRouter
+from artemis.config import settings
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(settings, "model_name", "main-model")
+    monkeypatch.setattr(settings, "fast_model_name", "fast-model")
+    return QueryRouter(enabled=True, threshold=0.6)
+
+
+def turn(text):
+    return [("user", text)]
+
+
+def with_history(text, turns):
+    messages = []
+    for i in range(turns):
+        messages += [("user", f"Question {i}"), ("assistant", f"Answer {i}")]
+    return messages + [("user", text)]
+
+
+@pytest.mark.parametrize(
+    "text", ["Where does Peter live?", "What is Peter's email?", "Hi!", "thanks"]
+)
+def test_short_lookups_go_to_the_fast_model(router, text):
+    decision = router.route(turn(text))
+    assert (decision.route, decision.model) == (FAST, "fast-model")
+
+
+def test_long_messages_go_to_the_main_model(router):
+    text = "Where does Peter live? " * (settings.router_max_fast_chars // 20)
+    assert len(text) > settings.router_max_fast_chars
+    decision = router.route(turn(text))
+    assert (decision.route, decision.model, decision.reason) == (
+        PRIMARY,
+        "main-model",
+        "long",
+    )
+
+
+def test_deep_conversations_go_to_the_main_model(router):
+    assert router.route(with_history("Where does Peter live?", 1)).route == FAST
+    decision = router.route(with_history("Where does Peter live?", 10))
+    assert (decision.route, decision.model) == (PRIMARY, "main-model")
+    assert decision.score < router.threshold
+
+
+def test_history_of_converted_messages_counts_too(router):
+    history = [HumanMessage("Question"), AIMessage("Answer")] * 10
+    decision = router.route(history + [("user", "Where does Peter live?")])
+    assert decision.route == PRIMARY
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "Explain the architecture of his research",
+        "Why did Peter choose this thesis approach?",
+        "What does this do?\n```x = 1```",
+    ],
+)
+def test_below_threshold_scores_go_to_the_main_model(router, text):
+    decision = router.route(turn(text))
+    assert (decision.route, decision.model, decision.reason) == (
+        PRIMARY,
+        "main-model",
+        "model",
+    )
+    assert decision.score < router.threshold
+
+
+def test_threshold_decides_borderline_turns(router):
+    text = "Where does Peter live?"
+    assert router.route(turn(text)).route == FAST
+    strict = QueryRouter(enabled=True, threshold=0.95)
+    assert strict.route(turn(text)).route == PRIMARY
+
+
+@pytest.mark.parametrize("text", ["Hi!", "Where does Peter live?"])
+def test_disabled_router_always_picks_the_main_model(router, text):
+    decision = QueryRouter(enabled=False).route(turn(text))
+    assert (decision.route, decision.model, decision.reason) == (
+        PRIMARY,
+        "main-model",
+        "disabled",
+    )
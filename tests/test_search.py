@@ -0,0 +1,75 @@
+from artemis.tools.search import PassageIndex, line_windows, tokenize
+
+
+def test_tokenize_drops_stopwords_and_folds_plurals():
+    assert tokenize("The networks and the graphs of Peter") == [
+        "network",
+        "graph",
+        "peter",
+    ]
+
+
+def test_line_windows_overlap():
+    text = "\n".join(f"line {i}" for i in range(20))
+    windows = line_windows(text, window=8, stride=4)
+    assert [(start, end) for start, end, _ in windows] == [
+        (0, 8),
+        (4, 12),
+        (8, 16),
+        (12, 20),
+    ]
+
+
+def build_index():
+    index = PassageIndex()
+    index.add_document("a", [(0, 1, "graph neural networks for molecules")])
+    index.add_document(
+        "b",
+        [
+            (0, 1, "stochastic block models of community structure"),
+            (1, 2, "community detection in networks using block models"),
+        ],
+    )
+    index.add_document("c", [(0, 1, "networks networks networks everywhere")])
+    return index
+
+
+def test_rare_terms_outrank_common_ones():
+    hits = build_index().search("community networks", top_k=3)
+    # "community" occurs in two passages and "networks" in three, so the
+    # passage with both ranks first and the one with only "community" second
+    assert [(h.passage.doc_id, h.passage.start) for h in hits[:2]] == [
+        ("b", 1),
+        ("b", 0),
+    ]
+    assert hits[0].score > hits[1].score > hits[2].score
+
+
+def test_term_frequency_saturates():
+    index = build_index()
+    [top] = index.search("networks", top_k=1)
+    assert top.passage.doc_id == "c"
+    scores = {h.passage.doc_id: h.score for h in index.search("networks", top_k=5)}
+    # Three occurrences score higher than one, but far from three times higher
+    assert scores["a"] < scores["c"] < 2 * scores["a"]
+
+
+def test_overlapping_windows_are_deduplicated():
+    index = PassageIndex()
+    index.add_document(
+        "doc",
+        [(0, 12, "spectral clustering"), (6, 18, "spectral"), (12, 24, "spectral")],
+    )
+    hits = index.search("spectral clustering", top_k=5)
+    assert [(h.passage.start, h.passage.end) for h in hits] == [(0, 12), (12, 24)]
+
+
+def test_doc_filter_and_removal():
+    index = build_index()
+    hits = index.search("networks", doc_filter=lambda doc_id: doc_id == "a")
+    assert {h.passage.doc_id for h in hits} == {"a"}
+
+    index.remove_document("c")
+    assert len(index) == 3
+    assert "everywhere" not in index.postings
+    assert all(h.passage.doc_id != "c" for h in index.search("networks"))
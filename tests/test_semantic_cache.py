@@ -0,0 +1,102 @@
+import pytest
+
+from artemis.chatbot.semantic_cache import HashingEmbedder, SemanticCache
+from artemis.config import settings
+
+
+@pytest.fixture
+def embedder():
+    return HashingEmbedder(256)
+
+
+def similarity(embedder, a, b):
+    return float(embedder.embed(a) @ embedder.embed(b))
+
+
+@pytest.mark.parametrize(
+    "question, negated",
+    [
+        ("Who is Peter?", "Who is Peter not?"),
+        ("What does Peter do?", "What doesn't Peter do?"),
+        ("Does Peter know Rust?", "Does Peter not know Rust?"),
+        ("Can Peter code in C?", "Can't Peter code in C?"),
+        ("Where has Peter worked?", "Where has Peter never worked?"),
+    ],
+)
+def test_negated_questions_do_not_match(embedder, question, negated):
+    assert similarity(embedder, question, negated) < 0.85
+
+
+@pytest.mark.parametrize(
+    "question, other_time",
+    [
+        ("What does Peter do?", "What did Peter do before?"),
+        ("What does Peter do?", "What did Peter do?"),
+        ("Where does Peter work?", "Where did Peter work previously?"),
+        ("Who is Peter?", "Who was Peter?"),
+        ("What is Peter's job?", "What will Peter's next job be?"),
+    ],
+)
+def test_questions_about_another_time_do_not_match(embedder, question, other_time):
+    assert similarity(embedder, question, other_time) < 0.85
+
+
+@pytest.mark.parametrize(
+    "a, b",
+    [
+        ("What is Peter's job?", "What is Peter's occupation?"),
+        ("Where does Peter work now?", "Where does Peter currently work?"),
+        ("What languages doesn't Peter speak?", "What languages does Peter not speak?"),
+        ("Can't Peter code in C?", "Peter cannot code in C?"),
+    ],
+)
+def test_paraphrases_match(embedder, a, b):
+    assert similarity(embedder, a, b) >= 0.85
+
+
+def test_lookup_respects_negation_tense_and_version(tmp_path):
+    cache = SemanticCache(str(tmp_path / "semantic_cache"))
+    cache.add("What is Peter's job?", "He is a data scientist.", "v1")
+    assert cache.lookup("What is Peter's occupation?", "v1") == (
+        "He is a data scientist."
+    )
+    assert cache.lookup("What isn't Peter's job?", "v1") is None
+    assert cache.lookup("What was Peter's job before?", "v1") is None
+    assert cache.lookup("What is Peter's occupation?", "v2") is None
+
+
+def test_saved_vectors_from_an_older_embedder_are_discarded(tmp_path, monkeypatch):
+    path = str(tmp_path / "semantic_cache")
+    cache = SemanticCache(path)
+    cache.add("What does Peter do?", "He is a data scientist.", "v1")
+    cache.save()
+    monkeypatch.setattr(HashingEmbedder, "VERSION", HashingEmbedder.VERSION + 1)
+    assert SemanticCache(path).size == 0
+
+
+def test_workers_merge_their_entries_on_save(tmp_path):
+    path = str(tmp_path / "semantic_cache")
+    first, second = SemanticCache(path), SemanticCache(path)
+    first.add("What does Peter do?", "Data science.", "v1")
+    second.add("Where does Peter live?", "Seattle.", "v1")
+    second.add("What does Peter do?", "Machine learning.", "v1")
+    first.save()
+    second.save()
+
+    restarted = SemanticCache(path)
+    assert restarted.size == 2
+    assert restarted.lookup("Where does Peter live?", "v1") == "Seattle."
+    # The newer answer to the same question replaces the older one
+    assert restarted.lookup("What does Peter do?", "v1") == "Machine learning."
+
+
+async def test_add_saves_in_the_background(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "semantic_cache_save_every", 2)
+    path = str(tmp_path / "semantic_cache")
+    cache = SemanticCache(path)
+    cache.add("What does Peter do?", "Data science.", "v1")
+    assert cache._saving is None
+    cache.add("Where does Peter live?", "Seattle.", "v1")
+    assert cache._saving is not None
+    await cache._saving
+    assert SemanticCache(path).size == 2
@@ -0,0 +1,43 @@
+import pytest
+
+from artemis import server
+
+
+@pytest.fixture
+def cgroup(tmp_path, monkeypatch):
+    """Point the cgroup readers at a scratch directory."""
+    v1 = tmp_path / "cpu"
+    v1.mkdir()
+    monkeypatch.setattr(server, "CGROUP_V2_CPU_MAX", str(tmp_path / "cpu.max"))
+    monkeypatch.setattr(server, "CGROUP_V1_CPU_DIR", str(v1))
+    return tmp_path
+
+
+@pytest.mark.parametrize(
+    "cpu_max, workers",
+    [("200000 100000", 2), ("150000 100000", 1), ("50000 100000", 1)],
+)
+def test_workers_follow_the_cgroup_v2_quota(cgroup, cpu_max, workers):
+    (cgroup / "cpu.max").write_text(f"{cpu_max}\n")
+    assert server.default_workers() == workers
+
+
+def test_workers_follow_the_cgroup_v1_quota(cgroup):
+    (cgroup / "cpu" / "cpu.cfs_quota_us").write_text("400000\n")
+    (cgroup / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert server.cpu_quota() == 4.0
+    assert server.default_workers() == 4
+
+
+@pytest.mark.parametrize("cpu_max", ["max 100000", None])
+def test_no_quota_uses_the_fixed_default(cgroup, cpu_max):
+    if cpu_max is not None:
+        (cgroup / "cpu.max").write_text(f"{cpu_max}\n")
+    assert server.cpu_quota() is None
+    assert server.default_workers() == server.DEFAULT_WORKERS
+
+
+def test_unlimited_cgroup_v1_quota(cgroup):
+    (cgroup / "cpu" / "cpu.cfs_quota_us").write_text("-1\n")
+    (cgroup / "cpu" / "cpu.cfs_period_us").write_text("100000\n")
+    assert server.cpu_quota() is None
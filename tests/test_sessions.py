@@ -0,0 +1,84 @@
+import time
+import types
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from artemis.storage import sessions
+from artemis.storage.sessions import SessionStore
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "sessions.db")
+
+
+async def test_append_and_resume(path):
+    store = SessionStore(path)
+    session = await store.create()
+    await store.append(session, [("user", "Hi"), ("assistant", "Hello!")])
+    await store.append(session, [("user", "Where does Peter work?")])
+
+    # A fresh store (a restarted worker) resumes from SQLite
+    resumed = await SessionStore(path).get(session.id)
+    assert resumed.messages == [
+        ("user", "Hi"),
+        ("assistant", "Hello!"),
+        ("user", "Where does Peter work?"),
+    ]
+    assert [type(m) for m in resumed.lc_messages] == [
+        HumanMessage,
+        AIMessage,
+        HumanMessage,
+    ]
+    assert resumed.seq == 3
+
+
+async def test_unknown_session(path):
+    assert await SessionStore(path).get("missing") is None
+
+
+async def test_workers_appending_to_one_session(path):
+    first, second = SessionStore(path), SessionStore(path)
+    session = await first.create()
+    other = await second.get(session.id)
+
+    await first.append(session, [("user", "one"), ("assistant", "1")])
+    # The second worker's copy is stale, but its append must not collide
+    await second.append(other, [("user", "two"), ("assistant", "2")])
+    assert other.messages == [
+        ("user", "one"),
+        ("assistant", "1"),
+        ("user", "two"),
+        ("assistant", "2"),
+    ]
+
+    # Refreshing before the next turn picks up the other worker's messages
+    assert await first.refresh(session)
+    assert session.messages == other.messages
+    assert session.seq == 4
+
+
+async def test_sessions_expire(path, monkeypatch):
+    now = [time.time()]
+    monkeypatch.setattr(sessions, "time", types.SimpleNamespace(time=lambda: now[0]))
+    store = SessionStore(path, ttl=60)
+    session = await store.create()
+    await store.append(session, [("user", "Hi")])
+
+    now[0] += 59
+    assert await store.get(session.id) is session
+    now[0] += 1
+    assert await store.get(session.id) is None
+    assert not await store.refresh(session)
+
+    store._prune()
+    assert await SessionStore(path, ttl=3600).get(session.id) is None
+
+
+async def test_ephemeral_sessions_are_not_stored(path):
+    store = SessionStore(path)
+    session = store.ephemeral()
+    await store.append(session, [("user", "Hi"), ("assistant", "Hello!")])
+    assert await store.refresh(session)
+    assert await store.get(session.id) is None
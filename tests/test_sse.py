@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import pytest
+
+from artemis.api import sse
+from artemis.api.sse import SSEEncoder, coalesce
+
+TIMESTAMP = "2026-01-01T00:00:00+00:00"
+CHUNKS = ["Hello", ' "quoted" ', "naïve café ", "🔧 emoji 🚀", "\\back\nslash\t", ""]
+
+
+@pytest.fixture(autouse=True)
+def fixed_timestamp(monkeypatch):
+    monkeypatch.setattr(sse, "get_timestamp", lambda: TIMESTAMP)
+
+
+def json_frame(content, timestamps=True):
+    frame = {"type": "token", "content": content}
+    if timestamps:
+        frame["timestamp"] = TIMESTAMP
+    return f"data: {json.dumps(frame)}\n\n"
+
+
+@pytest.mark.parametrize("timestamps", [True, False])
+def test_frames_match_json_dumps_byte_for_byte(timestamps):
+    encoder = SSEEncoder(timestamps=timestamps)
+    expected = "".join(json_frame(chunk, timestamps) for chunk in CHUNKS)
+    assert encoder.encode(CHUNKS).encode() == expected.encode()
+
+
+def test_batched_frames_merge_a_batch_into_one_frame():
+    encoder = SSEEncoder(batched=True)
+    assert encoder.encode(CHUNKS) == json_frame("".join(CHUNKS))
+
+
+async def stream(chunks, delay=0.0):
+    for chunk in chunks:
+        if delay:
+            await asyncio.sleep(delay)
+        yield chunk
+
+
+async def collect(batches):
+    return [batch async for batch in batches]
+
+
+async def test_first_chunk_flushes_alone_and_size_triggers_a_flush():
+    chunks = ["first", "ab", "cd", "ef", "gh", "ij"]
+    batches = await collect(coalesce(stream(chunks), max_delay=10, max_bytes=4))
+    assert batches == [["first"], ["ab", "cd"], ["ef", "gh"], ["ij"]]
+
+
+async def test_time_triggers_a_flush():
+    chunks = ["first", "a", "b", "c", "d"]
+    # A chunk every 20ms against a 30ms window: every batch holds two chunks
+    batches = await collect(
+        coalesce(stream(chunks, delay=0.02), max_delay=0.03, max_bytes=1000)
+    )
+    assert batches[0] == ["first"]
+    assert [chunk for batch in batches for chunk in batch] == chunks
+    assert all(len(batch) < len(chunks) - 1 for batch in batches[1:])
+    assert len(batches) > 2
+
+
+async def test_stop_closes_the_upstream_generator():
+    closed = asyncio.Event()
+
+    async def endless():
+        try:
+            while True:
+                yield "token"
+                await asyncio.sleep(0.005)
+        finally:
+            closed.set()
+
+    stop = asyncio.get_running_loop().create_future()
+    received = []
+    async for batch in coalesce(endless(), max_delay=0.01, max_bytes=1000, stop=stop):
+        received.extend(batch)
+        if len(received) >= 3:
+            stop.set_result(None)
+    assert closed.is_set()
+
+
+async def test_closing_between_chunks_closes_the_upstream_generator():
+    closed = asyncio.Event()
+
+    async def upstream():
+        try:
+            yield "first"
+            yield "second"
+        finally:
+            closed.set()
+
+    batches = coalesce(upstream(), max_delay=10, max_bytes=1000)
+    assert await batches.__anext__() == ["first"]
+    await batches.aclose()
+    assert closed.is_set()
@@ -0,0 +1,75 @@
+import json
+
+import pytest
+from pydantic import BaseModel
+
+from artemis.tools.memo import is_error_result
+from artemis.tools.registry import ToolRegistry, ToolSpec
+
+
+class Query(BaseModel):
+    query: str = ""
+
+
+class FlakyBackend:
+    """Fails with an error message until ``fixed`` is set."""
+
+    def __init__(self):
+        self.calls = 0
+        self.fixed = False
+        self.error = "Error searching documents: index is being rebuilt"
+
+    def search(self, query: str = "") -> str:
+        self.calls += 1
+        return f"Results for {query!r}" if self.fixed else self.error
+
+
+@pytest.fixture
+def backend():
+    return FlakyBackend()
+
+
+@pytest.fixture
+def tool(backend):
+    spec = ToolSpec(
+        name="flaky",
+        description="Flaky search",
+        args_schema=Query,
+        factory=lambda: backend,
+        method="search",
+    )
+    return ToolRegistry([spec]).get_tools()[0]
+
+
+@pytest.mark.parametrize(
+    "error",
+    [
+        "Error searching documents: index is being rebuilt",
+        "Error: No research paper summaries loaded",
+        json.dumps({"error": "Error accessing resume data: disk full"}),
+    ],
+)
+def test_error_results_are_not_memoized(tool, backend, error):
+    backend.error = error
+    assert tool.invoke({"query": "graphs"}) == error
+    assert tool.invoke({"query": "graphs"}) == error
+    assert backend.calls == 2
+
+    backend.fixed = True
+    assert tool.invoke({"query": "graphs"}) == "Results for 'graphs'"
+    assert tool.invoke({"query": "graphs"}) == "Results for 'graphs'"
+    assert backend.calls == 3
+
+
+@pytest.mark.parametrize(
+    "result, error",
+    [
+        ("Peter works on graph comparison.", False),
+        ("No documents matched 'errors'.", False),
+        ('{"personal": {"name": "Peter"}}', False),
+        (["not", "a", "string"], False),
+        ("  error: something broke", True),
+    ],
+)
+def test_is_error_result(result, error):
+    assert is_error_result(result) is error
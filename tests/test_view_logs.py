@@ -0,0 +1,29 @@
+import argparse
+from datetime import datetime, timezone
+
+import view_logs
+
+
+def filters(**overrides):
+    values = dict(event=None, conversation=None, since=None, until=None, grep=None)
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+def test_aware_since_compares_with_naive_log_timestamps():
+    since = view_logs.parse_time("2026-10-01T00:00:00Z")
+    assert since.tzinfo is None
+    assert since == datetime(2026, 10, 1, tzinfo=timezone.utc).astimezone().replace(
+        tzinfo=None
+    )
+
+    assert view_logs.matches({"timestamp": since.isoformat()}, filters(since=since))
+    assert not view_logs.matches(
+        {"timestamp": "2026-09-01T00:00:00"}, filters(since=since)
+    )
+
+
+def test_aware_log_timestamps_compare_with_naive_bounds():
+    until = view_logs.parse_time("2026-10-01")
+    entry = {"timestamp": "2026-09-30T12:00:00+00:00"}
+    assert view_logs.matches(entry, filters(until=until))
@@ -1,30 +1,245 @@
 #!/usr/bin/env python3
 """
-Simple log viewer for Artemis conversation logs.
+Log viewer for Artemis conversation logs.
+
+Streams entries from plain or compressed log segments, filtering as it reads,
+and keeps only constant-size aggregates in memory, so it works on logs of
+any size.
+
+Examples:
+    python view_logs.py                                # today's logs
+    python view_logs.py --since 2025-07-01 --until 2025-07-07 --stats-only
+    python view_logs.py --event error --format json
+    python view_logs.py "logs/*.jsonl.gz" --grep "research" --conversation 3f2a
 """
+import argparse
+import glob
+import heapq
 import json
+import math
 import os
+import re
+import subprocess
 import sys
-from datetime import datetime
-from typing import List, Dict, Any
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, IO, Iterable, Iterator, List, Optional
+
+from artemis.log_store import open_segment, read_index
+
+# conversations_YYYY-MM-DD.jsonl (old) or conversations_YYYY-MM-DD_pid_seq.jsonl
+LOG_FILE_DATE = re.compile(r"conversations_(\d{4}-\d{2}-\d{2})")
+TEXT_FIELDS = ("user_message", "assistant_response", "error_message", "context")
+
+
+class BucketHistogram:
+    """Approximate percentiles from log-spaced buckets in constant memory.
+
+    Each bucket is 10% wider than the last, so reported percentiles are
+    within 10% of the exact value.
+    """
+
+    GROWTH = 1.1
+
+    def __init__(self):
+        self.buckets: Counter = Counter()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float):
+        bucket = 0 if value < 1 else int(math.log(value, self.GROWTH)) + 1
+        self.buckets[bucket] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                upper = self.GROWTH**bucket if bucket else 1.0
+                return min(upper, self.max)
+        return self.max
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 1) if self.count else 0.0,
+            "p50": round(self.percentile(50), 1),
+            "p90": round(self.percentile(90), 1),
+            "p99": round(self.percentile(99), 1),
+            "max": self.max,
+        }
+
+
+class LogStats:
+    """Single-pass aggregates over the matching entries."""
+
+    def __init__(self):
+        self.entries = 0
+        self.event_types: Counter = Counter()
+        self.days: Counter = Counter()
+        self.cached: Counter = Counter()
+        self.user_lengths = BucketHistogram()
+        self.response_lengths = BucketHistogram()
+        self.first: Optional[str] = None
+        self.last: Optional[str] = None
 
+    def add(self, entry: Dict[str, Any]):
+        self.entries += 1
+        event_type = entry.get("event_type", "unknown")
+        self.event_types[event_type] += 1
+        timestamp = entry.get("timestamp", "")
+        self.days[timestamp[:10]] += 1
+        if timestamp and (self.first is None or timestamp < self.first):
+            self.first = timestamp
+        if timestamp and (self.last is None or timestamp > self.last):
+            self.last = timestamp
+        if "user_message_length" in entry:
+            self.user_lengths.add(entry["user_message_length"])
+        if "response_length" in entry:
+            self.response_lengths.add(entry["response_length"])
+        if event_type in ("conversation", "assistant_response"):
+            self.cached[entry.get("cached") or "miss"] += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        responses = (
+            self.event_types["conversation"] + self.event_types["assistant_response"]
+        )
+        errors = self.event_types["error"]
+        return {
+            "entries": self.entries,
+            "first": self.first,
+            "last": self.last,
+            "event_types": dict(self.event_types),
+            "per_day": dict(sorted(self.days.items())),
+            "error_rate": errors / (responses + errors) if responses + errors else 0.0,
+            "cache": dict(self.cached),
+            "user_message_length": self.user_lengths.summary(),
+            "response_length": self.response_lengths.summary(),
+        }
+
+
+def local_naive(value: datetime) -> datetime:
+    """Convert an aware datetime to naive local time, as the logs record it."""
+    if value.tzinfo is None:
+        return value
+    return value.astimezone().replace(tzinfo=None)
+
+
+def parse_time(value: str) -> datetime:
+    """Parse a date or ISO timestamp given on the command line.
+
+    Timestamps with an offset (e.g. ``2026-10-01T00:00:00Z``) are converted to
+    naive local time so they compare with the log timestamps.
+    """
+    try:
+        return local_naive(datetime.fromisoformat(value))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Not a date or ISO timestamp: {value}")
 
-def load_logs(log_file: str) -> List[Dict[str, Any]]:
-    """Load logs from JSONL file."""
-    logs = []
-    if not os.path.exists(log_file):
-        print(f"Log file not found: {log_file}")
-        return logs
 
-    with open(log_file, "r", encoding="utf-8") as f:
-        for line in f:
-            if line.strip():
-                try:
-                    logs.append(json.loads(line))
-                except json.JSONDecodeError as e:
-                    print(f"Error parsing log line: {e}")
-                    continue
-    return logs
+def file_date(path: str) -> Optional[str]:
+    match = LOG_FILE_DATE.search(os.path.basename(path))
+    return match.group(1) if match else None
+
+
+def select_files(
+    patterns: List[str], since: Optional[datetime], until: Optional[datetime]
+) -> List[str]:
+    """Resolve globs, then skip files whose date or indexed time range lies
+    outside the window, without opening them."""
+    if not patterns:
+        if since is None and until is None:
+            since = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        patterns = ["logs/conversations_*.jsonl*"]
+
+    paths = sorted({path for pattern in patterns for path in glob.glob(pattern)})
+    ranges = {}
+    for log_dir in {os.path.dirname(path) for path in paths}:
+        for entry in read_index(log_dir or "."):
+            ranges[os.path.join(log_dir, entry["file"])] = (
+                entry.get("start"),
+                entry.get("end"),
+            )
+
+    selected = []
+    for path in paths:
+        if path.endswith(".tmp"):
+            continue
+        date = file_date(path)
+        if date and since and date < since.strftime("%Y-%m-%d"):
+            continue
+        if date and until and date > until.strftime("%Y-%m-%d"):
+            continue
+        start, end = ranges.get(path, (None, None))
+        if since and end is not None and end < since.timestamp():
+            continue
+        if until and start is not None and start > until.timestamp():
+            continue
+        selected.append(path)
+    return selected
+
+
+def read_entries(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield parsed entries from one file, skipping malformed lines."""
+    try:
+        with open_segment(path) as f:
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except json.JSONDecodeError as e:
+                        print(f"Error parsing log line in {path}: {e}", file=sys.stderr)
+    except (OSError, EOFError) as e:
+        # e.g. a segment truncated by a crash
+        print(f"Error reading {path}: {e}", file=sys.stderr)
+
+
+def stream_entries(paths: List[str]) -> Iterator[Dict[str, Any]]:
+    """Yield entries in timestamp order.
+
+    Each segment is already in order, so segments of the same day are merged
+    lazily and days are read one after another; only one entry per open
+    segment is held in memory.
+    """
+    by_day: Dict[str, List[str]] = {}
+    for path in paths:
+        by_day.setdefault(file_date(path) or "", []).append(path)
+
+    for day in sorted(by_day):
+        yield from heapq.merge(
+            *(read_entries(path) for path in by_day[day]),
+            key=lambda entry: entry.get("timestamp", ""),
+        )
+
+
+def matches(entry: Dict[str, Any], args: argparse.Namespace) -> bool:
+    """Apply the command-line filters to one entry."""
+    if args.event and entry.get("event_type") not in args.event:
+        return False
+    conversation_id = str(entry.get("conversation_id", ""))
+    if args.conversation and not conversation_id.startswith(args.conversation):
+        return False
+    if args.since or args.until:
+        try:
+            timestamp = local_naive(datetime.fromisoformat(entry.get("timestamp", "")))
+        except ValueError:
+            return False
+        if args.since and timestamp < args.since:
+            return False
+        if args.until and timestamp > args.until:
+            return False
+    if args.grep:
+        needle = args.grep.lower()
+        if not any(needle in str(entry.get(key, "")).lower() for key in TEXT_FIELDS):
+            return False
+    return True
 
 
 def format_timestamp(iso_timestamp: str) -> str:
@@ -32,95 +247,183 @@ def format_timestamp(iso_timestamp: str) -> str:
     try:
         dt = datetime.fromisoformat(iso_timestamp.replace("Z", "+00:00"))
         return dt.strftime("%Y-%m-%d %H:%M:%S")
-    except:
+    except ValueError:
         return iso_timestamp
 
 
-def display_conversation(log_entry: Dict[str, Any]):
+def _truncate(text: Any, limit: int) -> str:
+    text = str(text)
+    return f"{text[:limit]}{'...' if len(text) > limit else ''}"
+
+
+def display_conversation(log_entry: Dict[str, Any], out: IO[str]):
     """Display a conversation entry nicely."""
     timestamp = format_timestamp(log_entry.get("timestamp", ""))
     conv_id = log_entry.get("conversation_id", "unknown")[:8]  # Short ID
+    stream = log_entry.get("stream", False)
+    endpoint = log_entry.get("endpoint", "unknown")
 
     if log_entry.get("event_type") == "conversation":
-        print(f"\n🔹 [{timestamp}] Conversation {conv_id}")
-        print(
-            f"   Stream: {log_entry.get('stream', False)} | Endpoint: {log_entry.get('endpoint', 'unknown')}"
-        )
-        print(f"👤 User: {log_entry.get('user_message', '')}")
+        print(f"\n🔹 [{timestamp}] Conversation {conv_id}", file=out)
+        print(f"   Stream: {stream} | Endpoint: {endpoint}", file=out)
+        print(f"👤 User: {log_entry.get('user_message', '')}", file=out)
+        response = _truncate(log_entry.get("assistant_response", ""), 200)
+        print(f"🤖 Assistant: {response}", file=out)
         print(
-            f"🤖 Assistant: {log_entry.get('assistant_response', '')[:200]}{'...' if len(log_entry.get('assistant_response', '')) > 200 else ''}"
-        )
-        print(
-            f"   Lengths: User={log_entry.get('user_message_length', 0)} | Assistant={log_entry.get('response_length', 0)}"
+            f"   Lengths: User={log_entry.get('user_message_length', 0)} | "
+            f"Assistant={log_entry.get('response_length', 0)}",
+            file=out,
         )
 
     elif log_entry.get("event_type") == "user_message":
-        print(f"\n🔸 [{timestamp}] User Message {conv_id}")
-        print(
-            f"   Stream: {log_entry.get('stream', False)} | Endpoint: {log_entry.get('endpoint', 'unknown')}"
-        )
-        print(f"👤 User: {log_entry.get('user_message', '')}")
+        print(f"\n🔸 [{timestamp}] User Message {conv_id}", file=out)
+        print(f"   Stream: {stream} | Endpoint: {endpoint}", file=out)
+        print(f"👤 User: {log_entry.get('user_message', '')}", file=out)
 
     elif log_entry.get("event_type") == "assistant_response":
-        print(f"\n🔸 [{timestamp}] Assistant Response {conv_id}")
+        print(f"\n🔸 [{timestamp}] Assistant Response {conv_id}", file=out)
         chunks = log_entry.get("chunks_count", "unknown")
-        print(f"   Stream: {log_entry.get('stream', False)} | Chunks: {chunks}")
-        print(
-            f"🤖 Assistant: {log_entry.get('assistant_response', '')[:200]}{'...' if len(log_entry.get('assistant_response', '')) > 200 else ''}"
-        )
+        print(f"   Stream: {stream} | Chunks: {chunks}", file=out)
+        response = _truncate(log_entry.get("assistant_response", ""), 200)
+        print(f"🤖 Assistant: {response}", file=out)
 
     elif log_entry.get("event_type") == "tool_usage":
-        print(f"\n🔧 [{timestamp}] Tool Usage {conv_id}")
-        print(f"   Tool: {log_entry.get('tool_name', 'unknown')}")
+        print(f"\n🔧 [{timestamp}] Tool Usage {conv_id}", file=out)
+        print(f"   Tool: {log_entry.get('tool_name', 'unknown')}", file=out)
+        print(f"   Input: {_truncate(log_entry.get('tool_input', ''), 100)}", file=out)
         print(
-            f"   Input: {str(log_entry.get('tool_input', ''))[:100]}{'...' if len(str(log_entry.get('tool_input', ''))) > 100 else ''}"
+            f"   Output: {_truncate(log_entry.get('tool_output', ''), 100)}", file=out
         )
+
+    elif log_entry.get("event_type") == "error":
+        print(f"\n❌ [{timestamp}] Error {conv_id}", file=out)
+        print(f"   Type: {log_entry.get('error_type', 'unknown')}", file=out)
+        print(f"   Message: {log_entry.get('error_message', '')}", file=out)
+        print(f"   Context: {log_entry.get('context', '')}", file=out)
+
+
+def display_stats(stats: Dict[str, Any], out: IO[str]):
+    """Display the aggregate stats."""
+    print(f"\n📊 Total entries: {stats['entries']}", file=out)
+    if stats["first"]:
         print(
-            f"   Output: {log_entry.get('tool_output', '')[:100]}{'...' if len(log_entry.get('tool_output', '')) > 100 else ''}"
+            f"   From {format_timestamp(stats['first'])} "
+            f"to {format_timestamp(stats['last'])}",
+            file=out,
         )
+    print("📈 Event types:", file=out)
+    for event_type, count in stats["event_types"].items():
+        print(f"   {event_type}: {count}", file=out)
+    print(f"❗ Error rate: {stats['error_rate']:.1%}", file=out)
+    if stats["cache"]:
+        cache = ", ".join(f"{layer}={count}" for layer, count in stats["cache"].items())
+        print(f"💾 Cache: {cache}", file=out)
+    for name in ("user_message_length", "response_length"):
+        lengths = stats[name]
+        if lengths["count"]:
+            print(
+                f"📏 {name}: p50={lengths['p50']:.0f} p90={lengths['p90']:.0f} "
+                f"p99={lengths['p99']:.0f} max={lengths['max']:.0f}",
+                file=out,
+            )
+    if len(stats["per_day"]) > 1:
+        print("📅 Per day:", file=out)
+        for day, count in stats["per_day"].items():
+            print(f"   {day}: {count}", file=out)
 
-    elif log_entry.get("event_type") == "error":
-        print(f"\n❌ [{timestamp}] Error {conv_id}")
-        print(f"   Type: {log_entry.get('error_type', 'unknown')}")
-        print(f"   Message: {log_entry.get('error_message', '')}")
-        print(f"   Context: {log_entry.get('context', '')}")
 
+def open_pager() -> Optional[subprocess.Popen]:
+    """Start $PAGER (default less) when stdout is a terminal."""
+    if not sys.stdout.isatty():
+        return None
+    try:
+        return subprocess.Popen(
+            os.environ.get("PAGER", "less -R"),
+            shell=True,
+            stdin=subprocess.PIPE,
+            text=True,
+            encoding="utf-8",
+        )
+    except OSError:
+        return None
 
-def main():
-    """Main function."""
-    if len(sys.argv) > 1:
-        log_file = sys.argv[1]
-    else:
-        # Default to today's log
-        today = datetime.now().strftime("%Y-%m-%d")
-        log_file = f"logs/conversations_{today}.jsonl"
 
-    print(f"📋 Viewing logs from: {log_file}")
-    print("=" * 80)
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="View Artemis conversation logs.")
+    parser.add_argument(
+        "files",
+        nargs="*",
+        help="Log files or globs (default: logs/conversations_*, today only "
+        "unless --since/--until is given)",
+    )
+    parser.add_argument("--since", type=parse_time, help="Start date or timestamp")
+    parser.add_argument("--until", type=parse_time, help="End date or timestamp")
+    parser.add_argument(
+        "--event",
+        action="append",
+        help="Event type to include (repeatable), e.g. conversation, error",
+    )
+    parser.add_argument("--conversation", help="Conversation id or id prefix")
+    parser.add_argument("--grep", help="Case-insensitive text in messages or errors")
+    parser.add_argument("--format", choices=["text", "json"], default="text")
+    parser.add_argument(
+        "--stats-only", action="store_true", help="Print only the aggregate stats"
+    )
+    parser.add_argument("--no-pager", action="store_true", help="Never use a pager")
+    args = parser.parse_args(argv)
+    # A bare date for --until covers that whole day
+    if args.until and args.until == args.until.replace(
+        hour=0, minute=0, second=0, microsecond=0
+    ):
+        args.until += timedelta(days=1, microseconds=-1)
+    return args
 
-    logs = load_logs(log_file)
-    if not logs:
-        print("No logs found.")
-        return
 
-    # Sort by timestamp
-    logs.sort(key=lambda x: x.get("timestamp", ""))
+def run(args: argparse.Namespace, out: IO[str]):
+    """Stream matching entries to ``out`` and finish with the stats."""
+    paths = select_files(args.files, args.since, args.until)
+    if args.format == "text":
+        print(f"📋 Viewing logs from {len(paths)} file(s)", file=out)
+        print("=" * 80, file=out)
 
-    # Display logs
-    for log_entry in logs:
-        display_conversation(log_entry)
+    stats = LogStats()
+    for entry in stream_entries(paths):
+        if not matches(entry, args):
+            continue
+        stats.add(entry)
+        if args.stats_only:
+            continue
+        if args.format == "json":
+            print(json.dumps(entry, ensure_ascii=False), file=out)
+        else:
+            display_conversation(entry, out)
 
-    print(f"\n📊 Total entries: {len(logs)}")
+    if args.format == "json":
+        print(json.dumps({"stats": stats.to_dict()}, ensure_ascii=False), file=out)
+    elif not stats.entries:
+        print("No logs found.", file=out)
+    else:
+        display_stats(stats.to_dict(), out)
 
-    # Summary stats
-    event_types = {}
-    for log in logs:
-        event_type = log.get("event_type", "unknown")
-        event_types[event_type] = event_types.get(event_type, 0) + 1
 
-    print("📈 Event types:")
-    for event_type, count in event_types.items():
-        print(f"   {event_type}: {count}")
+def main(argv: Optional[Iterable[str]] = None):
+    """Main function."""
+    args = parse_args(list(argv) if argv is not None else None)
+    pager = None
+    if args.format == "text" and not args.no_pager:
+        pager = open_pager()
+    out = pager.stdin if pager else sys.stdout
+    try:
+        run(args, out)
+    except BrokenPipeError:
+        pass  # Pager quit early
+    finally:
+        if pager:
+            try:
+                pager.stdin.close()
+            except BrokenPipeError:
+                pass
+            pager.wait()
 
 
 if __name__ == "__main__":